@@ -20,6 +20,19 @@ from joern_mcp.utils.performance import (
     SlowQueryLogger,
     get_metrics,
 )
+from joern_mcp.utils.project_utils import invalidate_project_cache
+
+# 批量查询中标记各查询输出起点的分隔行
+_BATCH_MARKER = "<<<joern-mcp-batch:{}>>>"
+_BATCH_MARKER_PATTERN = re.compile(r"^<<<joern-mcp-batch:(\d+)>>>$", re.MULTILINE)
+# 改变工作区或活动项目的命令，其结果不缓存，执行后使已缓存的读查询结果失效
+# （包括 importCode.c(...) 等按语言导入、不带括号的 close 以及切换工作区）
+_WORKSPACE_MUTATION_PATTERN = re.compile(
+    r"\b(?:importCode|importCpg|open|close|delete|setActiveProject|switchWorkspace)\b"
+    r"|\bworkspace\.reset\b"
+)
+# 字符串字面量（判断查询是否改变工作区时忽略其中的内容）
+_STRING_LITERAL_PATTERN = re.compile(r'"[^"]*"')
 
 
 class QueryExecutionError(Exception):
@@ -34,6 +47,19 @@ class QueryValidationError(Exception):
     pass
 
 
+def mutates_workspace(query: str) -> bool:
+    """判断查询是否会改变工作区或活动项目（忽略字符串字面量中的内容）
+
+    Args:
+        query: 查询字符串
+
+    Returns:
+        True 表示查询会导入、打开、关闭、删除项目或重置工作区
+    """
+    query_without_strings = _STRING_LITERAL_PATTERN.sub('""', query)
+    return _WORKSPACE_MUTATION_PATTERN.search(query_without_strings) is not None
+
+
 class OptimizedQueryExecutor:
     """
     优化的查询执行引擎
@@ -116,11 +142,16 @@ class OptimizedQueryExecutor:
 
             # 2. 分析查询复杂度
             complexity_info = self.complexity_analyzer.analyze(query)
-            logger.debug(f"Query complexity: {complexity_info['complexity']}/10")
+            logger.debug("Query complexity: {}/10", complexity_info["complexity"])
 
             # 3. 确保查询返回正确格式
             query = self._format_query(query, format)
 
+            # 改变工作区的查询既不读也不写缓存
+            workspace_changed = mutates_workspace(query)
+            if workspace_changed:
+                use_cache = False
+
             # 4. 检查缓存
             cache_key = self._get_cache_key(query)
             if use_cache:
@@ -160,8 +191,11 @@ class OptimizedQueryExecutor:
                 logger.error(f"Query failed: {stderr}")
                 raise QueryExecutionError(stderr) from None
 
-            # 7. 缓存结果
-            if use_cache:
+            # 7. 缓存结果（工作区变化后旧结果和项目验证结果全部失效）
+            if workspace_changed:
+                self.clear_cache()
+                invalidate_project_cache()
+            elif use_cache:
                 # 简单查询放入热缓存，复杂查询放入冷缓存
                 hot = complexity_info["complexity"] <= 3
                 self.cache.set(cache_key, result, hot=hot)
@@ -178,7 +212,7 @@ class OptimizedQueryExecutor:
                 query, duration, complexity=complexity_info["complexity"], cached=cached
             )
 
-            logger.debug(f"Query completed in {duration:.2f}s")
+            logger.debug("Query completed in {:.2f}s", duration)
             return result
 
         except QueryValidationError:
@@ -200,6 +234,136 @@ class OptimizedQueryExecutor:
             logger.exception(f"Query execution failed: {e}")
             raise QueryExecutionError(str(e)) from None
 
+    async def batch_execute(
+        self, queries: list[str], timeout: int | None = None
+    ) -> dict:
+        """
+        在尽量少的 Joern 往返中执行多个查询
+
+        第一个改变工作区的查询之前的只读查询先查缓存，未命中的合并为一个代码块提交，
+        各查询的 JSON 输出以分隔行区分并写回缓存。合并查询中途失败时，只逐个重试
+        尚未得到输出的查询。改变工作区的查询及其之后的查询按顺序逐个执行，
+        既不会重复执行，也保证后续读查询看到变化后的工作区。
+
+        Args:
+            queries: Scala查询语句列表
+            timeout: 整个批次的超时时间（秒），默认 settings.query_timeout
+
+        Returns:
+            {"results": [...], "round_trips": int}，results 与 queries 一一对应，
+            每项为结果字典或异常
+        """
+        results: list = [None] * len(queries)
+        round_trips = 0
+
+        async def run() -> None:
+            nonlocal round_trips
+            pending: list[tuple[int, str]] = []
+            sequential_from = len(queries)
+
+            for i, query in enumerate(queries):
+                is_valid, error_msg = self._validate_query(query)
+                if not is_valid:
+                    results[i] = QueryValidationError(error_msg)
+                    continue
+                formatted = self._format_query(query, "json")
+                if mutates_workspace(formatted):
+                    sequential_from = i
+                    break
+                cached_result = self.cache.get(self._get_cache_key(formatted))
+                if cached_result is not None:
+                    results[i] = cached_result
+                else:
+                    pending.append((i, formatted))
+
+            if pending:
+                round_trips += 1
+                outputs = await self._execute_combined(
+                    [formatted for _, formatted in pending]
+                )
+                for (i, formatted), output in zip(pending, outputs, strict=False):
+                    result = {"success": True, "stdout": output, "stderr": ""}
+                    complexity = self.complexity_analyzer.analyze(formatted)
+                    self.cache.set(
+                        self._get_cache_key(formatted),
+                        result,
+                        hot=complexity["complexity"] <= 3,
+                    )
+                    results[i] = result
+
+                # 只读查询重试无副作用，只重试没有得到输出的部分
+                remaining = pending[len(outputs) :]
+                if remaining:
+                    round_trips += len(remaining)
+                    individual = await asyncio.gather(
+                        *(
+                            self.execute(queries[i], timeout=timeout)
+                            for i, _ in remaining
+                        ),
+                        return_exceptions=True,
+                    )
+                    for (i, _), result in zip(remaining, individual, strict=True):
+                        results[i] = result
+
+            for i in range(sequential_from, len(queries)):
+                is_valid, error_msg = self._validate_query(queries[i])
+                if not is_valid:
+                    results[i] = QueryValidationError(error_msg)
+                    continue
+                round_trips += 1
+                try:
+                    results[i] = await self.execute(queries[i], timeout=timeout)
+                except Exception as e:
+                    results[i] = e
+
+        timeout_val = timeout or settings.query_timeout
+        try:
+            await asyncio.wait_for(run(), timeout=timeout_val)
+        except asyncio.TimeoutError:
+            logger.error(f"Batch query timeout after {timeout_val}s")
+            for i, result in enumerate(results):
+                if result is None:
+                    results[i] = QueryExecutionError("Query timeout")
+
+        return {"results": results, "round_trips": round_trips}
+
+    async def _execute_combined(self, queries: list[str]) -> list[str]:
+        """合并执行已格式化的查询，返回按顺序完整执行的查询的输出
+
+        某个查询运行出错时只返回它之前的查询的输出；整个代码块失败时返回空列表。
+        """
+        lines = []
+        for i, query in enumerate(queries):
+            lines.append(f'println("{_BATCH_MARKER.format(i)}")')
+            lines.append(f"println({query})")
+        combined = "{\n" + "\n".join(lines) + "\n}"
+
+        start_time = time.time()
+        try:
+            async with self.semaphore:
+                result = await self.server_manager.execute_query_async(combined)
+        except Exception as e:
+            logger.warning(f"Combined batch query failed: {e}")
+            return []
+        duration = time.time() - start_time
+
+        # split 结果: [前缀, 序号0, 输出0, 序号1, 输出1, ...]
+        parts = _BATCH_MARKER_PATTERN.split(result.get("stdout", ""))
+        outputs = [output.strip() for output in parts[2::2]]
+        started = 0
+        for index in parts[1::2]:
+            if int(index) != started:
+                break
+            started += 1
+
+        if result.get("success") and started == len(queries):
+            self.metrics.record_query(duration, success=True, cached=False)
+            return outputs
+
+        # 最后一个已开始的查询运行出错，其输出不完整
+        self.metrics.record_query(duration, success=False, cached=False)
+        return outputs[: max(started - 1, 0)]
+
     def _validate_query(self, query: str) -> tuple[bool, str]:
         """验证查询安全性"""
         # 检查长度
@@ -18,6 +18,7 @@ import re
 import time
 from typing import Any
 
+import orjson
 import requests  # 使用同步requests，与cpgqls-client一致
 import websockets
 from loguru import logger
@@ -74,6 +75,9 @@ class JoernHTTPClient:
         self.endpoint = endpoint.rstrip("/")
         self.auth = auth
         self.timeout = timeout
+        # 复用 HTTP 连接（keep-alive 连接池），请求在线程中执行，
+        # 并发查询不会因同步 requests 调用阻塞 event loop 而串行化
+        self._session = requests.Session()
 
         logger.info(f"Joern HTTP client initialized for http://{endpoint}")
 
@@ -141,15 +145,16 @@ class JoernHTTPClient:
         """
         try:
             sync_endpoint = self._post_query_sync_endpoint()
-            logger.debug(f"POST同步查询到: {sync_endpoint}")
+            logger.debug("POST同步查询到: {}", sync_endpoint)
 
-            response = requests.post(
+            response = await asyncio.to_thread(
+                self._session.post,
                 sync_endpoint,
                 json={"query": query},
                 auth=self.auth,
                 timeout=self.timeout,
             )
-            logger.debug(f"同步查询响应状态: {response.status_code}")
+            logger.debug("同步查询响应状态: {}", response.status_code)
 
             if response.status_code == 401:
                 raise Exception("Basic authentication failed")
@@ -158,8 +163,8 @@ class JoernHTTPClient:
                     f"Sync query failed: HTTP {response.status_code}, body: {response.text}"
                 )
 
-            raw_result = response.json()
-            logger.debug(f"同步查询成功: {query[:50]}...")
+            raw_result = orjson.loads(response.content)
+            logger.debug("同步查询成功: {}...", query[:50])
 
             # 处理错误响应
             if "err" in raw_result:
@@ -194,7 +199,7 @@ class JoernHTTPClient:
         try:
             # 1. 建立WebSocket连接
             connect_endpoint = self._connect_endpoint()
-            logger.debug(f"连接WebSocket: {connect_endpoint}")
+            logger.debug("连接WebSocket: {}", connect_endpoint)
 
             async with websockets.connect(
                 connect_endpoint, ping_interval=None
@@ -202,7 +207,7 @@ class JoernHTTPClient:
                 logger.debug("WebSocket连接成功，等待确认消息...")
                 # 等待连接确认消息
                 connected_msg = await ws_conn.recv()
-                logger.debug(f"收到消息: {connected_msg}")
+                logger.debug("收到消息: {}", connected_msg)
 
                 if connected_msg != self.CPGQLS_MSG_CONNECTED:
                     raise Exception(
@@ -210,17 +215,18 @@ class JoernHTTPClient:
                     )
                 logger.debug("WebSocket连接已确认")
 
-                # 2. POST查询（使用同步requests，与cpgqls-client一致）
+                # 2. POST查询（同步requests，与cpgqls-client一致，在线程中执行）
                 post_endpoint = self._post_query_endpoint()
-                logger.debug(f"POST查询到: {post_endpoint}")
+                logger.debug("POST查询到: {}", post_endpoint)
 
-                post_res = requests.post(
+                post_res = await asyncio.to_thread(
+                    self._session.post,
                     post_endpoint,
                     json={"query": query},
                     auth=self.auth,
                     timeout=self.timeout,
                 )
-                logger.debug(f"POST响应状态: {post_res.status_code}")
+                logger.debug("POST响应状态: {}", post_res.status_code)
 
                 # 检查认证
                 if post_res.status_code == 401:
@@ -231,8 +237,8 @@ class JoernHTTPClient:
                     )
 
                 # 获取查询UUID
-                query_uuid = post_res.json()["uuid"]
-                logger.debug(f"查询已提交，UUID: {query_uuid}")
+                query_uuid = orjson.loads(post_res.content)["uuid"]
+                logger.debug("查询已提交，UUID: {}", query_uuid)
 
                 # 3. 等待WebSocket完成通知（必须等到我们提交的查询完成）
                 logger.debug(
@@ -249,11 +255,11 @@ class JoernHTTPClient:
                     completion_msg = await asyncio.wait_for(
                         ws_conn.recv(), timeout=remaining_timeout
                     )
-                    logger.debug(f"收到完成通知: {completion_msg}")
+                    logger.debug("收到完成通知: {}", completion_msg)
 
                     # 检查是否是我们的查询完成
                     if completion_msg == query_uuid:
-                        logger.debug(f"查询 {query_uuid} 已完成")
+                        logger.debug("查询 {} 已完成", query_uuid)
                         break
                     else:
                         # 收到其他查询的通知，继续等待
@@ -261,16 +267,17 @@ class JoernHTTPClient:
                             f"收到其他查询的通知 {completion_msg}，继续等待 {query_uuid}"
                         )
 
-                # 4. GET查询结果（同步requests）
+                # 4. GET查询结果（同步requests，在线程中执行）
                 result_endpoint = self._get_result_endpoint(query_uuid)
-                logger.debug(f"GET结果从: {result_endpoint}")
+                logger.debug("GET结果从: {}", result_endpoint)
 
-                get_res = requests.get(
+                get_res = await asyncio.to_thread(
+                    self._session.get,
                     result_endpoint,
                     auth=self.auth,
                     timeout=self.timeout,
                 )
-                logger.debug(f"GET响应状态: {get_res.status_code}")
+                logger.debug("GET响应状态: {}", get_res.status_code)
 
                 # 检查结果获取
                 if get_res.status_code == 401:
@@ -281,8 +288,8 @@ class JoernHTTPClient:
                     )
 
                 # 获取Joern Server的原始响应
-                raw_result = get_res.json()
-                logger.debug(f"查询成功完成: {query[:50]}...")
+                raw_result = orjson.loads(get_res.content)
+                logger.debug("查询成功完成: {}...", query[:50])
 
                 # 检查Joern Server的错误响应
                 if "err" in raw_result:
@@ -346,7 +353,8 @@ class JoernHTTPClient:
         return await self.execute("workspace")
 
     async def close(self) -> None:
-        """关闭客户端（HTTP客户端无需显式关闭）"""
+        """关闭客户端，释放 HTTP 会话连接池中的连接"""
+        self._session.close()
         logger.debug("HTTP client closed")
 
     def __repr__(self) -> str:
@@ -17,6 +17,12 @@ from joern_mcp.utils.port_utils import (
     is_port_available,
 )
 
+# 就绪/端口释放轮询的初始间隔和最大间隔（秒），间隔按指数退避增长
+_POLL_INTERVAL = 0.05
+_POLL_MAX_INTERVAL = 0.5
+# 停止服务器后等待端口释放的最长时间（秒）
+_PORT_RELEASE_TIMEOUT = 1.0
+
 
 class JoernServerError(Exception):
     """Joern Server错误"""
@@ -52,6 +58,7 @@ class JoernServerManager:
         password: str | None = None,
         timeout: int = 30,
         auto_select_port: bool = True,
+        cwd: str | None = None,
     ) -> None:
         """启动Joern Server
 
@@ -60,6 +67,7 @@ class JoernServerManager:
             password: 认证密码
             timeout: 启动超时时间（秒）
             auto_select_port: 端口被占用时是否自动选择新端口
+            cwd: Joern 进程的工作目录（workspace 位于其下），默认为当前目录
         """
         if self.process:
             logger.warning("Joern server already running")
@@ -133,7 +141,10 @@ class JoernServerManager:
         # 启动进程
         try:
             self.process = await asyncio.create_subprocess_exec(
-                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
             )
             logger.info(f"Joern server process started (PID: {self.process.pid})")
         except Exception as e:
@@ -226,6 +237,7 @@ class JoernServerManager:
         start_time = asyncio.get_event_loop().time()
 
         # 阶段1: 等待端口可达
+        interval = _POLL_INTERVAL
         port_ready = False
         while not port_ready:
             try:
@@ -256,12 +268,14 @@ class JoernServerManager:
                         f"Server process exited: {stderr.decode()}"
                     ) from None
 
-                await asyncio.sleep(0.5)
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, _POLL_MAX_INTERVAL)
 
         # 阶段2: 验证同步查询端点可用（比 WebSocket 更可靠）
         sync_endpoint = f"http://{self.host}:{self.port}/query-sync"
         logger.info(f"Verifying sync query endpoint: {sync_endpoint}")
 
+        interval = _POLL_INTERVAL
         api_ready = False
         while not api_ready:
             try:
@@ -297,7 +311,8 @@ class JoernServerManager:
                         f"Server process exited: {stderr.decode()}"
                     ) from None
 
-                await asyncio.sleep(1.0)
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, _POLL_MAX_INTERVAL)
 
     async def _log_process_output(self) -> None:
         """记录进程输出用于调试"""
@@ -326,7 +341,7 @@ class JoernServerManager:
         # 如果是连接到外部服务器，只清理客户端，不尝试停止进程
         if getattr(self, "_external_server", False):
             logger.info("Disconnecting from external Joern server (not stopping it)")
-            self.client = None
+            await self._close_client()
             self._external_server = False
             return
 
@@ -348,13 +363,11 @@ class JoernServerManager:
             logger.info("Joern server killed")
         finally:
             self.process = None
-            self.client = None
-
-            # 等待端口释放
-            await asyncio.sleep(1)
+            await self._close_client()
 
-            # 验证端口已释放
-            if is_port_available(saved_port, self.host):
+            # 等待端口释放（释放后立即返回）
+            released = await self._wait_for_port_release(saved_port)
+            if released:
                 logger.success(f"Port {saved_port} released successfully")
             else:
                 logger.warning(
@@ -362,6 +375,24 @@ class JoernServerManager:
                     f"It may take a few seconds to release."
                 )
 
+    async def _close_client(self) -> None:
+        """关闭并丢弃 HTTP 客户端"""
+        if self.client:
+            await self.client.close()
+            self.client = None
+
+    async def _wait_for_port_release(self, port: int) -> bool:
+        """轮询等待端口释放，最多等待 _PORT_RELEASE_TIMEOUT 秒"""
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + _PORT_RELEASE_TIMEOUT
+        interval = _POLL_INTERVAL
+        while not is_port_available(port, self.host):
+            if loop.time() >= deadline:
+                return False
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, _POLL_MAX_INTERVAL)
+        return True
+
     async def restart(self) -> None:
         """重启Joern Server"""
         logger.info("Restarting Joern server")
@@ -398,7 +429,7 @@ class JoernServerManager:
         if not self.client:
             raise JoernServerError("Server not started") from None
 
-        logger.debug(f"Executing query (async): {query[:100]}...")
+        logger.debug("Executing query (async): {}...", query[:100])
 
         try:
             result = await self.client.execute(query)
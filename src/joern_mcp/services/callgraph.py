@@ -8,7 +8,7 @@ from loguru import logger
 
 from joern_mcp.joern.executor import QueryExecutor
 from joern_mcp.utils.project_utils import get_safe_cpg_prefix
-from joern_mcp.utils.response_parser import safe_parse_joern_response
+from joern_mcp.utils.response_parser import safe_parse_joern_list
 
 
 class CallGraphService:
@@ -74,10 +74,7 @@ class CallGraphService:
 
             if result.get("success"):
                 stdout = result.get("stdout", "")
-                callers = safe_parse_joern_response(stdout, default=[])
-
-                if not isinstance(callers, list):
-                    callers = [callers] if callers else []
+                callers = safe_parse_joern_list(stdout)
 
                 response = {
                     "success": True,
@@ -145,10 +142,7 @@ class CallGraphService:
 
             if result.get("success"):
                 stdout = result.get("stdout", "")
-                callees = safe_parse_joern_response(stdout, default=[])
-
-                if not isinstance(callees, list):
-                    callees = [callees] if callees else []
+                callees = safe_parse_joern_list(stdout)
 
                 response = {
                     "success": True,
@@ -231,10 +225,7 @@ class CallGraphService:
 
             if result.get("success"):
                 stdout = result.get("stdout", "")
-                chain = safe_parse_joern_response(stdout, default=[])
-
-                if not isinstance(chain, list):
-                    chain = [chain] if chain else []
+                chain = safe_parse_joern_list(stdout)
 
                 response = {
                     "success": True,
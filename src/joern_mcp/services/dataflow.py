@@ -12,7 +12,7 @@ from loguru import logger
 
 from joern_mcp.joern.executor import QueryExecutor
 from joern_mcp.utils.project_utils import get_safe_cpg_prefix
-from joern_mcp.utils.response_parser import safe_parse_joern_response
+from joern_mcp.utils.response_parser import safe_parse_joern_list
 
 
 class DataFlowService:
@@ -103,10 +103,7 @@ class DataFlowService:
 
             if result.get("success"):
                 stdout = result.get("stdout", "")
-                flows = safe_parse_joern_response(stdout, default=[])
-
-                if not isinstance(flows, list):
-                    flows = [flows] if flows else []
+                flows = safe_parse_joern_list(stdout)
 
                 response = {
                     "success": True,
@@ -213,10 +210,7 @@ class DataFlowService:
 
             if result.get("success"):
                 stdout = result.get("stdout", "")
-                flows = safe_parse_joern_response(stdout, default=[])
-
-                if not isinstance(flows, list):
-                    flows = [flows] if flows else []
+                flows = safe_parse_joern_list(stdout)
 
                 response = {
                     "success": True,
@@ -311,10 +305,7 @@ class DataFlowService:
 
             if result.get("success"):
                 stdout = result.get("stdout", "")
-                dependencies = safe_parse_joern_response(stdout, default=[])
-
-                if not isinstance(dependencies, list):
-                    dependencies = [dependencies] if dependencies else []
+                dependencies = safe_parse_joern_list(stdout)
 
                 response = {
                     "success": True,
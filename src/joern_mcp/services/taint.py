@@ -19,7 +19,7 @@ from joern_mcp.models.taint_rules import (
     list_all_rules,
 )
 from joern_mcp.utils.project_utils import get_safe_cpg_prefix
-from joern_mcp.utils.response_parser import safe_parse_joern_response
+from joern_mcp.utils.response_parser import safe_parse_joern_list
 
 
 class TaintAnalysisService:
@@ -107,10 +107,7 @@ class TaintAnalysisService:
 
             if result.get("success"):
                 stdout = result.get("stdout", "")
-                flows = safe_parse_joern_response(stdout, default=[])
-
-                if not isinstance(flows, list):
-                    flows = [flows] if flows else []
+                flows = safe_parse_joern_list(stdout)
 
                 response = {
                     "success": True,
@@ -275,10 +272,7 @@ class TaintAnalysisService:
 
             if result.get("success"):
                 stdout = result.get("stdout", "")
-                flows = safe_parse_joern_response(stdout, default=[])
-
-                if not isinstance(flows, list):
-                    flows = [flows] if flows else []
+                flows = safe_parse_joern_list(stdout)
 
                 response = {
                     "success": True,
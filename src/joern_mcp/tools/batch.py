@@ -8,8 +8,6 @@
 batch_query 执行原始查询，用户需在查询中自行指定项目前缀。
 """
 
-import asyncio
-
 from loguru import logger
 
 from joern_mcp.mcp_server import mcp, server_state
@@ -23,7 +21,7 @@ async def batch_query(queries: list[str], timeout: int = 300) -> dict:
 
     Args:
         queries: 查询列表（Scala查询语句）
-        timeout: 每个查询的超时时间（秒）
+        timeout: 整个批次的超时时间（秒）
 
     Returns:
         dict: 批量查询结果
@@ -38,7 +36,8 @@ async def batch_query(queries: list[str], timeout: int = 300) -> dict:
             "results": [...],
             "total": 2,
             "succeeded": 2,
-            "failed": 0
+            "failed": 0,
+            "round_trips": 1
         }
 
     Note:
@@ -59,15 +58,12 @@ async def batch_query(queries: list[str], timeout: int = 300) -> dict:
     failed = 0
 
     try:
-        # 并发执行所有查询
-        tasks = [
-            server_state.query_executor.execute(query, timeout=timeout)
-            for query in queries
-        ]
-
-        query_results = await asyncio.gather(*tasks, return_exceptions=True)
+        # 合并为一次 Joern 往返执行所有查询
+        batch = await server_state.query_executor.batch_execute(
+            queries, timeout=timeout
+        )
 
-        for i, result in enumerate(query_results):
+        for i, result in enumerate(batch["results"]):
             if isinstance(result, Exception):
                 results.append(
                     {"query_index": i, "success": False, "error": str(result)}
@@ -98,6 +94,7 @@ async def batch_query(queries: list[str], timeout: int = 300) -> dict:
             "total": len(queries),
             "succeeded": succeeded,
             "failed": failed,
+            "round_trips": batch["round_trips"],
         }
 
     except Exception as e:
@@ -152,7 +149,7 @@ async def batch_function_analysis(project_name: str, function_names: list[str])
 
         for func_name in function_names:
             # 获取函数信息
-            query = f'''
+            query = f"""
             {cpg_prefix}.method.name("{func_name}")
                .map(m => Map(
                    "name" -> m.name,
@@ -163,7 +160,7 @@ async def batch_function_analysis(project_name: str, function_names: list[str])
                    "code" -> m.code,
                    "parameterCount" -> m.parameter.size
                ))
-            '''
+            """
 
             result = await server_state.query_executor.execute(query)
 
@@ -12,6 +12,9 @@
 from joern_mcp.mcp_server import mcp, server_state
 from joern_mcp.services.callgraph import CallGraphService
 
+# 合法的调用链方向
+_VALID_DIRECTIONS = frozenset({"up", "down"})
+
 
 @mcp.tool()
 async def get_callers(project_name: str, function_name: str, depth: int = 1) -> dict:
@@ -131,7 +134,7 @@ async def get_call_chain(
     if max_depth < 1 or max_depth > 10:
         return {"success": False, "error": "Max depth must be between 1 and 10"}
 
-    if direction not in ["up", "down"]:
+    if direction not in _VALID_DIRECTIONS:
         return {"success": False, "error": "Direction must be 'up' or 'down'"}
 
     service = CallGraphService(server_state.query_executor)
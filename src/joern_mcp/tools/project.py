@@ -21,9 +21,17 @@ from pathlib import Path
 from loguru import logger
 
 from joern_mcp.mcp_server import mcp, server_state
+from joern_mcp.utils.project_utils import invalidate_project_cache
 from joern_mcp.utils.response_parser import safe_parse_joern_response
 
 
+def _invalidate_project_state(project_name: str) -> None:
+    """项目导入、切换、关闭或删除后，使项目验证缓存和查询结果缓存失效"""
+    invalidate_project_cache(project_name)
+    if server_state.query_executor:
+        server_state.query_executor.clear_cache()
+
+
 def _parse_int_from_output(stdout: str) -> int:
     """从 Joern 输出中解析整数值
 
@@ -104,6 +112,7 @@ async def parse_project(
         result = await server_state.joern_server.import_code(
             str(path.absolute()), project_name
         )
+        _invalidate_project_state(project_name)
 
         if result.get("success"):
             logger.info(f"Project {project_name} parsed successfully")
@@ -159,6 +168,7 @@ async def switch_project(project_name: str) -> dict:
         # Joern 的 open 命令切换当前项目
         query = f'open("{project_name}")'
         result = await server_state.joern_server.execute_query_async(query)
+        _invalidate_project_state(project_name)
 
         if result.get("success"):
             logger.info(f"Switched to project: {project_name}")
@@ -418,6 +428,7 @@ async def delete_project(project_name: str, permanent: bool = True) -> dict:
             action = "closed"
 
         result = await server_state.joern_server.execute_query_async(query)
+        _invalidate_project_state(project_name)
 
         if result.get("success"):
             logger.info(f"Project {project_name} {action}")
@@ -522,6 +533,7 @@ async def cleanup_inactive_projects(keep_active: bool = True) -> dict:
             delete_result = await server_state.joern_server.execute_query_async(
                 delete_query
             )
+            _invalidate_project_state(name)
 
             if delete_result.get("success"):
                 deleted.append(name)
@@ -578,6 +590,7 @@ async def close_project(project_name: str) -> dict:
     try:
         query = f'close("{project_name}")'
         result = await server_state.joern_server.execute_query_async(query)
+        _invalidate_project_state(project_name)
 
         if result.get("success"):
             logger.info(f"Project {project_name} closed")
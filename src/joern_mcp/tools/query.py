@@ -385,7 +385,7 @@ async def execute_query(project_name: str, query: str) -> dict:
         return {"success": False, "error": "Query executor not initialized"}
 
     logger.info(f"Executing custom query in project: {project_name}")
-    logger.debug(f"Query: {query}")
+    logger.debug("Query: {}", query)
 
     try:
         # 安全获取 CPG 前缀，验证项目存在性
@@ -398,7 +398,7 @@ async def execute_query(project_name: str, query: str) -> dict:
         # 处理查询字符串：将 cpg. 替换为项目特定的前缀
         processed_query = query.replace("cpg.", f"{cpg_prefix}.")
 
-        logger.debug(f"Processed query: {processed_query}")
+        logger.debug("Processed query: {}", processed_query)
 
         # 执行查询
         result = await server_state.query_executor.execute(processed_query)
@@ -418,7 +418,7 @@ async def execute_query(project_name: str, query: str) -> dict:
                 }
             except Exception as parse_error:
                 # 解析失败，返回原始输出
-                logger.debug(f"Failed to parse query result as JSON: {parse_error}")
+                logger.debug("Failed to parse query result as JSON: {}", parse_error)
                 return {
                     "success": True,
                     "project": project_name,
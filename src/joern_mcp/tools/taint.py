@@ -12,6 +12,20 @@
 from joern_mcp.mcp_server import mcp, server_state
 from joern_mcp.services.taint import TaintAnalysisService
 
+# 合法的严重程度
+_VALID_SEVERITIES = frozenset({"CRITICAL", "HIGH", "MEDIUM", "LOW"})
+
+# 复用的服务实例，查询执行器变化时重建
+_service: TaintAnalysisService | None = None
+
+
+def _get_service() -> TaintAnalysisService:
+    """获取绑定当前查询执行器的污点分析服务"""
+    global _service
+    if _service is None or _service.executor is not server_state.query_executor:
+        _service = TaintAnalysisService(server_state.query_executor)
+    return _service
+
 
 @mcp.tool()
 async def find_vulnerabilities(
@@ -49,13 +63,13 @@ async def find_vulnerabilities(
     if max_flows < 1 or max_flows > 50:
         return {"success": False, "error": "Max flows must be between 1 and 50"}
 
-    if severity and severity not in ["CRITICAL", "HIGH", "MEDIUM", "LOW"]:
+    if severity and severity not in _VALID_SEVERITIES:
         return {
             "success": False,
             "error": "Severity must be one of: CRITICAL, HIGH, MEDIUM, LOW",
         }
 
-    service = TaintAnalysisService(server_state.query_executor)
+    service = _get_service()
     return await service.find_vulnerabilities(
         rule_name, severity, max_flows, project_name
     )
@@ -95,7 +109,7 @@ async def check_taint_flow(
     if max_flows < 1 or max_flows > 50:
         return {"success": False, "error": "Max flows must be between 1 and 50"}
 
-    service = TaintAnalysisService(server_state.query_executor)
+    service = _get_service()
     return await service.check_specific_flow(
         source_pattern, sink_pattern, max_flows, project_name
     )
@@ -137,7 +151,7 @@ async def list_vulnerability_rules() -> dict:
     if not server_state.query_executor:
         return {"success": False, "error": "Query executor not initialized"}
 
-    service = TaintAnalysisService(server_state.query_executor)
+    service = _get_service()
     return service.list_rules()
 
 
@@ -171,5 +185,5 @@ async def get_rule_details(rule_name: str) -> dict:
     if not server_state.query_executor:
         return {"success": False, "error": "Query executor not initialized"}
 
-    service = TaintAnalysisService(server_state.query_executor)
+    service = _get_service()
     return service.get_rule_details(rule_name)
@@ -6,6 +6,16 @@ from loguru import logger
 
 from joern_mcp.config import settings
 
+# 日志格式（模块加载时构建一次，所有 sink 共用）
+_CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+    "<level>{message}</level>"
+)
+_FILE_FORMAT = (
+    "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} | {message}"
+)
+
 
 def setup_logging() -> None:
     """配置日志系统"""
@@ -16,7 +26,7 @@ def setup_logging() -> None:
     logger.add(
         sys.stderr,
         level=settings.log_level,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+        format=_CONSOLE_FORMAT,
     )
 
     # 确保日志目录存在
@@ -28,8 +38,11 @@ def setup_logging() -> None:
         rotation=f"{settings.log_file_size} MB",
         retention=f"{settings.log_retention_days} days",
         level="DEBUG",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} | {message}",
+        format=_FILE_FORMAT,
         encoding="utf-8",
+        colorize=False,
+        # 格式化和写文件放到后台线程，不阻塞调用方
+        enqueue=True,
     )
 
     # 错误日志单独文件
@@ -38,8 +51,10 @@ def setup_logging() -> None:
         rotation=f"{settings.log_file_size} MB",
         retention=f"{settings.log_retention_days} days",
         level="ERROR",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} | {message}",
+        format=_FILE_FORMAT,
         encoding="utf-8",
+        colorize=False,
+        enqueue=True,
     )
 
     logger.info("Logging system initialized")
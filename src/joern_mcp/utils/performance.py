@@ -6,15 +6,23 @@
 
 import asyncio
 import json
+import re
 import time
 import zlib
 from collections import defaultdict
 from dataclasses import dataclass, field
+from itertools import accumulate
 from typing import Any
 
 from cachetools import LRUCache, TTLCache
 from loguru import logger
 
+# 昂贵操作（一次扫描匹配所有关键字）
+_EXPENSIVE_OPS_PATTERN = re.compile(r"repeat|flows|reachableBy|sinks|sources")
+# 括号（只遍历括号字符而不是整个查询）
+_PAREN_PATTERN = re.compile(r"[()]")
+_PAREN_DELTA = {"(": 1, ")": -1}
+
 
 @dataclass
 class PerformanceMetrics:
@@ -40,6 +48,10 @@ class PerformanceMetrics:
 
     # 查询时间分布 (P50, P95, P99)
     query_times: list = field(default_factory=list)
+    # query_times 的排序缓存，记录新查询时失效
+    _sorted_times: list | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def record_query(self, duration: float, success: bool = True, cached: bool = False):
         """记录一次查询"""
@@ -58,6 +70,7 @@ class PerformanceMetrics:
         self.min_time = min(self.min_time, duration)
         self.max_time = max(self.max_time, duration)
         self.query_times.append(duration)
+        self._sorted_times = None
 
         # 只保留最近1000条记录
         if len(self.query_times) > 1000:
@@ -84,14 +97,29 @@ class PerformanceMetrics:
 
     def get_percentile(self, percentile: int) -> float:
         """获取百分位数（P50, P95, P99）"""
-        if not self.query_times:
+        return self._percentile_of(self._get_sorted_times(), percentile)
+
+    def _get_sorted_times(self) -> list:
+        """获取排序后的查询时间（缓存到下一次记录查询）"""
+        if self._sorted_times is None:
+            self._sorted_times = sorted(self.query_times)
+        return self._sorted_times
+
+    @staticmethod
+    def _percentile_of(sorted_times: list, percentile: int) -> float:
+        """从已排序的列表中取百分位数（相邻样本线性插值）"""
+        if not sorted_times:
             return 0.0
-        sorted_times = sorted(self.query_times)
-        index = int(len(sorted_times) * percentile / 100)
-        return sorted_times[min(index, len(sorted_times) - 1)]
+        rank = (len(sorted_times) - 1) * percentile / 100
+        lower = int(rank)
+        upper = min(lower + 1, len(sorted_times) - 1)
+        low, high = sorted_times[lower], sorted_times[upper]
+        return low + (high - low) * (rank - lower)
 
     def to_dict(self) -> dict:
         """转换为字典"""
+        # 只排序一次，供所有百分位共用
+        sorted_times = self._get_sorted_times()
         return {
             "total_queries": self.total_queries,
             "successful_queries": self.successful_queries,
@@ -101,9 +129,9 @@ class PerformanceMetrics:
             if self.min_time != float("inf")
             else 0.0,
             "max_time": round(self.max_time, 3),
-            "p50": round(self.get_percentile(50), 3),
-            "p95": round(self.get_percentile(95), 3),
-            "p99": round(self.get_percentile(99), 3),
+            "p50": round(self._percentile_of(sorted_times, 50), 3),
+            "p95": round(self._percentile_of(sorted_times, 95), 3),
+            "p99": round(self._percentile_of(sorted_times, 99), 3),
             "cache_hits": self.cache_hits,
             "cache_misses": self.cache_misses,
             "cache_hit_rate": round(self.get_cache_hit_rate(), 2),
@@ -165,7 +193,7 @@ class HybridCache:
                 self.hot_cache[key] = value
                 del self.cold_cache[key]
                 self.stats["promotions"] += 1
-                logger.debug(f"Cache key promoted to hot: {key}")
+                logger.debug("Cache key promoted to hot: {}", key)
 
             return self._decompress(value)
 
@@ -187,6 +215,10 @@ class HybridCache:
 
     def _compress(self, value: Any) -> Any:
         """压缩值（如果需要）"""
+        # 已经是压缩形式（例如从另一层缓存取出的原始条目），直接复用
+        if isinstance(value, dict) and value.get("_compressed"):
+            return value
+
         # 尝试序列化
         if isinstance(value, (dict, list)):
             serialized = json.dumps(value).encode()
@@ -247,8 +279,11 @@ class AdaptiveSemaphore:
         self.current_limit = min_concurrent
         self.target_response_time = target_response_time
 
+        # 始终复用同一个信号量，调整时增减许可而不是重建，避免丢失等待者
         self.semaphore = asyncio.Semaphore(self.current_limit)
         self.lock = asyncio.Lock()
+        # 收缩时尚未收回的许可数，在释放时抵扣
+        self._pending_shrink = 0
 
         # 性能监控
         self.recent_times: list = []
@@ -260,7 +295,28 @@ class AdaptiveSemaphore:
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        self.semaphore.release()
+        if self._pending_shrink > 0:
+            # 收回一个许可：不归还给信号量
+            self._pending_shrink -= 1
+        else:
+            self.semaphore.release()
+
+    async def _resize(self, old_limit: int, new_limit: int):
+        """在同一个信号量上增减许可"""
+        delta = new_limit - old_limit
+        if delta > 0:
+            # 先抵消尚未收回的许可，剩余部分直接释放
+            absorbed = min(delta, self._pending_shrink)
+            self._pending_shrink -= absorbed
+            for _ in range(delta - absorbed):
+                self.semaphore.release()
+        else:
+            for _ in range(-delta):
+                if self.semaphore.locked():
+                    # 许可都在使用中，等占用者退出时再收回
+                    self._pending_shrink += 1
+                else:
+                    await self.semaphore.acquire()
 
     async def adjust(self, response_time: float):
         """根据响应时间调整并发限制"""
@@ -271,28 +327,34 @@ class AdaptiveSemaphore:
         if self.query_count % self.adjustment_interval != 0:
             return
 
-        # 计算平均响应时间
-        avg_time = sum(self.recent_times) / len(self.recent_times)
-        self.recent_times = []  # 清空
+        # 计算平均响应时间（先换出列表再计算）
+        recent_times, self.recent_times = self.recent_times, []
+        avg_time = sum(recent_times) / len(recent_times)
+
+        # 大多数情况下限制不变，无需加锁
+        if self._target_limit(avg_time) == self.current_limit:
+            return
 
         async with self.lock:
+            # 加锁后重新计算，期间限制可能已被其他协程调整
             old_limit = self.current_limit
-
-            # 响应时间过长，减少并发
-            if avg_time > self.target_response_time * 1.5:
-                new_limit = max(self.min_concurrent, self.current_limit - 2)
-            # 响应时间很快，增加并发
-            elif avg_time < self.target_response_time * 0.5:
-                new_limit = min(self.max_concurrent, self.current_limit + 2)
-            else:
-                new_limit = self.current_limit
+            new_limit = self._target_limit(avg_time)
 
             if new_limit != old_limit:
                 self.current_limit = new_limit
-                # 重新创建信号量
-                self.semaphore = asyncio.Semaphore(self.current_limit)
+                await self._resize(old_limit, new_limit)
                 logger.info(f"Adjusted concurrent limit: {old_limit} -> {new_limit}")
 
+    def _target_limit(self, avg_time: float) -> int:
+        """根据平均响应时间计算目标并发限制"""
+        # 响应时间过长，减少并发
+        if avg_time > self.target_response_time * 1.5:
+            return max(self.min_concurrent, self.current_limit - 2)
+        # 响应时间很快，增加并发
+        if avg_time < self.target_response_time * 0.5:
+            return min(self.max_concurrent, self.current_limit + 2)
+        return self.current_limit
+
     def get_current_limit(self) -> int:
         """获取当前并发限制"""
         return self.current_limit
@@ -318,21 +380,17 @@ class QueryComplexityAnalyzer:
         complexity += length_score
 
         # 2. 嵌套深度（括号层数）
-        max_depth = 0
-        current_depth = 0
-        for char in query:
-            if char == "(":
-                current_depth += 1
-                max_depth = max(max_depth, current_depth)
-            elif char == ")":
-                current_depth -= 1
+        # 对括号增量做前缀和，取最大值即为最大深度（在C层完成）
+        max_depth = max(
+            accumulate(
+                map(_PAREN_DELTA.__getitem__, _PAREN_PATTERN.findall(query)),
+                initial=0,
+            )
+        )
         complexity += min(max_depth, 3)
 
-        # 3. 特殊操作
-        expensive_ops = ["repeat", "flows", "reachableBy", "sinks", "sources"]
-        for op in expensive_ops:
-            if op in query:
-                complexity += 1
+        # 3. 特殊操作（每种操作只计一次）
+        complexity += len(set(_EXPENSIVE_OPS_PATTERN.findall(query)))
 
         complexity = min(complexity, 10)
 
@@ -7,14 +7,25 @@ from loguru import logger
 
 
 def find_free_port(
-    start_port: int = 20000, end_port: int = 30000, max_attempts: int = 100
+    start_port: int | None = None,
+    end_port: int | None = None,
+    max_attempts: int = 100,
+    host: str = "localhost",
 ) -> int:
     """查找一个可用的端口
 
+    未指定端口范围时绑定端口 0，由内核直接分配一个空闲的临时端口（一次系统调用）。
+    指定范围时在范围内逐个随机探测。
+
+    Note:
+        两种方式都只保证返回时端口空闲，socket 关闭后到调用方真正绑定之前，
+        端口仍可能被其他进程占用。
+
     Args:
-        start_port: 起始端口号
+        start_port: 起始端口号（与 end_port 同时指定时按范围查找）
         end_port: 结束端口号
-        max_attempts: 最大尝试次数
+        max_attempts: 按范围查找时的最大尝试次数
+        host: 主机地址
 
     Returns:
         可用的端口号
@@ -22,10 +33,17 @@ def find_free_port(
     Raises:
         RuntimeError: 如果找不到可用端口
     """
+    if start_port is None or end_port is None:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind((host, 0))
+            port = sock.getsockname()[1]
+        logger.debug(f"Found free port: {port} (assigned by OS)")
+        return port
+
     for attempt in range(max_attempts):
         port = random.randint(start_port, end_port)
 
-        if is_port_available(port):
+        if is_port_available(port, host):
             logger.debug(f"Found free port: {port} (attempt {attempt + 1})")
             return port
 
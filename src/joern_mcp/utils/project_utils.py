@@ -8,46 +8,36 @@
 
 import re
 
+from cachetools import TTLCache
 from loguru import logger
 
+# 项目探测查询返回的元组，如 '(true, false, "p1,p2")'（项目列表可选）
+_PROJECT_PROBE_PATTERN = re.compile(
+    r'\(\s*(true|false)\s*,\s*(true|false)\s*(?:,\s*"?([^"]*?)"?\s*)?\)',
+    re.IGNORECASE,
+)
 
-def _parse_boolean_result(stdout: str) -> bool | None:
-    """解析 Joern 返回的布尔值结果
+# 已验证存在且已加载 CPG 的项目，键为 (查询执行器, 项目名称)
+# （短 TTL，避免每次工具调用都查询 Joern；执行器重建后自然失效）
+_PROJECT_CACHE: TTLCache = TTLCache(maxsize=128, ttl=30)
+# 工作区项目列表快照，键为查询执行器（很短的 TTL，仅用于错误提示）
+_PROJECTS_LIST_CACHE: TTLCache = TTLCache(maxsize=16, ttl=5)
 
-    Joern 返回格式可能是：
-    - "true" 或 "false"
-    - "val res0: Boolean = true"
-    - "res0: Boolean = false"
-
-    Args:
-        stdout: Joern 输出
 
-    Returns:
-        True, False, 或 None（无法解析）
-    """
-    if not stdout:
-        return None
+def invalidate_project_cache(project_name: str | None = None) -> None:
+    """使项目验证缓存失效
 
-    clean = stdout.strip().lower()
+    切换、关闭、删除或重新导入项目后调用。工作区项目列表快照总是一并清空。
 
-    # 直接是 true/false
-    if clean == "true":
-        return True
-    if clean == "false":
-        return False
-
-    # 从 "val res0: Boolean = true" 格式提取
-    match = re.search(r"=\s*(true|false)", clean)
-    if match:
-        return match.group(1) == "true"
-
-    # 检查是否包含 true/false（最后的手段）
-    if "true" in clean and "false" not in clean:
-        return True
-    if "false" in clean and "true" not in clean:
-        return False
-
-    return None
+    Args:
+        project_name: 项目名称，为 None 时清空全部缓存
+    """
+    _PROJECTS_LIST_CACHE.clear()
+    if project_name is None:
+        _PROJECT_CACHE.clear()
+        return
+    for key in [key for key in _PROJECT_CACHE if key[1] == project_name]:
+        _PROJECT_CACHE.pop(key, None)
 
 
 async def list_available_projects(query_executor) -> list[str]:
@@ -57,8 +47,12 @@ async def list_available_projects(query_executor) -> list[str]:
         query_executor: 查询执行器
 
     Returns:
-        项目名称列表
+        项目名称列表（同一执行器在短时间内复用上次结果）
     """
+    cached = _PROJECTS_LIST_CACHE.get(query_executor)
+    if cached is not None:
+        return list(cached)
+
     try:
         query = "workspace.projects.map(_.name)"
         result = await query_executor.execute(query)
@@ -70,13 +64,111 @@ async def list_available_projects(query_executor) -> list[str]:
             projects = safe_parse_joern_response(stdout, default=[])
             if not isinstance(projects, list):
                 projects = [projects] if projects else []
+            _PROJECTS_LIST_CACHE[query_executor] = tuple(projects)
             return projects
         return []
     except Exception as e:
-        logger.debug(f"Failed to list projects: {e}")
+        logger.debug("Failed to list projects: {}", e)
         return []
 
 
+def _parse_project_probe(
+    stdout: str,
+) -> tuple[bool, bool, list[str] | None] | None:
+    """解析项目探测查询的结果
+
+    Joern 返回格式可能是：
+    - "(true, false)"
+    - 'val res0: (Boolean, Boolean, String) = (false, false, "p1,p2")'
+
+    Args:
+        stdout: Joern 输出
+
+    Returns:
+        (项目存在, CPG已加载, 可用项目列表)，或 None（无法解析）。
+        输出中不含项目列表时，列表为 None。
+    """
+    if not stdout:
+        return None
+
+    match = _PROJECT_PROBE_PATTERN.search(stdout)
+    if not match:
+        return None
+    names = match.group(3)
+    available = None
+    if names is not None:
+        available = [name.strip() for name in names.split(",") if name.strip()]
+    return (
+        match.group(1).lower() == "true",
+        match.group(2).lower() == "true",
+        available,
+    )
+
+
+async def _project_not_found_error(
+    query_executor, project_name: str, available: list[str] | None = None
+) -> str:
+    """构建项目不存在的错误消息（附带可用项目列表）"""
+    if available is None:
+        available = await list_available_projects(query_executor)
+    if available:
+        return (
+            f"Project '{project_name}' not found in workspace. "
+            f"Available projects: {', '.join(available)}"
+        )
+    return (
+        f"Project '{project_name}' not found in workspace. "
+        f"No projects available. Use parse_project to import a project first."
+    )
+
+
+async def _probe_project(
+    query_executor, project_name: str
+) -> tuple[bool, bool, str | None]:
+    """用一次查询同时检查项目是否存在、其 CPG 是否已加载，并取回可用项目列表
+
+    项目列表随探测结果一并返回，项目不存在时无需再查询一次。
+
+    Args:
+        query_executor: 查询执行器
+        project_name: 项目名称
+
+    Returns:
+        tuple: (项目存在, CPG已加载, 错误消息)
+    """
+    project = f'workspace.project("{project_name}")'
+    query = (
+        f"({project}.isDefined, {project}.flatMap(_.cpg).isDefined, "
+        f'workspace.projects.map(_.name).mkString(","))'
+    )
+    result = await query_executor.execute(query, format="raw")
+
+    if not result.get("success"):
+        stderr = result.get("stderr", "Unknown error")
+        # 检查是否是编译错误（项目不存在导致的）
+        if "Not Found Error" in stderr or "not a member" in stderr:
+            return False, False, f"Project '{project_name}' not found in workspace"
+        return False, False, f"Failed to check project: {stderr}"
+
+    stdout = result.get("stdout", "").strip()
+    probe = _parse_project_probe(stdout)
+    if probe is None:
+        # 无法解析结果，记录警告
+        logger.warning(f"Cannot parse project probe result: {stdout}")
+        return (
+            False,
+            False,
+            f"Cannot determine if project '{project_name}' exists. Raw output: {stdout[:100]}",
+        )
+
+    exists, has_cpg, available = probe
+    if not exists:
+        # 附带可用项目列表，提供更好的错误提示
+        error = await _project_not_found_error(query_executor, project_name, available)
+        return False, False, error
+    return True, has_cpg, None
+
+
 async def validate_project_exists(
     query_executor, project_name: str
 ) -> tuple[bool, str | None]:
@@ -91,42 +183,12 @@ async def validate_project_exists(
             - (True, None) 如果项目存在
             - (False, error_message) 如果项目不存在
     """
-    try:
-        query = f'workspace.project("{project_name}").isDefined'
-        result = await query_executor.execute(query, format="raw")
+    if (query_executor, project_name) in _PROJECT_CACHE:
+        return True, None
 
-        if result.get("success"):
-            stdout = result.get("stdout", "").strip()
-            is_defined = _parse_boolean_result(stdout)
-
-            if is_defined is True:
-                return True, None
-            elif is_defined is False:
-                # 获取可用项目列表，提供更好的错误提示
-                available = await list_available_projects(query_executor)
-                if available:
-                    return False, (
-                        f"Project '{project_name}' not found in workspace. "
-                        f"Available projects: {', '.join(available)}"
-                    )
-                else:
-                    return False, (
-                        f"Project '{project_name}' not found in workspace. "
-                        f"No projects available. Use parse_project to import a project first."
-                    )
-            else:
-                # 无法解析结果，记录警告
-                logger.warning(f"Cannot parse isDefined result: {stdout}")
-                return (
-                    False,
-                    f"Cannot determine if project '{project_name}' exists. Raw output: {stdout[:100]}",
-                )
-        else:
-            stderr = result.get("stderr", "Unknown error")
-            # 检查是否是编译错误（项目不存在导致的）
-            if "Not Found Error" in stderr or "not a member" in stderr:
-                return False, f"Project '{project_name}' not found in workspace"
-            return False, f"Failed to check project: {stderr}"
+    try:
+        exists, _, error = await _probe_project(query_executor, project_name)
+        return exists, error
     except Exception as e:
         logger.exception(f"Error validating project: {e}")
         return False, str(e)
@@ -137,6 +199,8 @@ async def validate_project_has_cpg(
 ) -> tuple[bool, str | None]:
     """验证项目是否已加载 CPG
 
+    项目存在性和 CPG 加载状态通过同一次查询获取，验证通过的结果会短暂缓存。
+
     Args:
         query_executor: 查询执行器
         project_name: 项目名称
@@ -144,63 +208,42 @@ async def validate_project_has_cpg(
     Returns:
         tuple: (有CPG, 错误消息)
     """
+    if (query_executor, project_name) in _PROJECT_CACHE:
+        return True, None
+
     try:
-        # 先检查项目是否存在
-        exists, error = await validate_project_exists(query_executor, project_name)
+        exists, has_cpg, error = await _probe_project(query_executor, project_name)
         if not exists:
             return False, error
-
-        # 简化验证：直接尝试一个简单的 CPG 查询
-        # 如果查询成功，说明 CPG 已加载；如果失败，说明 CPG 未加载
-        # 使用 method.size 因为它快速且可靠
-        query = f'workspace.project("{project_name}").get.cpg.get.method.size'
-        result = await query_executor.execute(query, format="raw")
-
-        if result.get("success"):
-            stdout = result.get("stdout", "").strip()
-            # 如果输出包含数字（包括 0），说明 CPG 已加载
-            if re.search(r"\d+", stdout):
-                return True, None
-            # 如果输出不包含数字但查询成功，可能是空 CPG（仍然算已加载）
-            logger.debug(f"CPG query returned non-numeric: {stdout}")
+        if has_cpg:
+            _PROJECT_CACHE[query_executor, project_name] = True
             return True, None
 
-        # 查询失败，检查具体错误
-        stderr = result.get("stderr", "")
-
-        # "None.get" 错误表示 Option 为空（项目或 CPG 不存在）
-        if "None.get" in stderr or "NoSuchElementException" in stderr:
-            # 项目存在但 CPG 未加载，尝试加载它
-            # 注意：不要返回错误，而是直接尝试用 open 加载
-            logger.info(
-                f"CPG for project '{project_name}' not loaded, attempting to load..."
-            )
-
-            # 使用 open 命令加载 CPG
-            open_query = f'open("{project_name}")'
-            open_result = await query_executor.execute(open_query, format="raw")
-
-            if open_result.get("success"):
-                # 再次验证 CPG 是否加载成功
-                verify_result = await query_executor.execute(query, format="raw")
-                if verify_result.get("success"):
-                    stdout = verify_result.get("stdout", "").strip()
-                    if re.search(r"\d+", stdout):
-                        logger.info(
-                            f"Successfully loaded CPG for project '{project_name}'"
-                        )
-                        return True, None
-
-            # 加载失败
-            return False, (
-                f"Project '{project_name}' exists but CPG could not be loaded. "
-                f"Try using switch_project('{project_name}') first."
-            )
-
-        # 其他错误
-        return (
-            False,
-            f"Failed to access CPG for project '{project_name}': {stderr[:200]}",
+        # 项目存在但 CPG 未加载，尝试用 open 命令加载
+        logger.info(
+            f"CPG for project '{project_name}' not loaded, attempting to load..."
+        )
+
+        open_query = f'open("{project_name}")'
+        open_result = await query_executor.execute(open_query, format="raw")
+
+        if open_result.get("success"):
+            # 再次验证 CPG 是否加载成功
+            # 使用 method.size 因为它快速且可靠
+            query = f'workspace.project("{project_name}").get.cpg.get.method.size'
+            verify_result = await query_executor.execute(query, format="raw")
+            if verify_result.get("success"):
+                stdout = verify_result.get("stdout", "").strip()
+                # method.size 返回 "val res0: Int = 12" 或 "12"，取等号后的值判断
+                if stdout.rsplit("=", 1)[-1].strip().isdigit():
+                    logger.info(f"Successfully loaded CPG for project '{project_name}'")
+                    _PROJECT_CACHE[query_executor, project_name] = True
+                    return True, None
+
+        # 加载失败
+        return False, (
+            f"Project '{project_name}' exists but CPG could not be loaded. "
+            f"Try using switch_project('{project_name}') first."
         )
 
     except Exception as e:
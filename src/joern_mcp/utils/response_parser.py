@@ -9,12 +9,24 @@ Joern Server 响应解析工具
 """
 
 import contextlib
+import copy
 import json
 import re
+from functools import lru_cache
 from typing import Any
 
+import orjson
 from loguru import logger
 
+# 复用的 JSON 解码器（用于 raw_decode 从输出中间解析 JSON，orjson 不支持）
+_DECODER = json.JSONDecoder()
+# Scala List(...) 格式
+_SCALA_LIST_PATTERN = re.compile(r"List\s*\((.*)\)", re.DOTALL)
+# Scala REPL 结果行 `val res1: Type = ...`（前面可能有警告等日志行）
+_REPL_VAL_PATTERN = re.compile(r"^val [^\n]*? = ", re.MULTILINE)
+# 小于该长度的响应会缓存解析结果（项目列表、计数等样板查询）
+_PARSE_CACHE_MAX_LENGTH = 4096
+
 
 def _parse_scala_string(value: str) -> str:
     """解析 Scala 字符串值
@@ -36,6 +48,39 @@ def _parse_scala_string(value: str) -> str:
     return value
 
 
+def _scan_quoted_strings(content: str) -> list[str]:
+    """单次线性扫描，提取所有带引号的字符串（保留原始转义序列）
+
+    Args:
+        content: 待扫描的文本
+
+    Returns:
+        各字符串引号内的原始内容（未闭合的字符串会被丢弃）
+    """
+    items = []
+    buffer: list[str] = []
+    in_string = False
+    escaped = False
+    for char in content:
+        if not in_string:
+            if char == '"':
+                in_string = True
+            continue
+        if escaped:
+            buffer.append(char)
+            escaped = False
+        elif char == "\\":
+            buffer.append(char)
+            escaped = True
+        elif char == '"':
+            items.append("".join(buffer))
+            buffer.clear()
+            in_string = False
+        else:
+            buffer.append(char)
+    return items
+
+
 def _parse_scala_list(value: str) -> list:
     """解析 Scala List 格式
 
@@ -48,7 +93,7 @@ def _parse_scala_list(value: str) -> list:
         解析后的 Python 列表
     """
     # 匹配 List(...) 格式
-    list_match = re.match(r"List\s*\((.*)\)", value, re.DOTALL)
+    list_match = _SCALA_LIST_PATTERN.match(value)
     if not list_match:
         return []
 
@@ -57,94 +102,180 @@ def _parse_scala_list(value: str) -> list:
         return []
 
     # 解析列表元素（支持带引号的字符串）
-    items = []
-    # 使用正则匹配每个带引号的字符串
-    string_pattern = r'"([^"\\]*(?:\\.[^"\\]*)*)"'
-    for match in re.finditer(string_pattern, content):
+    if "\\" not in content:
+        # 无转义字符时，引号之间的片段就是各个元素（丢弃未闭合的最后一段）
+        parts = content.split('"')
+        if len(parts) % 2 == 0:
+            parts.pop()
+        return parts[1::2]
+
+    return [
         # 处理转义字符
-        item = match.group(1).replace('\\"', '"').replace("\\n", "\n")
-        items.append(item)
+        item.replace('\\"', '"').replace("\\n", "\n")
+        for item in _scan_quoted_strings(content)
+    ]
 
-    return items
 
+def _find_json_start(text: str) -> int:
+    """查找文本中第一个 [ 或 { 的位置
 
-def _recursively_parse_json(data: Any, max_depth: int = 10) -> Any:
-    """递归解析可能多重编码的 JSON 数据
+    Args:
+        text: 文本
+
+    Returns:
+        位置索引，未找到时返回 -1
+    """
+    bracket, brace = text.find("["), text.find("{")
+    if bracket == -1 or brace == -1:
+        return max(bracket, brace)
+    return min(bracket, brace)
+
+
+def _assignment_value(text: str) -> str | None:
+    """提取简单等号赋值的值，如 `res1: String = "..."`
 
     Args:
-        data: 要解析的数据
-        max_depth: 最大递归深度
+        text: 文本
 
     Returns:
-        完全解析后的数据
+        第一个等号之后到行尾的内容，或 None
     """
-    if max_depth <= 0:
-        return data
-
-    # 如果是字符串，尝试解析为 JSON
-    if isinstance(data, str):
-        data_stripped = data.strip()
-
-        # 移除多余的首尾双引号（如 '""[...]""'）
-        while (
-            data_stripped.startswith('""')
-            and data_stripped.endswith('""')
-            and len(data_stripped) > 4
-        ):
-            data_stripped = data_stripped[2:-2]
-
-        # 处理转义的 JSON 字符串（如 \n, \", \\）
-        if "\\n" in data_stripped or '\\"' in data_stripped:
-            # 尝试解码转义字符
+    eq = text.find("=")
+    if eq == -1:
+        return None
+    line_end = text.find("\n", eq)
+    value = text[eq + 1 : line_end if line_end != -1 else None].strip()
+    return value or None
+
+
+def _strip_doubled_quotes(text: str) -> str:
+    """移除多层多余的首尾双引号（如 '""[...]""'）
+
+    先用下标计算要剥离的层数，最后只切片一次，避免大响应被反复复制。
+
+    Args:
+        text: 已去除首尾空白的文本
+
+    Returns:
+        剥离后的文本
+    """
+    start, end = 0, len(text)
+    while (
+        end - start > 4
+        and text.startswith('""', start)
+        and text.endswith('""', start, end)
+    ):
+        start += 2
+        end -= 2
+    return text[start:end] if start else text
+
+
+def _decode_json_string(data: str) -> tuple[Any, bool]:
+    """尝试把字符串解码为 JSON（处理多余引号和转义）
+
+    Args:
+        data: 字符串
+
+    Returns:
+        tuple: (值, 是否解码成功)
+            - (解码后的值, True) 如果字符串是 JSON
+            - (去除空白后的字符串, False) 否则
+    """
+    data_stripped = data.strip()
+
+    # 绝大多数字符串（标识符、代码片段）不是编码过的 JSON，
+    # 直接返回，避免下面的引号剥离和异常开销
+    if not data_stripped or data_stripped[0] not in '"[{':
+        return data_stripped, False
+
+    # 移除多余的首尾双引号（如 '""[...]""'）
+    data_stripped = _strip_doubled_quotes(data_stripped)
+
+    # 处理转义的 JSON 字符串（如 \n, \", \\）
+    if "\\n" in data_stripped or '\\"' in data_stripped:
+        # 尝试解码转义字符
+        try:
+            # 先尝试作为 JSON 字符串解码
+            if data_stripped.startswith('"') and data_stripped.endswith('"'):
+                decoded = orjson.loads(data_stripped)
+                if isinstance(decoded, str):
+                    data_stripped = decoded
+        except orjson.JSONDecodeError:
+            pass
+
+    # 单层引号包裹
+    while (
+        data_stripped.startswith('"')
+        and data_stripped.endswith('"')
+        and len(data_stripped) > 2
+    ):
+        # 检查内部是否像 JSON（确认后再切片，避免无谓的字符串复制）
+        if data_stripped[1] in "[{":
+            data_stripped = data_stripped[1:-1]
+            break
+        else:
+            # 检查是否是转义的 JSON
             try:
-                # 先尝试作为 JSON 字符串解码
-                if data_stripped.startswith('"') and data_stripped.endswith('"'):
-                    decoded = json.loads(data_stripped)
-                    if isinstance(decoded, str):
-                        data_stripped = decoded
-            except json.JSONDecodeError:
+                test_parse = orjson.loads(data_stripped)
+                if isinstance(test_parse, str) and (
+                    test_parse.startswith("[") or test_parse.startswith("{")
+                ):
+                    data_stripped = test_parse
+                    continue
+            except orjson.JSONDecodeError:
                 pass
+            break
 
-        # 单层引号包裹
-        while (
-            data_stripped.startswith('"')
-            and data_stripped.endswith('"')
-            and len(data_stripped) > 2
-        ):
-            inner = data_stripped[1:-1]
-            # 检查内部是否像 JSON
-            if inner.startswith("[") or inner.startswith("{"):
-                data_stripped = inner
-                break
-            else:
-                # 检查是否是转义的 JSON
-                try:
-                    test_parse = json.loads(data_stripped)
-                    if isinstance(test_parse, str) and (
-                        test_parse.startswith("[") or test_parse.startswith("{")
-                    ):
-                        data_stripped = test_parse
-                        continue
-                except json.JSONDecodeError:
-                    pass
-                break
+    # 尝试解析为 JSON
+    with contextlib.suppress(orjson.JSONDecodeError):
+        return orjson.loads(data_stripped), True
 
-        # 尝试解析为 JSON
-        with contextlib.suppress(json.JSONDecodeError):
-            parsed = json.loads(data_stripped)
-            return _recursively_parse_json(parsed, max_depth - 1)
+    return data_stripped, False
 
-        return data_stripped
 
-    # 如果是列表，递归解析每个元素
-    if isinstance(data, list):
-        return [_recursively_parse_json(item, max_depth - 1) for item in data]
+def _recursively_parse_json(data: Any, max_depth: int = 10) -> Any:
+    """解析可能多重编码的 JSON 数据
 
-    # 如果是字典，递归解析每个值
-    if isinstance(data, dict):
-        return {k: _recursively_parse_json(v, max_depth - 1) for k, v in data.items()}
+    使用显式栈迭代遍历，避免大结果集上的深层函数调用。
+    每进入一层容器或解码一层字符串，剩余深度减一。
 
-    return data
+    Args:
+        data: 要解析的数据
+        max_depth: 最大解析深度
+
+    Returns:
+        完全解析后的数据
+    """
+    # 根节点放在一个单元素列表中，统一用 (容器, 键) 回填结果
+    root: list[Any] = [None]
+    stack: list[tuple[Any, int, Any, Any]] = [(data, max_depth, root, 0)]
+
+    while stack:
+        value, depth, parent, key = stack.pop()
+
+        if depth <= 0:
+            parent[key] = value
+        elif isinstance(value, str):
+            # 如果是字符串，尝试解析为 JSON，成功则继续解析解码结果
+            decoded, ok = _decode_json_string(value)
+            if ok:
+                stack.append((decoded, depth - 1, parent, key))
+            else:
+                parent[key] = decoded
+        elif isinstance(value, list):
+            # 如果是列表，解析每个元素
+            items: list[Any] = [None] * len(value)
+            parent[key] = items
+            stack.extend((item, depth - 1, items, i) for i, item in enumerate(value))
+        elif isinstance(value, dict):
+            # 如果是字典，解析每个值（先占位以保持键顺序）
+            mapping = dict.fromkeys(value)
+            parent[key] = mapping
+            stack.extend((v, depth - 1, mapping, k) for k, v in value.items())
+        else:
+            parent[key] = value
+
+    return root[0]
 
 
 def parse_joern_response(stdout: str) -> Any:
@@ -173,34 +304,28 @@ def parse_joern_response(stdout: str) -> Any:
     clean_output = stdout.strip()
 
     # 预处理：移除多余的首尾双引号
-    while (
-        clean_output.startswith('""')
-        and clean_output.endswith('""')
-        and len(clean_output) > 4
-    ):
-        clean_output = clean_output[2:-2]
+    clean_output = _strip_doubled_quotes(clean_output)
 
-    # 尝试方法 1: 直接解析 JSON
+    # 尝试方法 1: 直接解析 JSON（.toJson 输出的常见情况，无需任何正则）
+    # 整段 JSON 用 orjson 解码，大结果集比标准库快数倍
     try:
-        data = json.loads(clean_output)
+        data = orjson.loads(clean_output)
         # 递归处理多重编码
         return _recursively_parse_json(data)
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         pass
 
     # 尝试方法 2: 从 Scala REPL 输出提取值
     # 格式: `val res1: Type = ...`
-    repl_match = re.search(
-        r"val\s+\w+:\s*[\w\[\]]+\s*=\s*(.+)", clean_output, re.DOTALL
-    )
+    repl_match = _REPL_VAL_PATTERN.search(clean_output)
     if repl_match:
-        value_part = repl_match.group(1).strip()
+        value_part = clean_output[repl_match.end() :].strip()
 
         # 2a: 尝试解析为 JSON
         try:
-            data = json.loads(value_part)
+            data = orjson.loads(value_part)
             return _recursively_parse_json(data)
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
 
         # 2b: 尝试解析 Scala List 格式
@@ -212,26 +337,31 @@ def parse_joern_response(stdout: str) -> Any:
             return _parse_scala_string(value_part)
 
     # 尝试方法 3: 查找第一个 JSON 数组或对象
-    json_match = re.search(r"(\[.*\]|\{.*\})", clean_output, re.DOTALL)
-    if json_match:
+    # 从第一个 [ 或 { 开始用 raw_decode 一次解析出完整的 JSON 值
+    json_start = _find_json_start(clean_output)
+    if json_start != -1:
         try:
-            data = json.loads(json_match.group(1))
+            data, _ = _DECODER.raw_decode(clean_output, json_start)
             return _recursively_parse_json(data)
         except json.JSONDecodeError:
             pass
 
     # 尝试方法 4: 检查是否是简单的等号赋值格式
-    simple_match = re.search(r"=\s*(.+)$", clean_output, re.MULTILINE)
-    if simple_match:
-        value = simple_match.group(1).strip()
-        # 尝试解析为字符串
-        if value.startswith('"') and value.endswith('"'):
-            return _parse_scala_string(value)
+    value = _assignment_value(clean_output)
+    # 尝试解析为字符串
+    if value and value.startswith('"') and value.endswith('"'):
+        return _parse_scala_string(value)
 
     logger.warning(f"Cannot parse Joern response: {clean_output[:200]}...")
     raise ValueError(f"Cannot parse Joern response: {clean_output[:100]}...")
 
 
+@lru_cache(maxsize=256)
+def _parse_cached(stdout: str) -> Any:
+    """带 LRU 缓存的 parse_joern_response（只用于短响应）"""
+    return parse_joern_response(stdout)
+
+
 def safe_parse_joern_response(stdout: str, default: Any = None) -> Any:
     """
     安全解析 Joern Server 响应（不抛出异常）
@@ -244,12 +374,47 @@ def safe_parse_joern_response(stdout: str, default: Any = None) -> Any:
         解析后的数据或默认值
     """
     try:
+        if stdout and len(stdout) < _PARSE_CACHE_MAX_LENGTH:
+            # 缓存结果被多个调用方共享，返回深拷贝防止嵌套的字典和列表被修改
+            result = _parse_cached(stdout)
+            if isinstance(result, (list, dict)):
+                return copy.deepcopy(result)
+            return result
         return parse_joern_response(stdout)
     except (ValueError, json.JSONDecodeError) as e:
-        logger.debug(f"Failed to parse response: {e}")
+        logger.debug("Failed to parse response: {}", e)
         return default if default is not None else []
 
 
+def safe_parse_joern_list(stdout: str) -> list:
+    """
+    安全解析预期为列表的 Joern Server 响应（不抛出异常）
+
+    `.toJson` 查询的输出通常直接是 JSON 数组，此时只解码一次，
+    跳过 REPL / Scala List / 字符串等分支；其他格式回退到通用解析。
+
+    Args:
+        stdout: Joern Server 返回的 stdout 内容
+
+    Returns:
+        解析后的列表（非列表结果会被包装为单元素列表，空结果返回空列表）
+    """
+    clean_output = stdout.strip() if stdout else ""
+    if clean_output.startswith("["):
+        try:
+            data = orjson.loads(clean_output)
+        except orjson.JSONDecodeError:
+            pass
+        else:
+            if isinstance(data, list):
+                return _recursively_parse_json(data)
+
+    result = safe_parse_joern_response(stdout, default=[])
+    if not isinstance(result, list):
+        result = [result] if result else []
+    return result
+
+
 def extract_json_from_repl(stdout: str) -> str | None:
     """
     从 Scala REPL 输出中提取原始 JSON 字符串
@@ -266,12 +431,8 @@ def extract_json_from_repl(stdout: str) -> str | None:
     clean_output = stdout.strip()
 
     # 如果本身就是 JSON，直接返回
-    if clean_output.startswith("[") or clean_output.startswith("{"):
+    if clean_output[:1] in ("[", "{"):
         return clean_output
 
     # 从 Scala REPL 格式提取
-    match = re.search(r"=\s*(.+)$", clean_output, re.MULTILINE)
-    if match:
-        return match.group(1).strip()
-
-    return None
+    return _assignment_value(clean_output)
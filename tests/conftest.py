@@ -2,7 +2,7 @@
 共享测试fixtures和utilities
 """
 
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -13,59 +13,64 @@ async def mock_get_safe_cpg_prefix(executor, project_name):
     return "cpg", None
 
 
+# 需要 mock get_safe_cpg_prefix 的服务模块
+_SERVICE_MODULES = (
+    "joern_mcp.services.callgraph",
+    "joern_mcp.services.dataflow",
+    "joern_mcp.services.taint",
+)
+
+# 单元测试目录
+_UNIT_TEST_DIRS = (
+    "test_services",
+    "test_tools",
+    "test_joern",
+    "test_utils",
+    "test_prompts",
+)
+
+
 @pytest.fixture
-def mock_project_validation():
+def mock_project_validation(monkeypatch):
     """Mock 所有服务的 get_safe_cpg_prefix
 
-    注意：此 fixture 不再是 autouse，需要在测试中显式使用。
     单元测试目录会自动使用此 fixture（见下方的 autouse fixture）。
     集成测试和 e2e 测试不会自动使用此 fixture。
     """
-    with (
-        patch(
-            "joern_mcp.services.callgraph.get_safe_cpg_prefix", mock_get_safe_cpg_prefix
-        ),
-        patch(
-            "joern_mcp.services.dataflow.get_safe_cpg_prefix", mock_get_safe_cpg_prefix
-        ),
-        patch("joern_mcp.services.taint.get_safe_cpg_prefix", mock_get_safe_cpg_prefix),
-    ):
-        yield
+    for module in _SERVICE_MODULES:
+        monkeypatch.setattr(f"{module}.get_safe_cpg_prefix", mock_get_safe_cpg_prefix)
 
 
 @pytest.fixture(autouse=True)
-def auto_mock_for_unit_tests(request, mock_project_validation):
+def auto_mock_for_unit_tests(request):
     """
     仅对单元测试自动应用 mock_project_validation。
     集成测试和 e2e 测试不会自动 mock。
     """
-    # 检查测试文件路径，只对单元测试目录自动 mock
-    test_path = str(request.fspath)
-    unit_test_dirs = [
-        "test_services",
-        "test_tools",
-        "test_joern",
-        "test_utils",
-        "test_prompts",
-    ]
-
-    # 如果是单元测试目录，使用 mock
-    if any(d in test_path for d in unit_test_dirs):
-        # mock 已经在 mock_project_validation fixture 中应用了
-        yield
-    else:
-        # 集成测试和 e2e 测试不 mock
-        yield
+    # 按测试文件所在目录名精确匹配，避免 e2e/test_tools_e2e.py 之类的路径误判
+    if request.path.parent.name in _UNIT_TEST_DIRS:
+        request.getfixturevalue("mock_project_validation")
+
+
+# mock_joern_server 的默认查询结果（只读，返回给调用方的是副本）
+_EMPTY_QUERY_RESULT = {"success": True, "stdout": "[]"}
+
+
+async def _fast_execute_query_async(*args, **kwargs):
+    """返回默认查询结果的轻量协程，避免 AsyncMock 记录调用的开销"""
+    return dict(_EMPTY_QUERY_RESULT)
 
 
 @pytest.fixture
 def mock_joern_server():
-    """Mock Joern Server Manager"""
+    """Mock Joern Server Manager
+
+    execute_query_async 是普通协程而不是 AsyncMock，
+    需要断言调用情况的测试请自行替换为 AsyncMock。
+    """
     server = MagicMock()
-    server.execute_query.return_value = {"success": True, "stdout": "[]"}
-    server.execute_query_async = AsyncMock(
-        return_value={"success": True, "stdout": "[]"}
-    )
+    server.execute_query.return_value = dict(_EMPTY_QUERY_RESULT)
+    server.execute_query_async = _fast_execute_query_async
     server.is_running.return_value = True
     return server
 
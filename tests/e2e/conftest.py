@@ -4,73 +4,36 @@ E2E测试的fixture配置
 提供测试所需的环境和数据
 """
 
-import asyncio
+import os
+import shutil
+from pathlib import Path
 
 import pytest
-
-from joern_mcp.joern.server import JoernServerManager
-from joern_mcp.utils.port_utils import find_free_port
-
-
-@pytest.fixture(scope="session")
-def event_loop():
-    """创建 session 级别的 event loop"""
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
-
-
-@pytest.fixture(scope="session")
-def joern_server(event_loop):
-    """启动Joern服务器供E2E测试使用（session级别）"""
-    port = find_free_port(start_port=35000, end_port=35100)
-    manager = JoernServerManager(port=port)
-
-    # 启动服务器
-    async def start_server():
-        await manager.start()
-        return manager
-
-    manager = event_loop.run_until_complete(start_server())
-
-    yield manager
-
-    # 清理
-    async def stop_server():
-        await manager.stop()
-
-    event_loop.run_until_complete(stop_server())
-
-
-@pytest.fixture(autouse=True)
-def cleanup_projects_after_test(joern_server, event_loop):
-    """每个测试后清理所有项目，防止项目累积导致性能下降"""
-    yield
-
-    # 测试结束后清理所有项目
-    async def cleanup():
-        try:
-            # 删除所有项目
-            await joern_server.execute_query_async(
-                "workspace.projects.foreach(p => delete(p.name))"
-            )
-        except Exception:
-            # 忽略清理错误
-            pass
-
-    event_loop.run_until_complete(cleanup())
-
-
-@pytest.fixture
-def sample_c_code(tmp_path):
-    """创建示例C代码用于测试"""
-    code_dir = tmp_path / "sample_code"
-    code_dir.mkdir()
-
-    # 创建一个简单的C程序
-    main_c = code_dir / "main.c"
-    main_c.write_text(
-        """
+import pytest_asyncio
+
+from joern_mcp.joern.executor_optimized import OptimizedQueryExecutor
+from joern_mcp.mcp_server import server_state
+from joern_mcp.services.callgraph import CallGraphService
+from joern_mcp.services.dataflow import DataFlowService
+from joern_mcp.services.taint import TaintAnalysisService
+from joern_mcp.utils.response_parser import safe_parse_joern_response
+from tests.joern_fixtures import (
+    ACTIVE_SERVERS,
+    cleanup_projects_after_module,  # noqa: F401 - 导入即注册 autouse fixture
+    delete_all_projects,
+    start_server,
+    warm_up,
+)
+
+from .test_helpers import (
+    SHARED_SAMPLE_PROJECT,
+    import_code_safe,
+    import_cpg_safe,
+    open_project_safe,
+)
+
+# 一个简单的C程序
+_MAIN_C = """
 #include <stdio.h>
 #include <string.h>
 
@@ -96,21 +59,9 @@ int main(int argc, char *argv[]) {
     return 0;
 }
 """
-    )
 
-    return code_dir
-
-
-@pytest.fixture
-def sample_java_code(tmp_path):
-    """创建示例Java代码用于测试"""
-    code_dir = tmp_path / "sample_java"
-    code_dir.mkdir()
-
-    # 创建一个简单的Java程序
-    main_java = code_dir / "Main.java"
-    main_java.write_text(
-        """
+# 一个简单的Java程序
+_MAIN_JAVA = """
 public class Main {
     public static void unsafeMethod(String input) {
         System.out.println(input);
@@ -129,6 +80,199 @@ public class Main {
     }
 }
 """
-    )
 
+# 语言 -> (目录名, 文件名, 源码)，源码在导入时编码一次
+_SAMPLE_SOURCES = {
+    "c": ("sample_code", "main.c", _MAIN_C.encode()),
+    "java": ("sample_java", "Main.java", _MAIN_JAVA.encode()),
+}
+
+# 多项目测试用的第二个C程序
+_ADD_C = """
+int add(int a, int b) {
+    return a + b;
+}
+
+int main() {
+    return add(1, 2);
+}
+"""
+# 无法解析的C代码，用于导入失败测试
+_INVALID_C = "this is not valid C code ###"
+# 第二个示例项目的名称
+_SECONDARY_SAMPLE_PROJECT = "shared_secondary"
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def joern_server(tmp_path_factory):
+    """启动Joern服务器供E2E测试使用（session级别）
+
+    使用 pytest-xdist 并行运行时，每个 worker 在自己的工作目录中启动独立的
+    Joern 进程，workspace 和活动项目互不干扰。
+    """
+    worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+    cwd = None
+    if worker_id:
+        cwd = tmp_path_factory.getbasetemp().parent / f"joern-{worker_id}"
+        cwd.mkdir(exist_ok=True)
+
+    # 启动服务器并预热
+    manager = await start_server(cwd)
+    await warm_up(manager)
+    # 记录测试导入的项目，见 delete_dirty_projects
+    manager._dirty = set()
+    ACTIVE_SERVERS.append(manager)
+
+    yield manager
+
+    ACTIVE_SERVERS.remove(manager)
+    # 清理：session 结束时统一删除测试项目，然后停止服务器
+    await delete_all_projects(manager)
+    await manager.stop()
+
+
+@pytest.fixture(scope="session")
+def session_executor(joern_server):
+    """整个 session 共用的查询执行器，查询缓存在测试间复用（session级别）"""
+    return OptimizedQueryExecutor(joern_server)
+
+
+@pytest.fixture(scope="session")
+def callgraph_service(session_executor):
+    """共用 session_executor 的调用图服务（session级别）"""
+    return CallGraphService(session_executor)
+
+
+@pytest.fixture(scope="session")
+def dataflow_service(session_executor):
+    """共用 session_executor 的数据流服务（session级别）"""
+    return DataFlowService(session_executor)
+
+
+@pytest.fixture(scope="session")
+def taint_service(session_executor):
+    """共用 session_executor 的污点分析服务（session级别）"""
+    return TaintAnalysisService(session_executor)
+
+
+@pytest.fixture(scope="session")
+def mcp_server_state(joern_server, session_executor):
+    """设置 server_state，模拟 MCP Server 环境（session级别）
+
+    使用 session_executor，结束时不重置。
+    """
+    server_state.joern_server = joern_server
+    server_state.query_executor = session_executor
+    return server_state
+
+
+def _make_sample_dir(tmp_path_factory, language: str) -> Path:
+    """按语言创建示例代码目录"""
+    dir_name, file_name, source = _SAMPLE_SOURCES[language]
+    code_dir = tmp_path_factory.mktemp(dir_name)
+    (code_dir / file_name).write_bytes(source)
+    return code_dir
+
+
+@pytest.fixture(scope="session")
+def sample_c_code(tmp_path_factory):
+    """创建示例C代码用于测试（session级别，内容固定，所有测试共享）"""
+    return _make_sample_dir(tmp_path_factory, "c")
+
+
+@pytest.fixture(scope="session")
+def sample_java_code(tmp_path_factory):
+    """创建示例Java代码用于测试（session级别，内容固定，所有测试共享）"""
+    return _make_sample_dir(tmp_path_factory, "java")
+
+
+@pytest.fixture(scope="session")
+def secondary_c_code(tmp_path_factory):
+    """创建第二个示例C项目用于多项目测试（session级别）"""
+    code_dir = tmp_path_factory.mktemp("sample_code2")
+    (code_dir / "test.c").write_text(_ADD_C)
+    return code_dir
+
+
+@pytest.fixture(scope="session")
+def invalid_c_code(tmp_path_factory):
+    """创建无效的C代码目录用于导入失败测试（session级别）"""
+    code_dir = tmp_path_factory.mktemp("invalid_code")
+    (code_dir / "invalid.c").write_text(_INVALID_C)
     return code_dir
+
+
+@pytest.fixture(scope="session")
+def exports_dir(tmp_path_factory):
+    """导出测试共用的输出目录（session级别，文件名需各自唯一）"""
+    return tmp_path_factory.mktemp("exports")
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def imported_sample_project(joern_server, sample_c_code):
+    """导入一次示例C代码，供所有只读测试共用，返回项目名称（session级别）
+
+    该项目不记入 joern_server._dirty，模块级清理不会删除它，session 结束时统一删除。
+    """
+    await import_code_safe(joern_server, str(sample_c_code), SHARED_SAMPLE_PROJECT)
+    joern_server._dirty.discard(SHARED_SAMPLE_PROJECT)
+    return SHARED_SAMPLE_PROJECT
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def imported_secondary_project(joern_server, secondary_c_code, session_executor):
+    """导入一次第二个示例C项目，返回项目名称（session级别）"""
+    await import_code_safe(
+        joern_server, str(secondary_c_code), _SECONDARY_SAMPLE_PROJECT
+    )
+    # 导入会切换活动项目，session_executor 中不带项目前缀的查询结果随之失效
+    session_executor.clear_cache()
+    joern_server._dirty.discard(_SECONDARY_SAMPLE_PROJECT)
+    return _SECONDARY_SAMPLE_PROJECT
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def shared_sample_project(
+    joern_server, imported_sample_project, session_executor
+):
+    """激活共享示例项目并返回其名称
+
+    只读测试用它代替各自导入示例代码；其他测试可能切换了活动项目，
+    因此每个测试前重新 open，使不带项目前缀的 cpg 查询落在共享项目上。
+    open 直接发给服务器，不经过执行器，需要手动清空 session_executor 的缓存。
+    """
+    await open_project_safe(joern_server, imported_sample_project)
+    session_executor.clear_cache()
+    return imported_sample_project
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def sample_c_cpg(joern_server, imported_sample_project, tmp_path_factory):
+    """示例C代码的 CPG 二进制文件路径（session级别）
+
+    保存共享示例项目后复制其 cpg.bin，需要独立项目的测试类用 class_project
+    加载该文件，避免重复解析源码。
+    """
+    await joern_server.execute_query_async("save")
+    result = await joern_server.execute_query_async(
+        f'workspace.project("{imported_sample_project}").get.path.toString'
+    )
+    project_dir = safe_parse_joern_response(result.get("stdout", ""), default="")
+
+    target = tmp_path_factory.mktemp("cpg") / "sample.bin"
+    shutil.copyfile(Path(project_dir) / "cpg.bin", target)
+    return target
+
+
+@pytest_asyncio.fixture(scope="class", loop_scope="session")
+async def class_project(request, joern_server, sample_c_cpg, session_executor):
+    """按测试类的 PROJECT_NAME 从示例 CPG 导入项目（每个类一次）
+
+    测试类声明 PROJECT_NAME 并通过 usefixtures("class_project") 启用，
+    取代各类中重复的导入 fixture。导入会切换活动项目，因此同时清空
+    session_executor 的缓存。
+    """
+    project_name = request.cls.PROJECT_NAME
+    await import_cpg_safe(joern_server, str(sample_c_cpg), project_name)
+    session_executor.clear_cache()
+    return project_name
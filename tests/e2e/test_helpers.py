@@ -5,13 +5,41 @@ E2E测试辅助函数
 """
 
 import asyncio
+import functools
+import os
+import re
+import weakref
+from collections import OrderedDict
 from collections.abc import Callable
-from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+from cpgqls_client import import_code_query as _import_code_query
+
+from joern_mcp.joern.executor_optimized import mutates_workspace
+
+# 只读测试共用的示例项目名称
+SHARED_SAMPLE_PROJECT = "shared_sample"
+
+# 健康检查查询
+_HEALTHCHECK_QUERY = "1 + 1"
+# 健康检查已通过的服务器，查询出现传输错误时移除
+_healthy: weakref.WeakSet = weakref.WeakSet()
+
+# 各服务器的只读查询结果缓存，键为查询，按 LRU 淘汰
+_QUERY_CACHE_SIZE = 256
+_query_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+# 显式指定项目的查询（结果不依赖活动项目，MCP 工具切换项目后仍然有效）
+_PROJECT_SCOPED_QUERY_PATTERN = re.compile(r'^\s*workspace\.project\("[^"]+"\)')
+
+
+@functools.lru_cache(maxsize=256)
+def _build_import_query(code_path: str, project_name: str) -> str:
+    """构建 importCode 查询（相同路径和项目名在测试间复用）"""
+    return _import_code_query(code_path, project_name)
+
 
 async def run_sync_in_executor(func: Callable, *args, **kwargs) -> Any:
-    """在线程池中运行同步函数，避免event loop冲突
+    """在线程中运行同步函数，避免event loop冲突
 
     Args:
         func: 要执行的同步函数
@@ -21,19 +49,15 @@ async def run_sync_in_executor(func: Callable, *args, **kwargs) -> Any:
     Returns:
         函数执行结果
     """
-    loop = asyncio.get_event_loop()
-    executor = ThreadPoolExecutor(max_workers=1)
-
-    try:
-        result = await loop.run_in_executor(executor, lambda: func(*args, **kwargs))
-        return result
-    finally:
-        executor.shutdown(wait=True)
+    return await asyncio.to_thread(func, *args, **kwargs)
 
 
 async def import_code_safe(joern_server, code_path: str, project_name: str) -> dict:
     """安全地导入代码（支持HTTP和cpgqls客户端）
 
+    同一服务器上相同的 (代码路径, 项目名) 只导入一次：项目仍在 workspace 中时
+    直接打开它并返回首次导入的结果，避免重复生成 CPG。
+
     Args:
         joern_server: JoernServerManager实例
         code_path: 代码路径
@@ -41,39 +65,144 @@ async def import_code_safe(joern_server, code_path: str, project_name: str) -> d
 
     Returns:
         导入结果字典
+
+    Note:
+        导入的项目名会记录到 joern_server._dirty（由测试 fixture 提供），
+        供清理 fixture 只删除测试创建的项目。
     """
-    from cpgqls_client import import_code_query
+    return await _import_once(
+        joern_server,
+        os.path.realpath(code_path),
+        project_name,
+        _build_import_query(code_path, project_name),
+    )
+
 
-    # 构建查询
-    query = import_code_query(code_path, project_name)
+async def import_cpg_safe(joern_server, cpg_path: str, project_name: str) -> dict:
+    """从已生成的 CPG 二进制文件导入项目，跳过源码解析
+
+    缓存和清理记录与 import_code_safe 相同。
+
+    Args:
+        joern_server: JoernServerManager实例
+        cpg_path: CPG 文件路径
+        project_name: 项目名称
+
+    Returns:
+        导入结果字典
+    """
+    return await _import_once(
+        joern_server,
+        os.path.realpath(cpg_path),
+        project_name,
+        f'importCpg("{cpg_path}", "{project_name}")',
+    )
+
+
+async def _import_once(joern_server, path: str, project_name: str, query: str) -> dict:
+    """执行导入查询，同一 (路径, 项目名) 在项目仍存在时只导入一次"""
+    key = (path, project_name)
+    cache = getattr(joern_server, "_import_cache", None)
+    if cache is None:
+        cache = joern_server._import_cache = {}
+
+    cached = cache.get(key)
+    if cached is not None:
+        # 打开已有项目使其成为当前项目；项目已被清理时返回 false，需要重新导入
+        check = await joern_server.execute_query_async(
+            f'open("{project_name}").isDefined'
+        )
+        if check.get("success") and check.get("stdout", "").rstrip().endswith("true"):
+            return cached
+        del cache[key]
 
     # 使用异步方法（HTTP客户端已原生支持异步）
     result = await joern_server.execute_query_async(query)
+    # 重新导入会替换同名项目的 CPG，已缓存的查询结果失效
+    invalidate_query_cache(joern_server)
+
+    dirty = getattr(joern_server, "_dirty", None)
+    if dirty is not None:
+        dirty.add(project_name)
+    if result.get("success"):
+        cache[key] = result
 
     return result
 
 
-async def execute_query_safe(joern_server, query: str) -> dict:
+async def open_project_safe(joern_server, project_name: str) -> dict:
+    """打开项目使其成为活动项目
+
+    Args:
+        joern_server: JoernServerManager实例
+        project_name: 项目名称
+
+    Returns:
+        查询结果字典
+    """
+    return await joern_server.execute_query_async(f'open("{project_name}")')
+
+
+async def execute_query_safe(joern_server, query: str, use_cache: bool = True) -> dict:
     """安全地执行查询（支持HTTP和cpgqls客户端）
 
+    以 `workspace.project("...")` 显式指定项目的只读查询，成功结果按查询缓存，
+    同一 session 中重复的查询不再访问 Joern。依赖活动项目的查询（如 `cpg.method`）
+    不缓存，因为 MCP 工具也会切换活动项目；改变工作区的查询清空该服务器的缓存。
+
     Args:
         joern_server: JoernServerManager实例
         query: Joern查询字符串
+        use_cache: 是否使用缓存
 
     Returns:
         查询结果字典
     """
-    # 使用异步方法（HTTP客户端已原生支持异步）
-    result = await joern_server.execute_query_async(query)
-
+    if mutates_workspace(query):
+        invalidate_query_cache(joern_server)
+        return await _execute(joern_server, query)
+
+    use_cache = use_cache and _PROJECT_SCOPED_QUERY_PATTERN.match(query) is not None
+    cache = _query_cache.get(joern_server)
+    if use_cache and cache is not None and query in cache:
+        cache.move_to_end(query)
+        return dict(cache[query])
+
+    result = await _execute(joern_server, query)
+
+    if use_cache and result.get("success"):
+        if cache is None:
+            cache = _query_cache[joern_server] = OrderedDict()
+        cache[query] = dict(result)
+        if len(cache) > _QUERY_CACHE_SIZE:
+            cache.popitem(last=False)
     return result
 
 
-async def health_check_safe(joern_server) -> bool:
+async def _execute(joern_server, query: str) -> dict:
+    """执行查询，传输错误时清除该服务器的健康标记"""
+    try:
+        # 使用异步方法（HTTP客户端已原生支持异步）
+        return await joern_server.execute_query_async(query)
+    except Exception:
+        _healthy.discard(joern_server)
+        raise
+
+
+def invalidate_query_cache(joern_server) -> None:
+    """清空服务器的查询结果缓存（导入或删除项目后调用）"""
+    _query_cache.pop(joern_server, None)
+
+
+async def health_check_safe(joern_server, force: bool = False) -> bool:
     """安全地执行健康检查，避免event loop冲突
 
+    session 级服务器的健康状态在其生命周期内不变：首次检查通过后直接返回 True，
+    直到 execute_query_safe 遇到传输错误才重新检查。
+
     Args:
         joern_server: JoernServerManager实例
+        force: 忽略缓存，强制执行检查
 
     Returns:
         True表示健康，False表示不健康
@@ -81,9 +210,20 @@ async def health_check_safe(joern_server) -> bool:
     if not joern_server.client:
         return False
 
+    if not force and joern_server in _healthy:
+        return True
+
     try:
         # 使用简单查询进行健康检查
-        result = await execute_query_safe(joern_server, "1 + 1")
-        return result.get("success", False)
+        result = await execute_query_safe(
+            joern_server, _HEALTHCHECK_QUERY, use_cache=False
+        )
+        healthy = result.get("success", False)
     except Exception:
-        return False
+        healthy = False
+
+    if healthy:
+        _healthy.add(joern_server)
+    else:
+        _healthy.discard(joern_server)
+    return healthy
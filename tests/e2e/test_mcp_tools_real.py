@@ -10,11 +10,56 @@ MCP工具真实端到端测试
 更新：所有查询工具现在要求 project_name 作为第一个必填参数。
 """
 
+import uuid
+
 import pytest
 from loguru import logger
 
-from joern_mcp.joern.executor_optimized import OptimizedQueryExecutor as QueryExecutor
 from joern_mcp.mcp_server import server_state
+from joern_mcp.server import execute_query, health_check
+from joern_mcp.tools.batch import batch_function_analysis, batch_query
+from joern_mcp.tools.callgraph import (
+    get_call_chain,
+    get_call_graph,
+    get_callees,
+    get_callers,
+)
+from joern_mcp.tools.cfg import (
+    analyze_control_structures,
+    get_control_flow_graph,
+    get_dominators,
+)
+from joern_mcp.tools.dataflow import (
+    analyze_variable_flow,
+    find_data_dependencies,
+    track_dataflow,
+)
+from joern_mcp.tools.export import export_analysis_results, export_cpg
+from joern_mcp.tools.performance import (
+    clear_query_cache,
+    get_cache_stats,
+    get_performance_stats,
+    get_system_health,
+)
+from joern_mcp.tools.project import (
+    delete_project,
+    get_current_project,
+    list_projects,
+    parse_project,
+    switch_project,
+)
+from joern_mcp.tools.query import get_function_code, list_functions, search_code
+from joern_mcp.tools.taint import (
+    check_taint_flow,
+    find_vulnerabilities,
+    list_vulnerability_rules,
+)
+from joern_mcp.utils.project_utils import get_cpg_prefix, invalidate_project_cache
+from joern_mcp.utils.response_parser import (
+    safe_parse_joern_list,
+)
+
+from .test_helpers import SHARED_SAMPLE_PROJECT, import_cpg_safe
 
 
 def get_tool_fn(tool):
@@ -28,44 +73,79 @@ def get_tool_fn(tool):
     return tool
 
 
+def assert_tool_response(result, project: str | None = None) -> None:
+    """校验工具返回的基本结构：字典、包含 success 字段，可选校验项目名称"""
+    assert isinstance(result, dict), f"返回类型错误: {type(result)}"
+    assert "success" in result, "缺少 success 字段"
+    if project is not None:
+        assert result.get("project") == project, "返回的项目名称不匹配"
+
+
+# 预先解包所有用到的 MCP 工具，测试中直接调用原始函数
+ANALYZE_CONTROL_STRUCTURES_FN = get_tool_fn(analyze_control_structures)
+ANALYZE_VARIABLE_FLOW_FN = get_tool_fn(analyze_variable_flow)
+BATCH_FUNCTION_ANALYSIS_FN = get_tool_fn(batch_function_analysis)
+BATCH_QUERY_FN = get_tool_fn(batch_query)
+CHECK_TAINT_FLOW_FN = get_tool_fn(check_taint_flow)
+CLEAR_QUERY_CACHE_FN = get_tool_fn(clear_query_cache)
+DELETE_PROJECT_FN = get_tool_fn(delete_project)
+EXECUTE_QUERY_FN = get_tool_fn(execute_query)
+EXPORT_ANALYSIS_RESULTS_FN = get_tool_fn(export_analysis_results)
+EXPORT_CPG_FN = get_tool_fn(export_cpg)
+FIND_DATA_DEPENDENCIES_FN = get_tool_fn(find_data_dependencies)
+FIND_VULNERABILITIES_FN = get_tool_fn(find_vulnerabilities)
+GET_CACHE_STATS_FN = get_tool_fn(get_cache_stats)
+GET_CALL_CHAIN_FN = get_tool_fn(get_call_chain)
+GET_CALL_GRAPH_FN = get_tool_fn(get_call_graph)
+GET_CALLEES_FN = get_tool_fn(get_callees)
+GET_CALLERS_FN = get_tool_fn(get_callers)
+GET_CONTROL_FLOW_GRAPH_FN = get_tool_fn(get_control_flow_graph)
+GET_CURRENT_PROJECT_FN = get_tool_fn(get_current_project)
+GET_DOMINATORS_FN = get_tool_fn(get_dominators)
+GET_FUNCTION_CODE_FN = get_tool_fn(get_function_code)
+GET_PERFORMANCE_STATS_FN = get_tool_fn(get_performance_stats)
+GET_SYSTEM_HEALTH_FN = get_tool_fn(get_system_health)
+HEALTH_CHECK_FN = get_tool_fn(health_check)
+LIST_FUNCTIONS_FN = get_tool_fn(list_functions)
+LIST_PROJECTS_FN = get_tool_fn(list_projects)
+LIST_VULNERABILITY_RULES_FN = get_tool_fn(list_vulnerability_rules)
+PARSE_PROJECT_FN = get_tool_fn(parse_project)
+SEARCH_CODE_FN = get_tool_fn(search_code)
+SWITCH_PROJECT_FN = get_tool_fn(switch_project)
+TRACK_DATAFLOW_FN = get_tool_fn(track_dataflow)
+
+
 # 测试项目名称常量
 TEST_PROJECT = "e2e_test_project"
+# 项目管理测试共用的项目名称
+LIFECYCLE_PROJECT = "test_project_lifecycle"
+# 导出测试使用的项目名称
+EXPORT_PROJECT = "export_tools_test"
+
+# 列出 workspace 中的项目名称
+_LIST_PROJECT_NAMES_QUERY = "workspace.projects.map(_.name).l"
+
+
+# 模拟 MCP Server 环境，见 conftest.mcp_server_state
+pytestmark = pytest.mark.usefixtures("mcp_server_state")
 
 
 @pytest.mark.e2e
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("class_project")
 class TestMCPToolsReal:
     """测试 MCP 工具的真实调用
 
     这些测试使用真实的 Joern Server，验证工具的完整功能。
     """
 
-    @pytest.fixture(autouse=True)
-    async def setup_server_state(self, joern_server, sample_c_code):
-        """设置 server_state，模拟 MCP Server 环境"""
-        # 设置全局状态
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-
-        # 导入测试代码
-        from tests.e2e.test_helpers import import_code_safe
-
-        result = await import_code_safe(joern_server, str(sample_c_code), TEST_PROJECT)
-        logger.info(f"Import result: {result}")
-
-        yield
-
-        # 清理
-        server_state.joern_server = None
-        server_state.query_executor = None
+    PROJECT_NAME = TEST_PROJECT
 
     async def test_health_check(self):
         """测试 health_check 工具"""
-        from joern_mcp.server import health_check
-
-        result = await get_tool_fn(health_check)()
+        result = await HEALTH_CHECK_FN()
 
-        logger.info(f"health_check result: {result}")
+        logger.debug("health_check result: {}", result)
 
         assert isinstance(result, dict), f"返回类型错误: {type(result)}"
         assert "status" in result, "缺少 status 字段"
@@ -74,17 +154,15 @@ class TestMCPToolsReal:
 
     async def test_execute_query(self):
         """测试 execute_query 工具"""
-        from joern_mcp.server import execute_query
-
-        # 测试简单查询
-        result = await get_tool_fn(execute_query)("cpg.method.name.l")
+        # 只取一个方法名，避免传输整个方法列表
+        result = await EXECUTE_QUERY_FN("cpg.method.name.take(1).l")
 
-        logger.info(f"execute_query result: {result}")
+        logger.debug("execute_query result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
+        assert_tool_response(result)
         assert result["success"], f"查询失败: {result.get('error')}"
         assert "result" in result, "缺少 result 字段"
+        assert len(safe_parse_joern_list(result["result"])) == 1, "应返回一个方法名"
 
 
 @pytest.mark.e2e
@@ -92,142 +170,101 @@ class TestMCPToolsReal:
 class TestProjectToolsReal:
     """测试项目管理工具的真实调用"""
 
-    @pytest.fixture(autouse=True)
-    async def setup_server_state(self, joern_server):
-        """设置 server_state"""
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-        yield
-        server_state.joern_server = None
-        server_state.query_executor = None
+    @pytest.fixture(scope="class", autouse=True)
+    async def restore_workspace(self, joern_server):
+        """记录本类测试前的项目列表，全部测试结束后只删除新建的项目"""
+        before = await joern_server.execute_query_async(_LIST_PROJECT_NAMES_QUERY)
+        before_names = set(safe_parse_joern_list(before.get("stdout", "")))
 
-    async def test_parse_project(self, sample_c_code):
-        """测试 parse_project 工具"""
-        from joern_mcp.tools.project import parse_project
+        yield
 
-        result = await get_tool_fn(parse_project)(
-            str(sample_c_code), "test_parse_project"
-        )
+        after = await joern_server.execute_query_async(_LIST_PROJECT_NAMES_QUERY)
+        created = set(safe_parse_joern_list(after.get("stdout", ""))) - before_names
+        if created:
+            names = ", ".join(f'"{name}"' for name in sorted(created))
+            await joern_server.execute_query_async(
+                f"List({names}).foreach(name => delete(name))"
+            )
+            for name in created:
+                invalidate_project_cache(name)
 
-        logger.info(f"parse_project result: {result}")
+    @pytest.fixture(scope="class")
+    async def parsed_project(self, sample_c_code):
+        """用 parse_project 解析一次示例代码，本类的测试共用该项目
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result["success"], f"解析失败: {result.get('error')}"
-        assert result["project_name"] == "test_parse_project"
+        返回 (项目名称, parse_project 结果)。
+        """
+        result = await PARSE_PROJECT_FN(str(sample_c_code), LIFECYCLE_PROJECT)
+        logger.debug("parse_project result: {}", result)
+        return LIFECYCLE_PROJECT, result
 
-    async def test_list_projects(self, sample_c_code):
-        """测试 list_projects 工具 - 诊断解析问题"""
-        from joern_mcp.tools.project import list_projects, parse_project
+    async def test_parse_project(self, parsed_project):
+        """测试 parse_project 工具"""
+        project_name, result = parsed_project
 
-        # 先导入一个项目
-        await get_tool_fn(parse_project)(str(sample_c_code), "test_list_project")
+        assert_tool_response(result)
+        assert result["success"], f"解析失败: {result.get('error')}"
+        assert result["project_name"] == project_name
 
-        result = await get_tool_fn(list_projects)()
+    async def test_list_projects(self, parsed_project):
+        """测试 list_projects 工具，并直接校验工具解析出的项目列表"""
+        result = await LIST_PROJECTS_FN()
 
-        logger.info(f"list_projects result: {result}")
+        logger.debug("list_projects result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
+        assert_tool_response(result)
 
-        # 如果失败，输出详细错误信息用于诊断
+        # 仅在失败时才额外查询 workspace 用于诊断
         if not result.get("success"):
-            logger.error(f"list_projects 失败: {result}")
-            # 尝试直接查询以诊断问题
             raw_result = await server_state.joern_server.execute_query_async(
                 "workspace.projects.name.l"
             )
-            logger.info(f"原始 workspace 查询结果: {raw_result}")
+            pytest.fail(f"列出项目失败: {result.get('error')}，原始结果: {raw_result}")
 
-        assert result["success"], f"列出项目失败: {result.get('error')}"
-        assert "projects" in result, "缺少 projects 字段"
         assert "count" in result, "缺少 count 字段"
-        assert isinstance(result["projects"], list), "projects 应该是列表"
-
-    async def test_list_projects_raw_response(self, sample_c_code):
-        """验证 list_projects 使用的查询格式能正确解析"""
-        from joern_mcp.tools.project import parse_project
-
-        # 先导入一个项目
-        await get_tool_fn(parse_project)(str(sample_c_code), "test_raw_response")
-
-        # 执行新的简化查询（与 list_projects 实现一致）
-        query = 'workspace.projects.map(p => s"${p.name}:::${p.inputPath}").l'
-
-        result = await server_state.joern_server.execute_query_async(query)
-        logger.info(f"原始 Joern 响应 - success: {result.get('success')}")
-        logger.info(f"原始 Joern 响应 - stdout: {result.get('stdout')[:200]}...")
-        logger.info(f"原始 Joern 响应 - stderr: {result.get('stderr')}")
-
-        # 验证原始响应
-        assert result.get("success"), f"查询失败: {result.get('stderr')}"
-
-        # 尝试解析响应
-        from joern_mcp.utils.response_parser import (
-            safe_parse_joern_response,
-        )
-
-        stdout = result.get("stdout", "")
-
-        # 测试安全解析
-        parsed = safe_parse_joern_response(stdout, default=[])
-        logger.info(f"safe_parse_joern_response 结果: {len(parsed)} 项目")
-
-        # 验证解析结果
-        assert isinstance(parsed, list), f"解析结果应该是列表: {type(parsed)}"
-        assert len(parsed) > 0, "应该至少有一个项目"
-
-        # 验证格式（每个项目应该包含 ::: 分隔符）
-        for item in parsed:
-            assert isinstance(item, str), f"每个项目应该是字符串: {type(item)}"
-            assert ":::" in item, f"项目格式应该包含 :::, 实际: {item}"
-
-    async def test_switch_project(self, sample_c_code):
+        projects = result["projects"]
+        assert isinstance(projects, list), "projects 应该是列表"
+        assert len(projects) == result["count"], "count 与项目数量不一致"
+
+        # 工具已解析 Joern 响应，直接校验其结果而不再重复查询和解析
+        project_name, _ = parsed_project
+        assert project_name in {p["name"] for p in projects}, "缺少刚解析的项目"
+        for item in projects:
+            assert item["name"], f"项目缺少名称: {item}"
+            assert "inputPath" in item, f"项目缺少 inputPath: {item}"
+
+    async def test_switch_project(self, parsed_project):
         """测试 switch_project 工具"""
-        from joern_mcp.tools.project import parse_project, switch_project
-
-        # 先创建项目
-        await get_tool_fn(parse_project)(str(sample_c_code), "test_switch_project")
+        result = await SWITCH_PROJECT_FN(parsed_project[0])
 
-        result = await get_tool_fn(switch_project)("test_switch_project")
+        logger.debug("switch_project result: {}", result)
 
-        logger.info(f"switch_project result: {result}")
-
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
+        assert_tool_response(result)
         assert result["success"], f"切换项目失败: {result.get('error')}"
 
-    async def test_get_current_project(self, sample_c_code):
+    async def test_get_current_project(self, parsed_project):
         """测试 get_current_project 工具"""
-        from joern_mcp.tools.project import get_current_project, parse_project
-
-        # 先创建项目
-        await get_tool_fn(parse_project)(str(sample_c_code), "test_current_project")
-
-        result = await get_tool_fn(get_current_project)()
+        result = await GET_CURRENT_PROJECT_FN()
 
-        logger.info(f"get_current_project result: {result}")
+        logger.debug("get_current_project result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
+        assert_tool_response(result)
 
         # 如果失败，输出诊断信息
         if not result.get("success"):
             logger.warning(f"get_current_project 失败: {result}")
 
-    async def test_delete_project(self, sample_c_code):
-        """测试 delete_project 工具"""
-        from joern_mcp.tools.project import delete_project, parse_project
+    async def test_delete_project(self, joern_server, sample_c_cpg):
+        """测试 delete_project 工具（删除单独导入的项目，不影响本类其他测试）"""
+        project_name = f"delete_test_{uuid.uuid4().hex[:8]}"
+        imported = await import_cpg_safe(joern_server, str(sample_c_cpg), project_name)
+        assert imported.get("success"), f"导入项目失败: {imported}"
 
-        # 先创建项目
-        await get_tool_fn(parse_project)(str(sample_c_code), "test_delete_project")
+        result = await DELETE_PROJECT_FN(project_name)
 
-        result = await get_tool_fn(delete_project)("test_delete_project")
+        logger.debug("delete_project result: {}", result)
 
-        logger.info(f"delete_project result: {result}")
-
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
+        assert_tool_response(result)
         assert result["success"], f"删除项目失败: {result.get('error')}"
 
 
@@ -236,62 +273,33 @@ class TestProjectToolsReal:
 class TestQueryToolsReal:
     """测试查询工具的真实调用"""
 
-    @pytest.fixture(autouse=True)
-    async def setup_server_state(self, joern_server, sample_c_code):
-        """设置 server_state 并导入测试代码"""
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-
-        from tests.e2e.test_helpers import import_code_safe
-
-        await import_code_safe(joern_server, str(sample_c_code), "query_tools_test")
-        yield
-        server_state.joern_server = None
-        server_state.query_executor = None
-
-    async def test_list_functions(self):
+    async def test_list_functions(self, imported_sample_project):
         """测试 list_functions 工具"""
-        from joern_mcp.tools.query import list_functions
-
-        # project_name 现在是必填参数
-        result = await get_tool_fn(list_functions)("query_tools_test")
+        # project_name 现在是第一个必填参数
+        result = await LIST_FUNCTIONS_FN(imported_sample_project, limit=5)
 
-        logger.info(f"list_functions result: {result}")
+        logger.debug("list_functions result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
+        assert_tool_response(result, project=imported_sample_project)
         assert result["success"], f"列出函数失败: {result.get('error')}"
-        assert "functions" in result, "缺少 functions 字段"
-        assert result.get("project") == "query_tools_test", "返回的项目名称不匹配"
+        assert 0 < len(result["functions"]) <= 5, "函数数量应在 limit 范围内"
 
-    async def test_get_function_code(self):
+    async def test_get_function_code(self, imported_sample_project):
         """测试 get_function_code 工具"""
-        from joern_mcp.tools.query import get_function_code
-
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(get_function_code)("query_tools_test", "main")
+        result = await GET_FUNCTION_CODE_FN(imported_sample_project, "main")
 
-        logger.info(f"get_function_code result: {result}")
+        logger.debug("get_function_code result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
+        assert_tool_response(result, project=imported_sample_project)
         assert result["success"], f"获取函数代码失败: {result.get('error')}"
-        assert result.get("project") == "query_tools_test", "返回的项目名称不匹配"
 
-    async def test_search_code(self):
+    async def test_search_code(self, imported_sample_project):
         """测试 search_code 工具"""
-        from joern_mcp.tools.query import search_code
+        result = await SEARCH_CODE_FN(imported_sample_project, "main", scope="methods")
 
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(search_code)(
-            "query_tools_test", "main", scope="methods"
-        )
+        logger.debug("search_code result: {}", result)
 
-        logger.info(f"search_code result: {result}")
-
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "query_tools_test", "返回的项目名称不匹配"
+        assert_tool_response(result, project=imported_sample_project)
 
 
 @pytest.mark.e2e
@@ -299,76 +307,37 @@ class TestQueryToolsReal:
 class TestCallgraphToolsReal:
     """测试调用图工具的真实调用"""
 
-    @pytest.fixture(autouse=True)
-    async def setup_server_state(self, joern_server, sample_c_code):
-        """设置 server_state 并导入测试代码"""
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-
-        from tests.e2e.test_helpers import import_code_safe
-
-        await import_code_safe(joern_server, str(sample_c_code), "callgraph_tools_test")
-        yield
-        server_state.joern_server = None
-        server_state.query_executor = None
-
-    async def test_get_callers(self):
+    async def test_get_callers(self, imported_sample_project):
         """测试 get_callers 工具"""
-        from joern_mcp.tools.callgraph import get_callers
+        result = await GET_CALLERS_FN(imported_sample_project, "vulnerable_function")
 
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(get_callers)(
-            "callgraph_tools_test", "vulnerable_function"
-        )
+        logger.debug("get_callers result: {}", result)
 
-        logger.info(f"get_callers result: {result}")
+        assert_tool_response(result, project=imported_sample_project)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "callgraph_tools_test", "返回的项目名称不匹配"
-
-    async def test_get_callees(self):
+    async def test_get_callees(self, imported_sample_project):
         """测试 get_callees 工具"""
-        from joern_mcp.tools.callgraph import get_callees
+        result = await GET_CALLEES_FN(imported_sample_project, "main")
 
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(get_callees)("callgraph_tools_test", "main")
+        logger.debug("get_callees result: {}", result)
 
-        logger.info(f"get_callees result: {result}")
+        assert_tool_response(result, project=imported_sample_project)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "callgraph_tools_test", "返回的项目名称不匹配"
-
-    async def test_get_call_chain(self):
+    async def test_get_call_chain(self, imported_sample_project):
         """测试 get_call_chain 工具"""
-        from joern_mcp.tools.callgraph import get_call_chain
-
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(get_call_chain)(
-            "callgraph_tools_test", "main", max_depth=3
-        )
+        result = await GET_CALL_CHAIN_FN(imported_sample_project, "main", max_depth=3)
 
-        logger.info(f"get_call_chain result: {result}")
+        logger.debug("get_call_chain result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "callgraph_tools_test", "返回的项目名称不匹配"
+        assert_tool_response(result, project=imported_sample_project)
 
-    async def test_get_call_graph(self):
+    async def test_get_call_graph(self, imported_sample_project):
         """测试 get_call_graph 工具"""
-        from joern_mcp.tools.callgraph import get_call_graph
-
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(get_call_graph)(
-            "callgraph_tools_test", "main", depth=1
-        )
+        result = await GET_CALL_GRAPH_FN(imported_sample_project, "main", depth=1)
 
-        logger.info(f"get_call_graph result: {result}")
+        logger.debug("get_call_graph result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "callgraph_tools_test", "返回的项目名称不匹配"
+        assert_tool_response(result, project=imported_sample_project)
         # 验证调用图结构
         if result.get("success"):
             assert "nodes" in result, "缺少 nodes 字段"
@@ -380,63 +349,29 @@ class TestCallgraphToolsReal:
 class TestDataflowToolsReal:
     """测试数据流工具的真实调用"""
 
-    @pytest.fixture(autouse=True)
-    async def setup_server_state(self, joern_server, sample_c_code):
-        """设置 server_state 并导入测试代码"""
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-
-        from tests.e2e.test_helpers import import_code_safe
-
-        await import_code_safe(joern_server, str(sample_c_code), "dataflow_tools_test")
-        yield
-        server_state.joern_server = None
-        server_state.query_executor = None
-
-    async def test_track_dataflow(self):
+    async def test_track_dataflow(self, imported_sample_project):
         """测试 track_dataflow 工具"""
-        from joern_mcp.tools.dataflow import track_dataflow
-
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(track_dataflow)(
-            "dataflow_tools_test", "gets", "strcpy"
-        )
+        result = await TRACK_DATAFLOW_FN(imported_sample_project, "gets", "strcpy")
 
-        logger.info(f"track_dataflow result: {result}")
+        logger.debug("track_dataflow result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "dataflow_tools_test", "返回的项目名称不匹配"
+        assert_tool_response(result, project=imported_sample_project)
 
-    async def test_find_data_dependencies(self):
+    async def test_find_data_dependencies(self, imported_sample_project):
         """测试 find_data_dependencies 工具"""
-        from joern_mcp.tools.dataflow import find_data_dependencies
-
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(find_data_dependencies)(
-            "dataflow_tools_test", "main"
-        )
+        result = await FIND_DATA_DEPENDENCIES_FN(imported_sample_project, "main")
 
-        logger.info(f"find_data_dependencies result: {result}")
+        logger.debug("find_data_dependencies result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "dataflow_tools_test", "返回的项目名称不匹配"
+        assert_tool_response(result, project=imported_sample_project)
 
-    async def test_analyze_variable_flow(self):
+    async def test_analyze_variable_flow(self, imported_sample_project):
         """测试 analyze_variable_flow 工具"""
-        from joern_mcp.tools.dataflow import analyze_variable_flow
+        result = await ANALYZE_VARIABLE_FLOW_FN(imported_sample_project, "buffer")
 
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(analyze_variable_flow)(
-            "dataflow_tools_test", "buffer"
-        )
+        logger.debug("analyze_variable_flow result: {}", result)
 
-        logger.info(f"analyze_variable_flow result: {result}")
-
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "dataflow_tools_test", "返回的项目名称不匹配"
+        assert_tool_response(result, project=imported_sample_project)
 
 
 @pytest.mark.e2e
@@ -444,57 +379,29 @@ class TestDataflowToolsReal:
 class TestTaintToolsReal:
     """测试污点分析工具的真实调用"""
 
-    @pytest.fixture(autouse=True)
-    async def setup_server_state(self, joern_server, sample_c_code):
-        """设置 server_state 并导入测试代码"""
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-
-        from tests.e2e.test_helpers import import_code_safe
-
-        await import_code_safe(joern_server, str(sample_c_code), "taint_tools_test")
-        yield
-        server_state.joern_server = None
-        server_state.query_executor = None
-
-    async def test_find_vulnerabilities(self):
+    async def test_find_vulnerabilities(self, imported_sample_project):
         """测试 find_vulnerabilities 工具"""
-        from joern_mcp.tools.taint import find_vulnerabilities
+        result = await FIND_VULNERABILITIES_FN(imported_sample_project)
 
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(find_vulnerabilities)("taint_tools_test")
+        logger.debug("find_vulnerabilities result: {}", result)
 
-        logger.info(f"find_vulnerabilities result: {result}")
+        assert_tool_response(result, project=imported_sample_project)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "taint_tools_test", "返回的项目名称不匹配"
-
-    async def test_check_taint_flow(self):
+    async def test_check_taint_flow(self, imported_sample_project):
         """测试 check_taint_flow 工具"""
-        from joern_mcp.tools.taint import check_taint_flow
-
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(check_taint_flow)(
-            "taint_tools_test", "gets", "strcpy"
-        )
+        result = await CHECK_TAINT_FLOW_FN(imported_sample_project, "gets", "strcpy")
 
-        logger.info(f"check_taint_flow result: {result}")
+        logger.debug("check_taint_flow result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "taint_tools_test", "返回的项目名称不匹配"
+        assert_tool_response(result, project=imported_sample_project)
 
     async def test_list_vulnerability_rules(self):
         """测试 list_vulnerability_rules 工具"""
-        from joern_mcp.tools.taint import list_vulnerability_rules
+        result = await LIST_VULNERABILITY_RULES_FN()
 
-        result = await get_tool_fn(list_vulnerability_rules)()
+        logger.debug("list_vulnerability_rules result: {}", result)
 
-        logger.info(f"list_vulnerability_rules result: {result}")
-
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
+        assert_tool_response(result)
         if result.get("success"):
             assert "rules" in result, "缺少 rules 字段"
 
@@ -504,57 +411,29 @@ class TestTaintToolsReal:
 class TestCFGToolsReal:
     """测试控制流图工具的真实调用"""
 
-    @pytest.fixture(autouse=True)
-    async def setup_server_state(self, joern_server, sample_c_code):
-        """设置 server_state 并导入测试代码"""
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-
-        from tests.e2e.test_helpers import import_code_safe
-
-        await import_code_safe(joern_server, str(sample_c_code), "cfg_tools_test")
-        yield
-        server_state.joern_server = None
-        server_state.query_executor = None
-
-    async def test_get_control_flow_graph(self):
+    async def test_get_control_flow_graph(self, imported_sample_project):
         """测试 get_control_flow_graph 工具"""
-        from joern_mcp.tools.cfg import get_control_flow_graph
+        result = await GET_CONTROL_FLOW_GRAPH_FN(imported_sample_project, "main")
 
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(get_control_flow_graph)("cfg_tools_test", "main")
+        logger.debug("get_control_flow_graph result: {}", result)
 
-        logger.info(f"get_control_flow_graph result: {result}")
+        assert_tool_response(result, project=imported_sample_project)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "cfg_tools_test", "返回的项目名称不匹配"
-
-    async def test_analyze_control_structures(self):
+    async def test_analyze_control_structures(self, imported_sample_project):
         """测试 analyze_control_structures 工具"""
-        from joern_mcp.tools.cfg import analyze_control_structures
-
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(analyze_control_structures)("cfg_tools_test", "main")
+        result = await ANALYZE_CONTROL_STRUCTURES_FN(imported_sample_project, "main")
 
-        logger.info(f"analyze_control_structures result: {result}")
+        logger.debug("analyze_control_structures result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "cfg_tools_test", "返回的项目名称不匹配"
+        assert_tool_response(result, project=imported_sample_project)
 
-    async def test_get_dominators(self):
+    async def test_get_dominators(self, imported_sample_project):
         """测试 get_dominators 工具"""
-        from joern_mcp.tools.cfg import get_dominators
-
-        # project_name 现在是第一个必填参数
-        result = await get_tool_fn(get_dominators)("cfg_tools_test", "main")
+        result = await GET_DOMINATORS_FN(imported_sample_project, "main")
 
-        logger.info(f"get_dominators result: {result}")
+        logger.debug("get_dominators result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "cfg_tools_test", "返回的项目名称不匹配"
+        assert_tool_response(result, project=imported_sample_project)
 
 
 @pytest.mark.e2e
@@ -562,99 +441,64 @@ class TestCFGToolsReal:
 class TestBatchToolsReal:
     """测试批量操作工具的真实调用"""
 
-    @pytest.fixture(autouse=True)
-    async def setup_server_state(self, joern_server, sample_c_code):
-        """设置 server_state 并导入测试代码"""
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-
-        from tests.e2e.test_helpers import import_code_safe
-
-        await import_code_safe(joern_server, str(sample_c_code), "batch_tools_test")
-        yield
-        server_state.joern_server = None
-        server_state.query_executor = None
+    # 查询需要指定项目前缀，在类定义时拼好
+    BATCH_QUERIES = (
+        f"{get_cpg_prefix(SHARED_SAMPLE_PROJECT)}.method.name.l",
+        f"{get_cpg_prefix(SHARED_SAMPLE_PROJECT)}.call.name.l",
+    )
 
-    async def test_batch_query(self):
+    async def test_batch_query(self, imported_sample_project, session_executor):
         """测试 batch_query 工具"""
-        from joern_mcp.tools.batch import batch_query
+        assert imported_sample_project == SHARED_SAMPLE_PROJECT
+        # 执行器缓存跨测试共享，先清空，确保两个查询都真正发往 Joern
+        session_executor.clear_cache()
+        result = await BATCH_QUERY_FN(list(self.BATCH_QUERIES))
 
-        # 查询需要指定项目前缀
-        queries = [
-            'workspace.project("batch_tools_test").get.cpg.get.method.name.l',
-            'workspace.project("batch_tools_test").get.cpg.get.call.name.l',
-        ]
-        result = await get_tool_fn(batch_query)(queries)
+        logger.debug("batch_query result: {}", result)
 
-        logger.info(f"batch_query result: {result}")
+        assert_tool_response(result)
+        assert result["success"], f"批量查询失败: {result.get('error')}"
+        assert "results" in result, "缺少 results 字段"
+        for item in result["results"]:
+            assert item["success"], f"查询{item['query_index']}失败: {item}"
+        assert result["round_trips"] == 1, "批量查询应只需一次 Joern 往返"
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        if result.get("success"):
-            assert "results" in result, "缺少 results 字段"
-
-    async def test_batch_function_analysis(self):
+    async def test_batch_function_analysis(self, imported_sample_project):
         """测试 batch_function_analysis 工具"""
-        from joern_mcp.tools.batch import batch_function_analysis
-
         # project_name 现在是第一个必填参数
-        result = await get_tool_fn(batch_function_analysis)(
-            "batch_tools_test", ["main"]
-        )
+        result = await BATCH_FUNCTION_ANALYSIS_FN(imported_sample_project, ["main"])
 
-        logger.info(f"batch_function_analysis result: {result}")
+        logger.debug("batch_function_analysis result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-        assert result.get("project") == "batch_tools_test", "返回的项目名称不匹配"
+        assert_tool_response(result, project=imported_sample_project)
 
 
 @pytest.mark.e2e
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("class_project")
 class TestExportToolsReal:
     """测试导出工具的真实调用"""
 
-    @pytest.fixture(autouse=True)
-    async def setup_server_state(self, joern_server, sample_c_code):
-        """设置 server_state 并导入测试代码"""
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-
-        from tests.e2e.test_helpers import import_code_safe
-
-        await import_code_safe(joern_server, str(sample_c_code), "export_tools_test")
-        yield
-        server_state.joern_server = None
-        server_state.query_executor = None
+    PROJECT_NAME = EXPORT_PROJECT
 
-    async def test_export_cpg(self, tmp_path):
+    async def test_export_cpg(self, exports_dir):
         """测试 export_cpg 工具"""
-        from joern_mcp.tools.export import export_cpg
+        output_path = str(exports_dir / f"cpg_{uuid.uuid4().hex}")
+        result = await EXPORT_CPG_FN(self.PROJECT_NAME, output_path, format="bin")
 
-        output_path = str(tmp_path / "exported_cpg")
-        result = await get_tool_fn(export_cpg)(
-            "export_tools_test", output_path, format="bin"
-        )
+        logger.debug("export_cpg result: {}", result)
 
-        logger.info(f"export_cpg result: {result}")
+        assert_tool_response(result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
-
-    async def test_export_analysis_results(self, tmp_path):
+    async def test_export_analysis_results(self, exports_dir):
         """测试 export_analysis_results 工具"""
-        from joern_mcp.tools.export import export_analysis_results
-
-        output_path = str(tmp_path / "results.json")
+        output_path = str(exports_dir / f"results_{uuid.uuid4().hex}.json")
         test_data = {"vulnerabilities": [{"name": "test_vuln", "severity": "HIGH"}]}
-        result = await get_tool_fn(export_analysis_results)(
-            test_data, output_path, format="json"
-        )
+        result = await EXPORT_ANALYSIS_RESULTS_FN(test_data, output_path, format="json")
 
-        logger.info(f"export_analysis_results result: {result}")
+        logger.debug("export_analysis_results result: {}", result)
 
-        assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        assert "success" in result, "缺少 success 字段"
+        assert_tool_response(result)
 
 
 @pytest.mark.e2e
@@ -662,58 +506,35 @@ class TestExportToolsReal:
 class TestPerformanceToolsReal:
     """测试性能工具的真实调用"""
 
-    @pytest.fixture(autouse=True)
-    async def setup_server_state(self, joern_server, sample_c_code):
-        """设置 server_state 并导入测试代码"""
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-
-        from tests.e2e.test_helpers import import_code_safe
-
-        await import_code_safe(joern_server, str(sample_c_code), "perf_tools_test")
-        yield
-        server_state.joern_server = None
-        server_state.query_executor = None
-
     async def test_get_performance_stats(self):
         """测试 get_performance_stats 工具"""
-        from joern_mcp.tools.performance import get_performance_stats
+        result = await GET_PERFORMANCE_STATS_FN()
 
-        result = await get_tool_fn(get_performance_stats)()
-
-        logger.info(f"get_performance_stats result: {result}")
+        logger.debug("get_performance_stats result: {}", result)
 
         assert isinstance(result, dict), f"返回类型错误: {type(result)}"
-        # 验证有数据返回
-        assert result is not None
 
     async def test_clear_query_cache(self):
         """测试 clear_query_cache 工具"""
-        from joern_mcp.tools.performance import clear_query_cache
-
-        result = await get_tool_fn(clear_query_cache)()
+        result = await CLEAR_QUERY_CACHE_FN()
 
-        logger.info(f"clear_query_cache result: {result}")
+        logger.debug("clear_query_cache result: {}", result)
 
         assert isinstance(result, dict), f"返回类型错误: {type(result)}"
         assert "success" in result, "缺少 success 字段"
 
     async def test_get_cache_stats(self):
         """测试 get_cache_stats 工具"""
-        from joern_mcp.tools.performance import get_cache_stats
+        result = await GET_CACHE_STATS_FN()
 
-        result = await get_tool_fn(get_cache_stats)()
-
-        logger.info(f"get_cache_stats result: {result}")
+        logger.debug("get_cache_stats result: {}", result)
 
         assert isinstance(result, dict), f"返回类型错误: {type(result)}"
 
     async def test_get_system_health(self):
         """测试 get_system_health 工具"""
-        from joern_mcp.tools.performance import get_system_health
-
-        result = await get_tool_fn(get_system_health)()
+        result = await GET_SYSTEM_HEALTH_FN()
 
-        logger.info(f"get_system_health result: {result}")
+        logger.debug("get_system_health result: {}", result)
 
         assert isinstance(result, dict), f"返回类型错误: {type(result)}"
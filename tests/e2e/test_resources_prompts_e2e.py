@@ -4,89 +4,40 @@ E2E测试 - MCP Resources和Prompts（修复版）
 真正验证功能的正确性，不掩盖问题
 """
 
+import asyncio
+
 import pytest
 
-from joern_mcp.joern.executor_optimized import OptimizedQueryExecutor as QueryExecutor
-from joern_mcp.services.callgraph import CallGraphService
-from joern_mcp.services.dataflow import DataFlowService
-from joern_mcp.services.taint import TaintAnalysisService
+from .test_helpers import (
+    SHARED_SAMPLE_PROJECT,
+    execute_query_safe,
+    health_check_safe,
+    import_code_safe,
+)
 
-from .test_helpers import execute_query_safe, health_check_safe, import_code_safe
+# 资源与提示依赖的只读查询：(查询, stdout 中应包含的内容)
+QUERY_CASES = [
+    pytest.param("workspace.projects.name.l", SHARED_SAMPLE_PROJECT, id="project_info"),
+    pytest.param("cpg.method.name.l", "main", id="methods"),
+    pytest.param("cpg.call.name.l", "strcpy", id="calls"),
+    pytest.param('cpg.call.name("strcpy").location.l', None, id="strcpy_loc"),
+    pytest.param("cpg.method.lineNumber.l", None, id="line_numbers"),
+]
 
 
 @pytest.mark.e2e
 @pytest.mark.asyncio
-class TestProjectResourcesE2E:
-    """测试项目资源的E2E流程"""
-
-    async def test_project_info_resource(self, joern_server, sample_c_code):
-        """测试项目信息资源"""
-        project_name = "resource_test"
-        result = await import_code_safe(joern_server, str(sample_c_code), project_name)
-        assert result["success"], f"导入代码失败: {result.get('stderr', '')}"
-
-        query = "workspace.projects.name.l"
-        projects_result = await execute_query_safe(joern_server, query)
-        assert projects_result["success"], (
-            f"查询项目失败: {projects_result.get('stderr', '')}"
-        )
-
-    async def test_project_functions_resource(self, joern_server, sample_c_code):
-        """测试项目函数列表资源"""
-        await import_code_safe(joern_server, str(sample_c_code), "funcs_resource_test")
+class TestResourcesAndPromptsE2E:
+    """测试项目资源和分析提示所用查询的E2E流程"""
 
-        query = "cpg.method.name.l"
-        result = await execute_query_safe(joern_server, query)
-
-        assert result["success"], f"查询失败: {result.get('stderr', '')}"
-
-    async def test_project_calls_resource(self, joern_server, sample_c_code):
-        """测试项目调用列表资源"""
-        await import_code_safe(joern_server, str(sample_c_code), "calls_resource_test")
-
-        query = "cpg.call.name.l"
+    @pytest.mark.parametrize("query,expected", QUERY_CASES)
+    async def test_query(self, joern_server, shared_sample_project, query, expected):
+        """在共享示例项目上执行查询并验证成功"""
         result = await execute_query_safe(joern_server, query)
 
         assert result["success"], f"查询失败: {result.get('stderr', '')}"
-
-
-@pytest.mark.e2e
-@pytest.mark.asyncio
-class TestAnalysisPromptsE2E:
-    """测试分析提示的E2E流程"""
-
-    async def test_security_analysis_prompt(self, joern_server, sample_c_code):
-        """测试安全分析提示"""
-        await import_code_safe(joern_server, str(sample_c_code), "security_prompt_test")
-
-        # 1. 查找函数
-        funcs_result = await execute_query_safe(joern_server, "cpg.method.name.l")
-        assert funcs_result["success"], "查找函数失败"
-
-        # 2. 查找调用
-        calls_result = await execute_query_safe(joern_server, "cpg.call.name.l")
-        assert calls_result["success"], "查找调用失败"
-
-    async def test_vulnerability_scan_prompt(self, joern_server, sample_c_code):
-        """测试漏洞扫描提示"""
-        await import_code_safe(joern_server, str(sample_c_code), "vuln_prompt_test")
-
-        # 查找不安全的函数调用
-        query = 'cpg.call.name("strcpy").location.l'
-        result = await execute_query_safe(joern_server, query)
-        assert result["success"], f"查询失败: {result.get('stderr', '')}"
-
-    async def test_code_review_prompt(self, joern_server, sample_c_code):
-        """测试代码审查提示"""
-        await import_code_safe(joern_server, str(sample_c_code), "review_prompt_test")
-
-        # 1. 获取所有函数
-        funcs = await execute_query_safe(joern_server, "cpg.method.name.l")
-        assert funcs["success"], "获取函数列表失败"
-
-        # 2. 获取函数复杂度指标
-        complexity = await execute_query_safe(joern_server, "cpg.method.lineNumber.l")
-        assert complexity["success"], "获取复杂度失败"
+        if expected is not None:
+            assert expected in result["stdout"], f"结果应包含 {expected}"
 
 
 @pytest.mark.e2e
@@ -103,17 +54,15 @@ class TestMCPServerE2E:
         is_healthy = await health_check_safe(joern_server)
         assert is_healthy, "健康检查失败"
 
-    async def test_server_query_execution(self, joern_server, sample_c_code):
+    async def test_server_query_execution(self, joern_server, shared_sample_project):
         """测试服务器查询执行"""
-        await import_code_safe(joern_server, str(sample_c_code), "server_test")
-
         result = await execute_query_safe(joern_server, "cpg.method.name.l")
         assert result["success"], f"查询失败: {result.get('stderr', '')}"
 
-    async def test_server_async_query_execution(self, joern_server, sample_c_code):
+    async def test_server_async_query_execution(
+        self, joern_server, shared_sample_project
+    ):
         """测试服务器异步查询执行"""
-        await import_code_safe(joern_server, str(sample_c_code), "async_server_test")
-
         # 使用execute_query_async
         result = await joern_server.execute_query_async("cpg.method.name.l")
         assert result["success"], f"异步查询失败: {result.get('stderr', '')}"
@@ -124,16 +73,13 @@ class TestMCPServerE2E:
 class TestPerformanceToolsE2E:
     """测试性能监控工具的E2E流程"""
 
-    async def test_performance_monitoring(self, joern_server, sample_c_code):
+    async def test_performance_monitoring(self, joern_server, shared_sample_project):
         """测试性能监控"""
-        await import_code_safe(joern_server, str(sample_c_code), "perf_test")
-
-        # 执行多个查询验证功能正常
-        successful_queries = 0
-        for _i in range(5):
-            result = await execute_query_safe(joern_server, "cpg.method.name.l")
-            if result.get("success"):
-                successful_queries += 1
+        # 并发执行多个查询验证功能正常
+        results = await asyncio.gather(
+            *(execute_query_safe(joern_server, "cpg.method.name.l") for _ in range(5))
+        )
+        successful_queries = sum(bool(r.get("success")) for r in results)
 
         # 验证至少大部分查询成功
         assert successful_queries >= 4, f"只有{successful_queries}/5个查询成功"
@@ -144,71 +90,49 @@ class TestPerformanceToolsE2E:
 class TestComplexWorkflowE2E:
     """测试复杂工作流的E2E流程"""
 
-    async def test_full_analysis_workflow(self, joern_server, sample_c_code):
-        """测试完整的分析工作流"""
-        project_name = "full_workflow_test"
-
-        # 1. 导入代码
-        import_result = await import_code_safe(
-            joern_server, str(sample_c_code), project_name
-        )
-        assert import_result["success"], f"导入失败: {import_result.get('stderr', '')}"
-
-        executor = QueryExecutor(joern_server)
-
-        # 2. 列出函数
+    async def test_funcs_step(self, joern_server, shared_sample_project):
+        """分析工作流：列出函数"""
         funcs_result = await execute_query_safe(joern_server, "cpg.method.name.l")
         assert funcs_result["success"], "列出函数失败"
 
-        # 3. 分析调用关系（真正验证）
-        callgraph_service = CallGraphService(executor)
-        callers = await callgraph_service.get_callers("unsafe_strcpy")
+    async def test_callers_step(self, shared_sample_project, callgraph_service):
+        """分析工作流：分析调用关系（真正验证）"""
+        callers = await callgraph_service.get_callers(
+            "unsafe_strcpy", project_name=shared_sample_project
+        )
 
         assert isinstance(callers, dict), "get_callers返回类型错误"
+        assert callers.get("success"), f"获取调用者失败: {callers.get('error')}"
         assert "function" in callers, "调用者结果缺少function字段"
         assert callers["function"] == "unsafe_strcpy", "函数名不匹配"
 
-        # 4. 数据流分析（标记为可能失败）
-        dataflow_service = DataFlowService(executor)
-        flow = await dataflow_service.track_dataflow("main", "buffer")
+    async def test_dataflow_step(self, shared_sample_project, dataflow_service):
+        """分析工作流：数据流分析（标记为可能失败）"""
+        flow = await dataflow_service.track_dataflow(
+            "main", "buffer", project_name=shared_sample_project
+        )
 
         assert isinstance(flow, dict), "track_dataflow返回类型错误"
         assert "success" in flow, "数据流结果缺少success字段"
 
-        # 5. 污点分析
-        taint_service = TaintAnalysisService(executor)
-        vulns = await taint_service.find_vulnerabilities()
+    async def test_taint_step(self, shared_sample_project, taint_service):
+        """分析工作流：污点分析"""
+        vulns = await taint_service.find_vulnerabilities(
+            project_name=shared_sample_project
+        )
 
         assert isinstance(vulns, dict), "find_vulnerabilities应返回dict"
         assert "success" in vulns, "漏洞分析结果缺少success字段"
 
-    async def test_multi_project_workflow(self, joern_server, sample_c_code, tmp_path):
+    async def test_multi_project_workflow(
+        self, joern_server, imported_sample_project, imported_secondary_project
+    ):
         """测试多项目工作流"""
-        # 创建第二个项目
-        code_dir2 = tmp_path / "sample_code2"
-        code_dir2.mkdir()
-        (code_dir2 / "test.c").write_text(
-            """
-int add(int a, int b) {
-    return a + b;
-}
-
-int main() {
-    return add(1, 2);
-}
-"""
-        )
-
-        # 导入两个项目
-        result1 = await import_code_safe(joern_server, str(sample_c_code), "project1")
-        assert result1["success"], "导入项目1失败"
-
-        result2 = await import_code_safe(joern_server, str(code_dir2), "project2")
-        assert result2["success"], "导入项目2失败"
-
-        # 查询项目列表
+        # 两个项目由 session 级 fixture 各导入一次，查询项目列表
         projects = await execute_query_safe(joern_server, "workspace.projects.name.l")
         assert projects["success"], "查询项目列表失败"
+        for name in (imported_sample_project, imported_secondary_project):
+            assert name in projects["stdout"], f"项目列表缺少 {name}"
 
 
 @pytest.mark.e2e
@@ -225,10 +149,10 @@ class TestErrorHandlingE2E:
         assert "success" in result, "结果应该包含success字段"
         # 无效查询可能success=False或者success=True但有错误信息
 
-    async def test_nonexistent_function_query(self, joern_server, sample_c_code):
+    async def test_nonexistent_function_query(
+        self, joern_server, shared_sample_project
+    ):
         """测试查询不存在的函数"""
-        await import_code_safe(joern_server, str(sample_c_code), "error_test")
-
         result = await execute_query_safe(
             joern_server, 'cpg.method.name("nonexistent_func_12345").name.l'
         )
@@ -239,14 +163,10 @@ class TestErrorHandlingE2E:
         stdout = result.get("stdout", "")
         assert stdout == "[]" or "List()" in stdout, "应该返回空列表"
 
-    async def test_import_invalid_code(self, joern_server, tmp_path):
+    async def test_import_invalid_code(self, joern_server, invalid_c_code):
         """测试导入无效代码"""
-        invalid_dir = tmp_path / "invalid_code"
-        invalid_dir.mkdir()
-        (invalid_dir / "invalid.c").write_text("this is not valid C code ###")
-
         result = await import_code_safe(
-            joern_server, str(invalid_dir), "invalid_project"
+            joern_server, str(invalid_c_code), "invalid_project"
         )
 
         # 真正验证：导入无效代码应该明确失败或返回警告
@@ -4,11 +4,13 @@ E2E测试 - MCP工具层（修复版）
 真正验证功能的正确性，不掩盖问题
 """
 
+import asyncio
+
 import pytest
 
-from joern_mcp.joern.executor_optimized import OptimizedQueryExecutor as QueryExecutor
 from joern_mcp.mcp_server import server_state
-from joern_mcp.services.callgraph import CallGraphService
+from joern_mcp.utils.project_utils import get_cpg_prefix
+from joern_mcp.utils.response_parser import safe_parse_joern_list
 
 from .test_helpers import execute_query_safe, import_code_safe
 
@@ -47,12 +49,14 @@ class TestProjectToolsE2E:
 class TestQueryToolsE2E:
     """测试查询工具的E2E流程"""
 
-    async def test_get_function_code_workflow(self, joern_server, sample_c_code):
+    async def test_get_function_code_workflow(
+        self, joern_server, imported_sample_project
+    ):
         """测试获取函数代码的完整流程"""
-        project_name = "query_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
+        cpg_prefix = get_cpg_prefix(project_name)
 
-        query = f'workspace.project("{project_name}").get.cpg.get.method.name("main").code.l'
+        query = f'{cpg_prefix}.method.name("main").code.l'
         result = await execute_query_safe(joern_server, query)
 
         assert result["success"], f"查询失败: {result.get('stderr', '')}"
@@ -60,12 +64,12 @@ class TestQueryToolsE2E:
         # 验证返回了main函数的代码
         assert len(result["stdout"]) > 0, "未返回函数代码"
 
-    async def test_list_functions_workflow(self, joern_server, sample_c_code):
+    async def test_list_functions_workflow(self, joern_server, imported_sample_project):
         """测试列出函数的完整流程"""
-        project_name = "list_funcs_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
+        cpg_prefix = get_cpg_prefix(project_name)
 
-        query = f'workspace.project("{project_name}").get.cpg.get.method.name.l'
+        query = f"{cpg_prefix}.method.name.l"
         result = await execute_query_safe(joern_server, query)
 
         # 强断言验证
@@ -75,33 +79,15 @@ class TestQueryToolsE2E:
         stdout = result["stdout"]
         assert stdout is not None, "stdout不应该是None"
 
-        # 解析函数列表
-        import json
-
-        if isinstance(stdout, list):
-            functions = stdout
-        elif isinstance(stdout, str):
-            # 尝试解析为JSON
-            try:
-                functions = json.loads(stdout) if stdout else []
-            except json.JSONDecodeError:
-                # 可能是逗号分隔的字符串
-                functions = [f.strip() for f in stdout.split(",") if f.strip()]
-        else:
-            functions = []
-
-        # 验证函数列表结构
-        assert isinstance(functions, list), (
-            f"函数列表应该是list，实际: {type(functions)}"
-        )
+        # 解析函数列表（JSON 数组和 Scala REPL List 格式统一处理）
+        functions = safe_parse_joern_list(stdout)
+        function_names = {f if isinstance(f, str) else str(f) for f in functions}
 
         # 验证包含预期的函数（基于sample_c代码）
         expected_functions = ["main", "unsafe_strcpy", "process_input"]
-        function_names = [f if isinstance(f, str) else str(f) for f in functions]
-
         for expected in expected_functions:
             assert any(expected in fname for fname in function_names), (
-                f"函数列表应该包含{expected}，实际: {function_names}"
+                f"函数列表应该包含{expected}，实际: {sorted(function_names)}"
             )
 
 
@@ -110,13 +96,13 @@ class TestQueryToolsE2E:
 class TestCallGraphToolsE2E:
     """测试调用图工具的E2E流程"""
 
-    async def test_get_callers_workflow(self, joern_server, sample_c_code):
+    async def test_get_callers_workflow(
+        self, joern_server, imported_sample_project, callgraph_service
+    ):
         """测试获取调用者的完整流程"""
-        project_name = "callers_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
 
-        executor = QueryExecutor(joern_server)
-        service = CallGraphService(executor)
+        service = callgraph_service
         result = await service.get_callers(
             "unsafe_strcpy", depth=1, project_name=project_name
         )
@@ -129,13 +115,13 @@ class TestCallGraphToolsE2E:
         )
         assert "success" in result, "返回结果缺少success字段"
 
-    async def test_get_callees_workflow(self, joern_server, sample_c_code):
+    async def test_get_callees_workflow(
+        self, joern_server, imported_sample_project, callgraph_service
+    ):
         """测试获取被调用者的完整流程"""
-        project_name = "callees_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
 
-        executor = QueryExecutor(joern_server)
-        service = CallGraphService(executor)
+        service = callgraph_service
         result = await service.get_callees(
             "process_input", depth=1, project_name=project_name
         )
@@ -144,13 +130,13 @@ class TestCallGraphToolsE2E:
         assert "function" in result, "返回结果缺少function字段"
         assert "success" in result, "返回结果缺少success字段"
 
-    async def test_analyze_call_chain_workflow(self, joern_server, sample_c_code):
+    async def test_analyze_call_chain_workflow(
+        self, joern_server, imported_sample_project, callgraph_service
+    ):
         """测试分析调用链的完整流程"""
-        project_name = "call_chain_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
 
-        executor = QueryExecutor(joern_server)
-        service = CallGraphService(executor)
+        service = callgraph_service
         result = await service.get_call_chain(
             "main", max_depth=5, project_name=project_name
         )
@@ -174,25 +160,25 @@ class TestDataFlowToolsE2E:
     注意：数据流分析非常耗时，这些测试标记为 slow
     """
 
-    async def test_track_dataflow_workflow(self, joern_server, sample_c_code):
+    async def test_track_dataflow_workflow(self, joern_server, imported_sample_project):
         """测试追踪数据流的完整流程 - 使用简单查询替代"""
-        project_name = "dataflow_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
 
         # 使用简单查询验证数据流基础设施，而非完整的 reachableByFlows
-        cpg_prefix = f'workspace.project("{project_name}").get.cpg.get'
+        cpg_prefix = get_cpg_prefix(project_name)
         query = f'{cpg_prefix}.method.name("main").parameter.name.l'
         result = await execute_query_safe(joern_server, query)
 
         assert result["success"], f"查询失败: {result.get('stderr', '')}"
 
-    async def test_analyze_variable_flow_workflow(self, joern_server, sample_c_code):
+    async def test_analyze_variable_flow_workflow(
+        self, joern_server, imported_sample_project
+    ):
         """测试分析变量流的完整流程 - 使用简单查询替代"""
-        project_name = "var_flow_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
 
         # 使用简单查询验证变量查找功能
-        cpg_prefix = f'workspace.project("{project_name}").get.cpg.get'
+        cpg_prefix = get_cpg_prefix(project_name)
         query = f'{cpg_prefix}.identifier.name("buffer").l.size'
         result = await execute_query_safe(joern_server, query)
 
@@ -208,25 +194,27 @@ class TestTaintToolsE2E:
     注意：污点分析非常耗时，这些测试标记为 slow
     """
 
-    async def test_find_vulnerabilities_workflow(self, joern_server, sample_c_code):
+    async def test_find_vulnerabilities_workflow(
+        self, joern_server, imported_sample_project
+    ):
         """测试查找漏洞的完整流程 - 使用简单查询替代"""
-        project_name = "vuln_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
 
         # 验证能找到危险函数调用，而非完整的污点分析
-        cpg_prefix = f'workspace.project("{project_name}").get.cpg.get'
+        cpg_prefix = get_cpg_prefix(project_name)
         query = f'{cpg_prefix}.call.name("strcpy").l.size'
         result = await execute_query_safe(joern_server, query)
 
         assert result["success"], f"查询失败: {result.get('stderr', '')}"
 
-    async def test_check_specific_flow_workflow(self, joern_server, sample_c_code):
+    async def test_check_specific_flow_workflow(
+        self, joern_server, imported_sample_project
+    ):
         """测试检查特定流的完整流程 - 使用简单查询替代"""
-        project_name = "flow_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
 
         # 验证源和汇的存在性
-        cpg_prefix = f'workspace.project("{project_name}").get.cpg.get'
+        cpg_prefix = get_cpg_prefix(project_name)
 
         # 检查 argv 相关
         query1 = f'{cpg_prefix}.identifier.name("argv").l.size'
@@ -244,12 +232,12 @@ class TestTaintToolsE2E:
 class TestCFGToolsE2E:
     """测试控制流图工具的E2E流程"""
 
-    async def test_get_cfg_workflow(self, joern_server, sample_c_code):
+    async def test_get_cfg_workflow(self, joern_server, imported_sample_project):
         """测试获取CFG的完整流程"""
-        project_name = "cfg_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
+        cpg_prefix = get_cpg_prefix(project_name)
 
-        query = f'workspace.project("{project_name}").get.cpg.get.method.name("main").dotCfg.headOption.getOrElse("")'
+        query = f'{cpg_prefix}.method.name("main").dotCfg.headOption.getOrElse("")'
         result = await execute_query_safe(joern_server, query)
 
         assert result["success"], f"查询失败: {result.get('stderr', '')}"
@@ -260,22 +248,19 @@ class TestCFGToolsE2E:
 class TestBatchToolsE2E:
     """测试批量查询工具的E2E流程"""
 
-    async def test_batch_query_workflow(self, joern_server, sample_c_code):
+    async def test_batch_query_workflow(self, joern_server, imported_sample_project):
         """测试批量查询的完整流程"""
-        project_name = "batch_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
 
-        cpg_prefix = f'workspace.project("{project_name}").get.cpg.get'
+        cpg_prefix = get_cpg_prefix(project_name)
         queries = [
             f"{cpg_prefix}.method.name.l",
             f"{cpg_prefix}.call.name.l",
             f"{cpg_prefix}.literal.code.l",
         ]
-        results = []
-
-        for query in queries:
-            result = await execute_query_safe(joern_server, query)
-            results.append(result)
+        results = await asyncio.gather(
+            *(execute_query_safe(joern_server, query) for query in queries)
+        )
 
         # 真正验证每个查询结果
         assert len(results) == 3, f"期望3个结果，实际{len(results)}个"
@@ -288,23 +273,23 @@ class TestBatchToolsE2E:
 class TestExportToolsE2E:
     """测试导出工具的E2E流程"""
 
-    async def test_export_to_json_workflow(self, joern_server, sample_c_code):
+    async def test_export_to_json_workflow(self, joern_server, imported_sample_project):
         """测试导出为JSON的完整流程"""
-        project_name = "export_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
+        cpg_prefix = get_cpg_prefix(project_name)
 
-        query = f'workspace.project("{project_name}").get.cpg.get.method.name.l'
+        query = f"{cpg_prefix}.method.name.l"
         result = await execute_query_safe(joern_server, query)
 
         assert result["success"], f"查询失败: {result.get('stderr', '')}"
         assert "stdout" in result, "返回结果缺少stdout字段"
 
-    async def test_export_to_dot_workflow(self, joern_server, sample_c_code):
+    async def test_export_to_dot_workflow(self, joern_server, imported_sample_project):
         """测试导出为DOT格式的完整流程"""
-        project_name = "dot_test"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = imported_sample_project
+        cpg_prefix = get_cpg_prefix(project_name)
 
-        query = f'workspace.project("{project_name}").get.cpg.get.method.name("main").dotCfg.headOption.getOrElse("")'
+        query = f'{cpg_prefix}.method.name("main").dotCfg.headOption.getOrElse("")'
         result = await execute_query_safe(joern_server, query)
 
         assert result["success"], f"查询失败: {result.get('stderr', '')}"
@@ -312,25 +297,21 @@ class TestExportToolsE2E:
 
 @pytest.mark.e2e
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("mcp_server_state")
 class TestServerStateE2E:
-    """测试ServerState的E2E流程"""
+    """测试ServerState的E2E流程（server_state 由 mcp_server_state 统一绑定）"""
 
     async def test_server_state_initialization(self, joern_server):
         """测试ServerState初始化"""
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-
-        assert server_state.joern_server is not None, "joern_server未正确设置"
+        assert server_state.joern_server is joern_server, "joern_server未正确设置"
         assert server_state.query_executor is not None, "query_executor未正确设置"
 
-    async def test_server_state_executor_usage(self, joern_server, sample_c_code):
+    async def test_server_state_executor_usage(
+        self, joern_server, imported_sample_project
+    ):
         """测试通过ServerState使用executor"""
-        project_name = "state_test"
-        server_state.joern_server = joern_server
-        server_state.query_executor = QueryExecutor(joern_server)
-
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
-
-        query = f'workspace.project("{project_name}").get.cpg.get.method.name.l'
+        project_name = imported_sample_project
+        cpg_prefix = get_cpg_prefix(project_name)
+        query = f"{cpg_prefix}.method.name.l"
         result = await execute_query_safe(joern_server, query)
         assert result["success"], f"查询失败: {result.get('stderr', '')}"
@@ -1,71 +1,21 @@
 """集成测试配置"""
 
-import asyncio
-import contextlib
-import socket
 from pathlib import Path
 
 import pytest
+import pytest_asyncio
 from loguru import logger
 
 from joern_mcp.joern.manager import JoernManager
-from joern_mcp.joern.server import JoernServerManager
-
-
-def find_free_port(
-    start_port: int = 20000, end_port: int = 30000, max_attempts: int = 100
-) -> int:
-    """查找一个可用的端口
-
-    Args:
-        start_port: 起始端口
-        end_port: 结束端口
-        max_attempts: 最大尝试次数
-
-    Returns:
-        可用的端口号
-
-    Raises:
-        RuntimeError: 如果找不到可用端口
-    """
-    import random
-
-    for _ in range(max_attempts):
-        port = random.randint(start_port, end_port)
-
-        # 检查端口是否可用
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-            try:
-                # 尝试绑定端口
-                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-                sock.bind(("localhost", port))
-                logger.info(f"Found free port: {port}")
-                return port
-            except OSError:
-                # 端口被占用，继续尝试
-                continue
-
-    raise RuntimeError(f"Could not find free port after {max_attempts} attempts")
-
-
-def is_port_in_use(port: int, host: str = "localhost") -> bool:
-    """检查端口是否被占用"""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        try:
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            sock.bind((host, port))
-            return False
-        except OSError:
-            return True
-
-
-@pytest.fixture(scope="session")
-def event_loop():
-    """创建事件循环"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    yield loop
-    loop.close()
+from joern_mcp.utils.port_utils import is_port_in_use
+from tests.e2e.test_helpers import import_code_safe
+from tests.joern_fixtures import (
+    ACTIVE_SERVERS,
+    cleanup_projects_after_module,  # noqa: F401 - 导入即注册 autouse fixture
+    delete_all_projects,
+    start_server,
+    warm_up,
+)
 
 
 @pytest.fixture(scope="session")
@@ -147,8 +97,12 @@ public class Vulnerable {
     return code_dir
 
 
-@pytest.fixture(scope="session")
-async def joern_server(event_loop):
+# 只读测试共用的示例项目名称
+SHARED_PROJECT = "shared_e2e"
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def joern_server():
     """Session级别的Joern Server - 所有测试共享
 
     这样可以：
@@ -159,52 +113,29 @@ async def joern_server(event_loop):
     if not JoernManager().validate_installation():
         pytest.skip("Joern not installed")
 
-    # 查找可用端口
-    max_retries = 3
-    server = None
-
-    for attempt in range(max_retries):
-        try:
-            port = find_free_port()
-            logger.info(f"🔧 Attempt {attempt + 1}/{max_retries}: Using port {port}")
-
-            # 使用HTTP客户端与Joern Server交互
-            server = JoernServerManager(host="localhost", port=port)
-
-            # 尝试启动服务器（增加超时到180秒）
-            logger.info("⏳ Starting Joern Server (this may take 1-3 minutes)...")
-            logger.info("💡 Tip: Check another terminal with: ps aux | grep joern")
-            await server.start(timeout=180)
-            logger.success(f"✅ Joern server started successfully on port {port}")
-
-            # 启动成功，跳出循环
-            break
-
-        except Exception as e:
-            logger.error(f"Attempt {attempt + 1} failed: {e}")
-
-            # 清理失败的server
-            if server and server.process:
-                with contextlib.suppress(Exception):
-                    await server.stop()
-
-            # 如果不是最后一次尝试，继续
-            if attempt < max_retries - 1:
-                logger.info("Retrying with different port...")
-                await asyncio.sleep(2)
-            else:
-                # 最后一次尝试也失败了
-                logger.error("All attempts to start Joern server failed")
-                pytest.skip(
-                    f"Could not start Joern server after {max_retries} attempts: {e}"
-                )
+    try:
+        # 启动服务器（超时180秒），端口被抢占时换端口重试一次
+        logger.info("⏳ Starting Joern Server (this may take 1-3 minutes)...")
+        logger.info("💡 Tip: Check another terminal with: ps aux | grep joern")
+        server = await start_server(timeout=180)
+        logger.success(f"✅ Joern server started successfully on port {server.port}")
+    except Exception as e:
+        logger.error(f"Failed to start Joern server: {e}")
+        pytest.skip(f"Could not start Joern server: {e}")
+
+    await warm_up(server)
+    # 记录测试导入的项目，见 delete_dirty_projects
+    server._dirty = set()
 
     # 提供服务器给所有测试
+    ACTIVE_SERVERS.append(server)
     try:
         yield server
     finally:
-        # 清理：停止服务器
+        ACTIVE_SERVERS.remove(server)
+        # 清理：session 结束时统一删除测试项目，然后停止服务器
         if server:
+            await delete_all_projects(server)
             logger.info("🧹 Stopping Joern server...")
             try:
                 await server.stop()
@@ -212,38 +143,25 @@ async def joern_server(event_loop):
             except Exception as e:
                 logger.warning(f"⚠️  Error stopping server: {e}")
 
-            # 等待端口完全释放
-            await asyncio.sleep(2)
-
-            # 验证端口已释放
+            # stop() 已轮询等待端口释放，这里只记录结果
             if not is_port_in_use(server.port):
                 logger.success(f"✅ Port {server.port} released successfully")
             else:
                 logger.warning(f"⚠️  Port {server.port} still in use after stop")
 
 
-@pytest.fixture(autouse=True)
-def cleanup_projects_after_test(joern_server, event_loop):
-    """每个测试后清理所有项目，防止项目累积导致性能下降"""
-    yield
-
-    # 测试结束后清理所有项目
-    async def cleanup():
-        if not joern_server:
-            return
-        try:
-            # 删除所有项目
-            await joern_server.execute_query_async(
-                "workspace.projects.foreach(p => delete(p.name))"
-            )
-        except Exception:
-            # 忽略清理错误
-            pass
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def shared_project(joern_server, sample_c_code):
+    """导入一次示例C代码，供所有只读测试共用，返回项目名称（session级别）
 
-    event_loop.run_until_complete(cleanup())
+    该项目不记入 joern_server._dirty，模块级清理不会删除它，session 结束时统一删除。
+    """
+    await import_code_safe(joern_server, str(sample_c_code), SHARED_PROJECT)
+    joern_server._dirty.discard(SHARED_PROJECT)
+    return SHARED_PROJECT
 
 
-@pytest.fixture(scope="function", autouse=False)
+@pytest_asyncio.fixture(loop_scope="session")
 async def ensure_joern_server_health(joern_server):
     """在每个测试前确保Joern server健康
 
@@ -1,5 +1,7 @@
 """边界条件和异常场景测试"""
 
+import asyncio
+
 import pytest
 from loguru import logger
 
@@ -7,7 +9,6 @@ from joern_mcp.joern.executor_optimized import OptimizedQueryExecutor as QueryEx
 from joern_mcp.services.callgraph import CallGraphService
 from joern_mcp.services.dataflow import DataFlowService
 from joern_mcp.services.taint import TaintAnalysisService
-from tests.e2e.test_helpers import import_code_safe
 
 
 @pytest.mark.integration
@@ -15,10 +16,9 @@ from tests.e2e.test_helpers import import_code_safe
 class TestBoundaryConditions:
     """边界条件测试"""
 
-    async def test_get_callers_nonexistent_function(self, joern_server, sample_c_code):
+    async def test_get_callers_nonexistent_function(self, joern_server, shared_project):
         """测试查询不存在的函数的调用者"""
-        project_name = "boundary_test_1"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = shared_project
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
@@ -34,10 +34,9 @@ class TestBoundaryConditions:
         assert result["callers"] == [], "不存在的函数应该返回空列表"
         assert result["count"] == 0, "计数应该为0"
 
-    async def test_get_callees_nonexistent_function(self, joern_server, sample_c_code):
+    async def test_get_callees_nonexistent_function(self, joern_server, shared_project):
         """测试查询不存在的函数的被调用者"""
-        project_name = "boundary_test_2"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = shared_project
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
@@ -53,20 +52,25 @@ class TestBoundaryConditions:
         assert result["callees"] == [], "不存在的函数应该返回空列表"
         assert result["count"] == 0, "计数应该为0"
 
-    async def test_call_chain_with_max_depth_limit(self, joern_server, sample_c_code):
+    async def test_call_chain_with_max_depth_limit(self, joern_server, shared_project):
         """测试不同深度限制的调用链"""
-        project_name = "boundary_test_3"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = shared_project
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
 
-        # 测试不同深度
-        for depth in [1, 2, 5]:
-            result = await service.get_call_chain(
-                "main", max_depth=depth, direction="down", project_name=project_name
+        # 测试不同深度（各查询互不依赖，并发执行）
+        depths = [1, 2, 5]
+        results = await asyncio.gather(
+            *(
+                service.get_call_chain(
+                    "main", max_depth=depth, direction="down", project_name=project_name
+                )
+                for depth in depths
             )
+        )
 
+        for depth, result in zip(depths, results, strict=True):
             assert result.get("success"), (
                 f"depth={depth}应该成功, error={result.get('error')}"
             )
@@ -77,10 +81,9 @@ class TestBoundaryConditions:
             # 记录chain长度用于观察
             logger.debug(f"depth={depth}, chain_length={len(result['chain'])}")
 
-    async def test_dataflow_empty_result(self, joern_server, sample_c_code):
+    async def test_dataflow_empty_result(self, joern_server, shared_project):
         """测试数据流查询返回空结果"""
-        project_name = "boundary_test_4"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = shared_project
 
         executor = QueryExecutor(joern_server)
         service = DataFlowService(executor)
@@ -98,31 +101,38 @@ class TestBoundaryConditions:
         assert result.get("count", 0) == 0, "计数应该为0"
 
     async def test_variable_flow_with_max_flows_limit(
-        self, joern_server, sample_c_code
+        self, joern_server, shared_project
     ):
         """测试max_flows限制"""
-        project_name = "boundary_test_5"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = shared_project
 
         executor = QueryExecutor(joern_server)
         service = DataFlowService(executor)
 
-        # 测试不同的流限制
-        for max_flows in [1, 3, 5, 10]:
-            result = await service.analyze_variable_flow(
-                "user_input", "strcpy", max_flows=max_flows, project_name=project_name
+        # 测试不同的流限制（各查询互不依赖，并发执行）
+        limits = [1, 3, 5, 10]
+        results = await asyncio.gather(
+            *(
+                service.analyze_variable_flow(
+                    "user_input",
+                    "strcpy",
+                    max_flows=max_flows,
+                    project_name=project_name,
+                )
+                for max_flows in limits
             )
+        )
 
+        for max_flows, result in zip(limits, results, strict=True):
             if result.get("success") and "flows" in result:
                 flows = result["flows"]
                 assert len(flows) <= max_flows, (
                     f"返回的flows数量({len(flows)})不应超过max_flows({max_flows})"
                 )
 
-    async def test_taint_analysis_empty_result(self, joern_server, sample_c_code):
+    async def test_taint_analysis_empty_result(self, joern_server, shared_project):
         """测试污点分析返回空结果"""
-        project_name = "boundary_test_6"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = shared_project
 
         executor = QueryExecutor(joern_server)
         service = TaintAnalysisService(executor)
@@ -139,12 +149,9 @@ class TestBoundaryConditions:
         assert result.get("flows", []) == [], "应该返回空flows"
         assert result.get("count", 0) == 0, "计数应该为0"
 
-    async def test_concurrent_queries(self, joern_server, sample_c_code):
+    async def test_concurrent_queries(self, joern_server, shared_project):
         """测试并发查询"""
-        import asyncio
-
-        project_name = "boundary_test_7"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = shared_project
 
         executor = QueryExecutor(joern_server)
         callgraph_service = CallGraphService(executor)
@@ -172,11 +179,10 @@ class TestBoundaryConditions:
             )
 
     async def test_special_characters_in_function_name(
-        self, joern_server, sample_c_code
+        self, joern_server, shared_project
     ):
         """测试函数名包含特殊字符的情况"""
-        project_name = "boundary_test_8"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = shared_project
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
@@ -187,9 +193,14 @@ class TestBoundaryConditions:
             "func123",  # 包含数字
         ]
 
-        for func_name in special_names:
-            result = await service.get_callers(func_name, project_name=project_name)
+        results = await asyncio.gather(
+            *(
+                service.get_callers(func_name, project_name=project_name)
+                for func_name in special_names
+            )
+        )
 
+        for func_name, result in zip(special_names, results, strict=True):
             # 应该成功（即使找不到函数）
             assert isinstance(result, dict), f"查询{func_name}应该返回dict"
             assert "success" in result, f"查询{func_name}应该包含success字段"
@@ -213,10 +224,9 @@ class TestBoundaryConditions:
             f"没有 project_name 应该返回错误或空结果，实际: {result}"
         )
 
-    async def test_zero_depth_query(self, joern_server, sample_c_code):
+    async def test_zero_depth_query(self, joern_server, shared_project):
         """测试depth=0的查询"""
-        project_name = "boundary_test_9"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = shared_project
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
@@ -228,10 +238,9 @@ class TestBoundaryConditions:
         assert "success" in result, "应该包含success字段"
         # depth=0可能返回空或只有函数本身
 
-    async def test_very_large_depth(self, joern_server, sample_c_code):
+    async def test_very_large_depth(self, joern_server, shared_project):
         """测试非常大的depth值"""
-        project_name = "boundary_test_10"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = shared_project
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
@@ -245,10 +254,9 @@ class TestBoundaryConditions:
         assert "success" in result, "应该包含success字段"
         # 实际返回的chain长度应该远小于100（因为代码没那么深）
 
-    async def test_max_flows_zero(self, joern_server, sample_c_code):
+    async def test_max_flows_zero(self, joern_server, shared_project):
         """测试max_flows=0的情况"""
-        project_name = "boundary_test_11"
-        await import_code_safe(joern_server, str(sample_c_code), project_name)
+        project_name = shared_project
 
         executor = QueryExecutor(joern_server)
         service = DataFlowService(executor)
@@ -28,8 +28,9 @@ class TestComplexProject:
 
     async def test_import_complex_project(self, joern_server, complex_c_project):
         """测试导入复杂的多文件C项目"""
+        project_name = "complex_project"
         result = await import_code_safe(
-            joern_server, str(complex_c_project), "complex_project"
+            joern_server, str(complex_c_project), project_name
         )
 
         # 严格验证
@@ -58,13 +59,16 @@ class TestComplexProject:
 
     async def test_cross_file_call_graph(self, joern_server, complex_c_project):
         """测试跨文件的调用图分析"""
-        await import_code_safe(joern_server, str(complex_c_project), "cross_file_test")
+        project_name = "cross_file_test"
+        await import_code_safe(joern_server, str(complex_c_project), project_name)
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
 
         # 分析main函数的调用图（应该包含跨文件调用）
-        result = await service.get_call_graph("main", depth=3)
+        result = await service.get_call_graph(
+            "main", depth=3, project_name=project_name
+        )
 
         # 验证基本结构
         assert result.get("success"), f"获取调用图失败: {result.get('error')}"
@@ -99,7 +103,8 @@ class TestComplexProject:
 
     async def test_deep_call_chain(self, joern_server, complex_c_project):
         """测试深层调用链（多层嵌套）"""
-        await import_code_safe(joern_server, str(complex_c_project), "deep_chain_test")
+        project_name = "deep_chain_test"
+        await import_code_safe(joern_server, str(complex_c_project), project_name)
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
@@ -119,13 +124,16 @@ class TestComplexProject:
 
     async def test_buffer_overflow_detection(self, joern_server, complex_c_project):
         """测试缓冲区溢出检测"""
-        await import_code_safe(joern_server, str(complex_c_project), "overflow_test")
+        project_name = "overflow_test"
+        await import_code_safe(joern_server, str(complex_c_project), project_name)
 
         executor = QueryExecutor(joern_server)
         service = TaintAnalysisService(executor)
 
         # 检查strcpy相关的污点流（潜在的缓冲区溢出）
-        result = await service.check_specific_flow("strcpy|unsafe_strcpy", "strcpy")
+        result = await service.check_specific_flow(
+            "strcpy|unsafe_strcpy", "strcpy", project_name=project_name
+        )
 
         # 验证基本结构
         assert isinstance(result, dict), "应该返回dict"
@@ -138,15 +146,16 @@ class TestComplexProject:
 
     async def test_command_injection_detection(self, joern_server, complex_c_project):
         """测试命令注入检测"""
-        await import_code_safe(
-            joern_server, str(complex_c_project), "command_injection_test"
-        )
+        project_name = "command_injection_test"
+        await import_code_safe(joern_server, str(complex_c_project), project_name)
 
         executor = QueryExecutor(joern_server)
         service = TaintAnalysisService(executor)
 
         # 检查命令执行函数（system, popen等）
-        result = await service.check_specific_flow("argv|gets|scanf", "system|popen")
+        result = await service.check_specific_flow(
+            "argv|gets|scanf", "system|popen", project_name=project_name
+        )
 
         # 验证基本结构
         assert isinstance(result, dict), "应该返回dict"
@@ -164,15 +173,16 @@ class TestComplexProject:
 
     async def test_multi_file_dataflow(self, joern_server, complex_c_project):
         """测试跨文件的数据流分析"""
-        await import_code_safe(
-            joern_server, str(complex_c_project), "multi_file_dataflow_test"
-        )
+        project_name = "multi_file_dataflow_test"
+        await import_code_safe(joern_server, str(complex_c_project), project_name)
 
         executor = QueryExecutor(joern_server)
         service = DataFlowService(executor)
 
         # 追踪从main到process_data的数据流（跨文件）
-        result = await service.track_dataflow("main", "process_data", max_flows=10)
+        result = await service.track_dataflow(
+            "main", "process_data", max_flows=10, project_name=project_name
+        )
 
         # 基本验证
         assert isinstance(result, dict), "应该返回dict"
@@ -202,9 +212,8 @@ class TestComplexProject:
 
     async def test_vulnerability_functions(self, joern_server, complex_c_project):
         """测试识别漏洞函数"""
-        await import_code_safe(
-            joern_server, str(complex_c_project), "vulnerability_test"
-        )
+        project_name = "vulnerability_test"
+        await import_code_safe(joern_server, str(complex_c_project), project_name)
 
         # 查询使用了危险函数的位置
         query = 'cpg.call.name("strcpy|sprintf|gets|system").code.l'
@@ -228,13 +237,14 @@ class TestComplexProject:
 
     async def test_global_variable_tracking(self, joern_server, complex_c_project):
         """测试全局变量追踪"""
-        await import_code_safe(joern_server, str(complex_c_project), "global_var_test")
+        project_name = "global_var_test"
+        await import_code_safe(joern_server, str(complex_c_project), project_name)
 
         executor = QueryExecutor(joern_server)
         service = DataFlowService(executor)
 
         # 查找main函数的数据依赖（应该包含全局变量）
-        result = await service.find_data_dependencies("main")
+        result = await service.find_data_dependencies("main", project_name=project_name)
 
         # 基本验证
         assert isinstance(result, dict), "应该返回dict"
@@ -254,7 +264,8 @@ class TestComplexProject:
 
     async def test_function_complexity_check(self, joern_server, complex_c_project):
         """测试函数复杂度检查"""
-        await import_code_safe(joern_server, str(complex_c_project), "complexity_test")
+        project_name = "complexity_test"
+        await import_code_safe(joern_server, str(complex_c_project), project_name)
 
         # 查询每个函数的行数作为复杂度指标
         query = "cpg.method.map(m => (m.name, m.numberOfLines)).l"
@@ -269,15 +280,16 @@ class TestComplexProject:
 
     async def test_callgraph_callers_validation(self, joern_server, complex_c_project):
         """测试调用图的caller分析 - 增强验证"""
-        await import_code_safe(
-            joern_server, str(complex_c_project), "callers_validation"
-        )
+        project_name = "callers_validation"
+        await import_code_safe(joern_server, str(complex_c_project), project_name)
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
 
         # 分析process_data的调用者（应该包括main和internal_handler）
-        result = await service.get_callers("process_data", depth=2)
+        result = await service.get_callers(
+            "process_data", depth=2, project_name=project_name
+        )
 
         # 严格验证结果结构
         assert result.get("success"), f"获取调用者失败: {result.get('error')}"
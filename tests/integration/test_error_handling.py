@@ -64,14 +64,14 @@ class TestBoundaryConditions:
     """边界条件测试"""
 
     @pytest.mark.asyncio
-    async def test_max_depth_limit(self, joern_server):
+    async def test_max_depth_limit(self, joern_server, shared_project):
         """测试最大深度限制"""
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
 
         # 测试深度限制（使用合理的深度值）
         # 注意：Joern可能没有内置的深度限制，查询语法错误会在raw_output中体现
-        result = await service.get_callers("main", depth=5)
+        result = await service.get_callers("main", depth=5, project_name=shared_project)
 
         # 应该能执行（可能返回空结果或错误信息）
         assert result.get("success") is not None
@@ -79,13 +79,15 @@ class TestBoundaryConditions:
         assert "callers" in result or "error" in result or "raw_output" in result
 
     @pytest.mark.asyncio
-    async def test_max_flows_limit(self, joern_server):
+    async def test_max_flows_limit(self, joern_server, shared_project):
         """测试最大流数量限制"""
         executor = QueryExecutor(joern_server)
         service = TaintAnalysisService(executor)
 
         # 超过最大流数量
-        result = await service.find_vulnerabilities(max_flows=100)
+        result = await service.find_vulnerabilities(
+            max_flows=100, project_name=shared_project
+        )
 
         # 应该被限制或正常返回
         assert result is not None
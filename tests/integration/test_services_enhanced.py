@@ -28,13 +28,16 @@ class TestCallGraphServiceEnhanced:
     async def test_get_call_chain(self, joern_server, sample_c_code):
         """测试获取调用链"""
         # 导入代码（使用安全方法避免event loop冲突）
-        await import_code_safe(joern_server, str(sample_c_code), "test_call_chain")
+        project_name = "test_call_chain"
+        await import_code_safe(joern_server, str(sample_c_code), project_name)
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
 
         # 测试获取调用链
-        result = await service.get_call_chain("main", max_depth=3)
+        result = await service.get_call_chain(
+            "main", max_depth=3, project_name=project_name
+        )
 
         # 基本验证
         assert isinstance(result, dict), f"返回类型应该是dict，实际: {type(result)}"
@@ -75,13 +78,16 @@ class TestCallGraphServiceEnhanced:
     async def test_get_call_graph(self, joern_server, sample_c_code):
         """测试获取完整调用图"""
         # 导入代码
-        await import_code_safe(joern_server, str(sample_c_code), "test_call_graph")
+        project_name = "test_call_graph"
+        await import_code_safe(joern_server, str(sample_c_code), project_name)
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
 
         # 测试获取调用图（参数名是depth，不是max_depth）
-        result = await service.get_call_graph(function_name="main", depth=2)
+        result = await service.get_call_graph(
+            function_name="main", depth=2, project_name=project_name
+        )
 
         # 严格验证
         assert isinstance(result, dict), f"返回类型应该是dict，实际: {type(result)}"
@@ -96,14 +102,17 @@ class TestCallGraphServiceEnhanced:
     @pytest.mark.asyncio
     async def test_get_callers_with_depth(self, joern_server, sample_c_code):
         """测试不同深度的调用者查询"""
-        await import_code_safe(joern_server, str(sample_c_code), "test_callers_depth")
+        project_name = "test_callers_depth"
+        await import_code_safe(joern_server, str(sample_c_code), project_name)
 
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
 
         # 测试不同深度
         for depth in [1, 2, 3]:
-            result = await service.get_callers("unsafe_strcpy", depth=depth)
+            result = await service.get_callers(
+                "unsafe_strcpy", depth=depth, project_name=project_name
+            )
 
             assert isinstance(result, dict), f"深度{depth}应返回dict"
             assert "function" in result, f"深度{depth}应包含function字段"
@@ -120,13 +129,16 @@ class TestDataFlowServiceEnhanced:
     @pytest.mark.asyncio
     async def test_analyze_variable_flow(self, joern_server, sample_c_code):
         """测试变量流分析"""
-        await import_code_safe(joern_server, str(sample_c_code), "test_var_flow")
+        project_name = "test_var_flow"
+        await import_code_safe(joern_server, str(sample_c_code), project_name)
 
         executor = QueryExecutor(joern_server)
         service = DataFlowService(executor)
 
         # 测试变量流分析
-        result = await service.analyze_variable_flow("main", "buffer")
+        result = await service.analyze_variable_flow(
+            "main", "buffer", project_name=project_name
+        )
 
         # 基本验证
         assert isinstance(result, dict), f"返回类型应该是dict，实际: {type(result)}"
@@ -175,13 +187,14 @@ class TestDataFlowServiceEnhanced:
     @pytest.mark.asyncio
     async def test_find_data_dependencies(self, joern_server, sample_c_code):
         """测试查找数据依赖"""
-        await import_code_safe(joern_server, str(sample_c_code), "test_data_deps")
+        project_name = "test_data_deps"
+        await import_code_safe(joern_server, str(sample_c_code), project_name)
 
         executor = QueryExecutor(joern_server)
         service = DataFlowService(executor)
 
         # 测试查找数据依赖
-        result = await service.find_data_dependencies("main")
+        result = await service.find_data_dependencies("main", project_name=project_name)
 
         # 基本验证
         assert isinstance(result, dict), f"返回类型应该是dict，实际: {type(result)}"
@@ -223,14 +236,17 @@ class TestDataFlowServiceEnhanced:
     @pytest.mark.asyncio
     async def test_track_dataflow_with_limits(self, joern_server, sample_c_code):
         """测试不同流限制的数据流追踪"""
-        await import_code_safe(joern_server, str(sample_c_code), "test_flow_limits")
+        project_name = "test_flow_limits"
+        await import_code_safe(joern_server, str(sample_c_code), project_name)
 
         executor = QueryExecutor(joern_server)
         service = DataFlowService(executor)
 
         # 测试不同的流限制
         for max_flows in [1, 5, 10]:
-            result = await service.track_dataflow("gets", "strcpy", max_flows=max_flows)
+            result = await service.track_dataflow(
+                "gets", "strcpy", max_flows=max_flows, project_name=project_name
+            )
 
             assert isinstance(result, dict), f"max_flows={max_flows}应返回dict"
             assert "success" in result, f"max_flows={max_flows}应包含success"
@@ -246,13 +262,16 @@ class TestTaintAnalysisServiceEnhanced:
     @pytest.mark.asyncio
     async def test_check_specific_flow(self, joern_server, sample_c_code):
         """测试检查特定流"""
-        await import_code_safe(joern_server, str(sample_c_code), "test_specific_flow")
+        project_name = "test_specific_flow"
+        await import_code_safe(joern_server, str(sample_c_code), project_name)
 
         executor = QueryExecutor(joern_server)
         service = TaintAnalysisService(executor)
 
         # 测试检查特定的source->sink流
-        result = await service.check_specific_flow("gets", "strcpy")
+        result = await service.check_specific_flow(
+            "gets", "strcpy", project_name=project_name
+        )
 
         # 严格验证
         assert isinstance(result, dict), f"返回类型应该是dict，实际: {type(result)}"
@@ -273,7 +292,8 @@ class TestTaintAnalysisServiceEnhanced:
     )
     async def test_analyze_with_all_rules(self, joern_server, sample_c_code):
         """测试使用所有规则进行分析"""
-        await import_code_safe(joern_server, str(sample_c_code), "test_all_rules")
+        project_name = "test_all_rules"
+        await import_code_safe(joern_server, str(sample_c_code), project_name)
 
         executor = QueryExecutor(joern_server)
         service = TaintAnalysisService(executor)
@@ -291,7 +311,7 @@ class TestTaintAnalysisServiceEnhanced:
 
             # 获取实际的TaintRule对象
             rule = get_rule_by_name(rule_name)
-            result = await service.analyze_with_rule(rule)
+            result = await service.analyze_with_rule(rule, project_name=project_name)
 
             assert isinstance(result, dict), f"规则{rule_name}应返回dict"
             assert "rule" in result, f"规则{rule_name}应包含rule字段"
@@ -302,14 +322,17 @@ class TestTaintAnalysisServiceEnhanced:
     @pytest.mark.asyncio
     async def test_find_vulnerabilities_with_limits(self, joern_server, sample_c_code):
         """测试不同限制的漏洞查找"""
-        await import_code_safe(joern_server, str(sample_c_code), "test_vuln_limits")
+        project_name = "test_vuln_limits"
+        await import_code_safe(joern_server, str(sample_c_code), project_name)
 
         executor = QueryExecutor(joern_server)
         service = TaintAnalysisService(executor)
 
         # 测试不同的流限制
         for max_flows in [1, 5, 10]:
-            result = await service.find_vulnerabilities(max_flows=max_flows)
+            result = await service.find_vulnerabilities(
+                max_flows=max_flows, project_name=project_name
+            )
 
             assert isinstance(result, dict), f"max_flows={max_flows}应返回dict"
             assert "success" in result, f"max_flows={max_flows}应包含success"
@@ -26,27 +26,29 @@ class TestToolsIntegration:
         assert result is not None
 
     @pytest.mark.asyncio
-    async def test_callgraph_service_flow(self, joern_server):
+    async def test_callgraph_service_flow(self, joern_server, shared_project):
         """测试调用图服务流程"""
         executor = QueryExecutor(joern_server)
         service = CallGraphService(executor)
 
         # 测试获取调用者
-        result = await service.get_callers("main", depth=1)
+        result = await service.get_callers("main", depth=1, project_name=shared_project)
         assert result is not None
 
         # 测试获取被调用者
-        result = await service.get_callees("main", depth=1)
+        result = await service.get_callees("main", depth=1, project_name=shared_project)
         assert result is not None
 
     @pytest.mark.asyncio
-    async def test_dataflow_service_flow(self, joern_server):
+    async def test_dataflow_service_flow(self, joern_server, shared_project):
         """测试数据流服务流程"""
         executor = QueryExecutor(joern_server)
         service = DataFlowService(executor)
 
         # 测试追踪数据流
-        result = await service.track_dataflow("gets", "system", max_flows=5)
+        result = await service.track_dataflow(
+            "gets", "system", max_flows=5, project_name=shared_project
+        )
         assert result is not None
 
     @pytest.mark.asyncio
@@ -66,7 +68,7 @@ class TestToolsIntegration:
         assert result["rule"]["severity"] == "CRITICAL"
 
     @pytest.mark.asyncio
-    async def test_concurrent_service_calls(self, joern_server):
+    async def test_concurrent_service_calls(self, joern_server, shared_project):
         """测试并发服务调用"""
         import asyncio
         import warnings
@@ -77,9 +79,11 @@ class TestToolsIntegration:
 
         # 并发调用多个服务
         tasks = [
-            callgraph_service.get_callers("main", depth=1),
-            callgraph_service.get_callees("main", depth=1),
-            dataflow_service.track_dataflow("gets", "system", max_flows=5),
+            callgraph_service.get_callers("main", depth=1, project_name=shared_project),
+            callgraph_service.get_callees("main", depth=1, project_name=shared_project),
+            dataflow_service.track_dataflow(
+                "gets", "system", max_flows=5, project_name=shared_project
+            ),
         ]
 
         # 使用warnings过滤器抑制CPGQLSClient的协程警告
@@ -0,0 +1,101 @@
+"""
+e2e 和集成测试共用的 Joern 服务器辅助函数和 fixture
+
+两个目录的 conftest 都从这里导入，保证预热和清理逻辑（包括查询缓存失效）一致。
+"""
+
+import contextlib
+from pathlib import Path
+
+import pytest_asyncio
+from loguru import logger
+
+from joern_mcp.joern.server import JoernServerManager
+from joern_mcp.utils.port_utils import find_free_port
+from joern_mcp.utils.project_utils import invalidate_project_cache
+from tests.e2e.test_helpers import invalidate_query_cache
+
+# 预热查询：覆盖 REPL 编译、方法定义、workspace 访问和常用 CPG 遍历（空 CPG 上执行）
+_WARMUP_QUERIES = (
+    "1 + 1",
+    "def __warm(x: Int) = x + 1; __warm(1)",
+    "workspace.projects.size",
+    "io.shiftleft.codepropertygraph.generated.Cpg.empty.method.size",
+    "io.shiftleft.codepropertygraph.generated.Cpg.empty.call.size",
+    "io.shiftleft.codepropertygraph.generated.Cpg.empty.identifier.size",
+)
+
+# 先取项目名快照再逐个删除（避免边遍历边修改 workspace），整个批次只需一次往返
+_DELETE_ALL_PROJECTS_QUERY = (
+    "workspace.projects.map(_.name).toList.foreach(name => delete(name))"
+)
+
+# 启动服务器的尝试次数：探测到的空闲端口可能在 Joern 绑定前被占用，换端口重试一次
+_START_ATTEMPTS = 2
+
+# 本进程中正在使用的 Joern 服务器，供模块级清理查找（不会因此启动服务器）
+ACTIVE_SERVERS: list = []
+
+
+async def start_server(
+    cwd: Path | None = None, timeout: int = 30
+) -> JoernServerManager:
+    """在内核分配的空闲端口上启动 Joern Server
+
+    端口在关闭探测 socket 后到 Joern 绑定之前可能被其他进程占用，失败时换端口重试一次。
+    cwd 指定 Joern 的工作目录，不同目录的服务器各自拥有独立的 workspace。
+    """
+    cwd = str(cwd) if cwd else None
+    for attempt in range(_START_ATTEMPTS):
+        manager = JoernServerManager(port=find_free_port())
+        try:
+            await manager.start(timeout=timeout, cwd=cwd)
+            return manager
+        except Exception as e:
+            with contextlib.suppress(Exception):
+                await manager.stop()
+            if attempt == _START_ATTEMPTS - 1:
+                raise
+            logger.warning(f"Joern server failed on port {manager.port}, retrying: {e}")
+
+
+async def warm_up(server) -> None:
+    """执行一组代表性查询，让 Joern REPL 和 JVM 完成预热，避免第一个测试承担该延迟"""
+    for query in _WARMUP_QUERIES:
+        with contextlib.suppress(Exception):
+            await server.execute_query_async(query)
+
+
+async def delete_all_projects(server) -> None:
+    """删除 workspace 中的所有项目（忽略清理错误）"""
+    with contextlib.suppress(Exception):
+        await server.execute_query_async(_DELETE_ALL_PROJECTS_QUERY)
+    # 项目已被删除，清空验证缓存和查询结果缓存
+    invalidate_project_cache()
+    invalidate_query_cache(server)
+
+
+async def delete_dirty_projects(server) -> None:
+    """一次查询删除 server._dirty 中记录的项目（忽略清理错误）"""
+    dirty = server._dirty
+    if not dirty:
+        return
+    names = ", ".join(f'"{name}"' for name in sorted(dirty))
+    with contextlib.suppress(Exception):
+        await server.execute_query_async(f"List({names}).foreach(name => delete(name))")
+    for name in dirty:
+        invalidate_project_cache(name)
+    dirty.clear()
+    invalidate_query_cache(server)
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session", autouse=True)
+async def cleanup_projects_after_module():
+    """模块结束时用一次查询删除本模块导入的项目
+
+    不依赖 joern_server：未启动服务器或没有导入项目的模块不会查询 Joern。
+    """
+    yield
+
+    for server in ACTIVE_SERVERS:
+        await delete_dirty_projects(server)
@@ -5,7 +5,7 @@
 """
 
 import asyncio
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -13,6 +13,7 @@ from joern_mcp.joern.executor_optimized import (
     OptimizedQueryExecutor,
     QueryExecutionError,
     QueryValidationError,
+    mutates_workspace,
 )
 
 
@@ -387,3 +388,202 @@ class TestOptimizedQueryExecutor:
 
         # 第二次调用不应该执行查询（缓存命中）
         assert call_count_2 == call_count_1
+
+    @pytest.mark.asyncio
+    async def test_workspace_mutation_invalidates_cache(self):
+        """测试改变工作区的查询不缓存，并使已缓存的读查询失效"""
+        mock_server = MagicMock()
+        mock_server.execute_query_async = AsyncMock(
+            return_value={"success": True, "stdout": "[]"}
+        )
+
+        executor = OptimizedQueryExecutor(mock_server)
+        await executor.execute("cpg.method.name.l")
+        await executor.execute('open("other")', format="raw")
+        await executor.execute('open("other")', format="raw")
+        await executor.execute("cpg.method.name.l")
+
+        assert mock_server.execute_query_async.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_workspace_mutation_invalidates_project_cache(self):
+        """测试经执行器删除或关闭项目时，项目验证缓存一并失效"""
+        mock_server = MagicMock()
+        mock_server.execute_query_async = AsyncMock(
+            return_value={"success": True, "stdout": "true"}
+        )
+
+        executor = OptimizedQueryExecutor(mock_server)
+        with patch(
+            "joern_mcp.joern.executor_optimized.invalidate_project_cache"
+        ) as mock_invalidate:
+            await executor.execute("cpg.method.name.l")
+            mock_invalidate.assert_not_called()
+            await executor.execute('delete("demo")', format="raw")
+
+        mock_invalidate.assert_called_once_with()
+
+    def test_mutates_workspace(self):
+        """测试识别改变工作区的查询，忽略字符串字面量"""
+        assert mutates_workspace('importCode("/src", "demo")')
+        assert mutates_workspace('delete("demo")')
+        assert mutates_workspace('workspace.projects.name("demo").delete')
+        assert mutates_workspace("workspace.reset")
+        assert mutates_workspace('importCode.c("/x")')
+        assert mutates_workspace('importCode.java("/x", "demo")')
+        assert mutates_workspace('workspace.setActiveProject("p")')
+        assert mutates_workspace("close")
+        assert mutates_workspace("project.close")
+        assert mutates_workspace('switchWorkspace("/tmp/ws")')
+        assert not mutates_workspace('cpg.call.name("delete").l')
+        assert not mutates_workspace("cpg.method.name.l")
+        assert not mutates_workspace('cpg.call.name("close").l')
+        assert not mutates_workspace("cpg.method.isExternal(false).name.l")
+
+
+class TestBatchExecute:
+    """测试批量查询合并执行"""
+
+    @pytest.mark.asyncio
+    async def test_single_round_trip(self):
+        """测试多个查询合并为一次请求，并按分隔行拆分输出"""
+        mock_server = MagicMock()
+        mock_server.execute_query_async = AsyncMock(
+            return_value={
+                "success": True,
+                "stdout": "<<<joern-mcp-batch:0>>>\n"
+                '["main"]\n'
+                "<<<joern-mcp-batch:1>>>\n"
+                '["strcpy"]\n',
+            }
+        )
+
+        executor = OptimizedQueryExecutor(mock_server)
+        batch = await executor.batch_execute(["cpg.method.name.l", "cpg.call.name.l"])
+
+        assert batch["round_trips"] == 1
+        assert [r["stdout"] for r in batch["results"]] == ['["main"]', '["strcpy"]']
+        combined = mock_server.execute_query_async.await_args.args[0]
+        assert "println(cpg.method.name.l.toJson)" in combined
+
+    @pytest.mark.asyncio
+    async def test_fallback_to_individual_queries(self):
+        """测试合并查询失败时逐个执行"""
+        mock_server = MagicMock()
+        mock_server.execute_query_async = AsyncMock(
+            side_effect=[
+                {"success": False, "stderr": "compile error"},
+                {"success": True, "stdout": "[]"},
+                {"success": False, "stderr": "Not found"},
+            ]
+        )
+
+        executor = OptimizedQueryExecutor(mock_server)
+        batch = await executor.batch_execute(["cpg.method.l", "cpg.bad"])
+
+        assert batch["round_trips"] == 3
+        assert batch["results"][0]["success"] is True
+        assert isinstance(batch["results"][1], QueryExecutionError)
+
+    @pytest.mark.asyncio
+    async def test_cached_and_invalid_queries_skipped(self):
+        """测试缓存命中和验证失败的查询不会提交"""
+        mock_server = MagicMock()
+        mock_server.execute_query_async = AsyncMock(
+            return_value={"success": True, "stdout": '["main"]'}
+        )
+
+        executor = OptimizedQueryExecutor(mock_server)
+        await executor.execute("cpg.method.name.l")
+        batch = await executor.batch_execute(["cpg.method.name.l", "System.exit(0)"])
+
+        assert batch["round_trips"] == 0
+        assert batch["results"][0]["stdout"] == '["main"]'
+        assert isinstance(batch["results"][1], QueryValidationError)
+        assert mock_server.execute_query_async.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_combined_results_cached(self):
+        """测试合并执行的结果写回缓存"""
+        mock_server = MagicMock()
+        mock_server.execute_query_async = AsyncMock(
+            return_value={
+                "success": True,
+                "stdout": '<<<joern-mcp-batch:0>>>\n["main"]\n',
+            }
+        )
+
+        executor = OptimizedQueryExecutor(mock_server)
+        await executor.batch_execute(["cpg.method.name.l"])
+        result = await executor.execute("cpg.method.name.l")
+
+        assert result["stdout"] == '["main"]'
+        assert mock_server.execute_query_async.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_partial_output_retries_remaining(self):
+        """测试合并查询中途出错时只重试没有输出的查询"""
+        mock_server = MagicMock()
+        mock_server.execute_query_async = AsyncMock(
+            side_effect=[
+                {
+                    "success": False,
+                    "stdout": "<<<joern-mcp-batch:0>>>\n"
+                    '["main"]\n'
+                    "<<<joern-mcp-batch:1>>>\n"
+                    "java.lang.RuntimeException",
+                    "stderr": "error",
+                },
+                {"success": True, "stdout": '["strcpy"]'},
+            ]
+        )
+
+        executor = OptimizedQueryExecutor(mock_server)
+        batch = await executor.batch_execute(["cpg.method.name.l", "cpg.call.name.l"])
+
+        assert batch["round_trips"] == 2
+        assert [r["stdout"] for r in batch["results"]] == ['["main"]', '["strcpy"]']
+        retried = mock_server.execute_query_async.await_args.args[0]
+        assert retried == "cpg.call.name.l.toJson"
+
+    @pytest.mark.asyncio
+    async def test_mutation_stops_combining(self):
+        """测试改变工作区的查询及其后的查询逐个执行，且不读取过期缓存"""
+        mock_server = MagicMock()
+        mock_server.execute_query_async = AsyncMock(
+            side_effect=[
+                {"success": True, "stdout": '["old"]'},
+                {"success": True, "stdout": "true"},
+                {"success": True, "stdout": '["new"]'},
+            ]
+        )
+
+        executor = OptimizedQueryExecutor(mock_server)
+        await executor.execute("cpg.method.name.l")
+        batch = await executor.batch_execute(
+            ['open("other")', "cpg.method.name.l", "System.exit(0)"]
+        )
+
+        assert batch["round_trips"] == 2
+        assert batch["results"][1]["stdout"] == '["new"]'
+        assert isinstance(batch["results"][2], QueryValidationError)
+        assert mock_server.execute_query_async.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_single_timeout_for_batch(self, monkeypatch):
+        """测试整个批次共用一个超时"""
+
+        async def slow_query(query):
+            await asyncio.sleep(1)
+            return {"success": True, "stdout": "[]"}
+
+        mock_server = MagicMock()
+        mock_server.execute_query_async = slow_query
+
+        executor = OptimizedQueryExecutor(mock_server)
+        monkeypatch.setattr(
+            "joern_mcp.joern.executor_optimized.settings.query_timeout", 0.05
+        )
+        batch = await executor.batch_execute(["cpg.method.l", "cpg.call.l"])
+
+        assert all(isinstance(r, QueryExecutionError) for r in batch["results"])
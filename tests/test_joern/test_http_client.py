@@ -0,0 +1,63 @@
+"""
+测试 Joern HTTP 客户端（Mock版本）
+"""
+
+from unittest.mock import MagicMock, patch
+
+import orjson
+import pytest
+
+from joern_mcp.joern.http_client import JoernHTTPClient, strip_ansi_codes
+
+
+def make_response(status_code=200, payload=None):
+    """构造模拟的 requests 响应"""
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = orjson.dumps(payload or {})
+    response.text = ""
+    return response
+
+
+class TestJoernHTTPClient:
+    """测试 JoernHTTPClient"""
+
+    def test_strip_ansi_codes(self):
+        """测试移除 ANSI 颜色码"""
+        assert strip_ansi_codes("\x1b[32mval res0\x1b[0m") == "val res0"
+
+    @pytest.mark.asyncio
+    async def test_sync_query_uses_shared_session(self):
+        """测试同步端点查询复用客户端的 HTTP 会话"""
+        client = JoernHTTPClient("localhost:8080")
+        response = make_response(payload={"stdout": "\x1b[33mval res0: Int = 2\x1b[0m"})
+
+        with patch.object(client._session, "post", return_value=response) as post:
+            result = await client.execute("1 + 1", use_sync_endpoint=True)
+            await client.execute("1 + 1", use_sync_endpoint=True)
+
+        assert result == {"success": True, "stdout": "val res0: Int = 2", "stderr": ""}
+        assert post.call_count == 2
+        assert post.call_args.args[0] == "http://localhost:8080/query-sync"
+
+    @pytest.mark.asyncio
+    async def test_close_closes_session(self):
+        """测试关闭客户端时关闭 HTTP 会话"""
+        client = JoernHTTPClient("localhost:8080")
+
+        with patch.object(client._session, "close") as close:
+            await client.close()
+
+        close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_sync_query_error(self):
+        """测试同步端点返回错误"""
+        client = JoernHTTPClient("localhost:8080")
+        response = make_response(status_code=500)
+
+        with patch.object(client._session, "post", return_value=response):
+            result = await client.execute("bad", use_sync_endpoint=True)
+
+        assert result["success"] is False
+        assert "HTTP 500" in result["stderr"]
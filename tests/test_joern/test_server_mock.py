@@ -5,7 +5,7 @@
 """
 
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -37,6 +37,28 @@ class TestJoernServerManagerMock:
             assert manager.host is not None
             assert manager.port is not None
 
+    @pytest.mark.asyncio
+    async def test_wait_for_port_release(self):
+        """测试端口释放后立即返回，超时返回 False"""
+        with (
+            patch("shutil.which", return_value="/usr/local/bin/joern"),
+            patch.object(Path, "exists", return_value=True),
+        ):
+            manager = JoernServerManager(port=9999)
+
+            with patch(
+                "joern_mcp.joern.server.is_port_available",
+                side_effect=[False, False, True],
+            ) as available:
+                assert await manager._wait_for_port_release(9999) is True
+                assert available.call_count == 3
+
+            with (
+                patch("joern_mcp.joern.server.is_port_available", return_value=False),
+                patch("joern_mcp.joern.server._PORT_RELEASE_TIMEOUT", 0.1),
+            ):
+                assert await manager._wait_for_port_release(9999) is False
+
     @pytest.mark.asyncio
     async def test_start_with_port_occupied(self):
         """测试端口被占用且禁用自动选择端口时启动失败"""
@@ -152,7 +174,6 @@ class TestJoernServerManagerMock:
     @pytest.mark.asyncio
     async def test_execute_query_async(self):
         """测试异步查询执行"""
-        from unittest.mock import AsyncMock
 
         with (
             patch("shutil.which", return_value="/usr/local/bin/joern"),
@@ -192,7 +213,6 @@ class TestJoernServerManagerMock:
     @pytest.mark.asyncio
     async def test_health_check_running(self):
         """测试运行中服务器的健康检查"""
-        from unittest.mock import AsyncMock
 
         with (
             patch("shutil.which", return_value="/usr/local/bin/joern"),
@@ -232,7 +252,6 @@ class TestJoernServerManagerMock:
     @pytest.mark.asyncio
     async def test_import_code_mock(self):
         """测试代码导入（Mock）"""
-        from unittest.mock import AsyncMock
 
         with (
             patch("shutil.which", return_value="/usr/local/bin/joern"),
@@ -278,7 +297,6 @@ class TestJoernServerErrorHandling:
     @pytest.mark.asyncio
     async def test_execute_query_client_error(self):
         """测试client执行查询出错"""
-        from unittest.mock import AsyncMock
 
         with (
             patch("shutil.which", return_value="/usr/local/bin/joern"),
@@ -296,7 +314,6 @@ class TestJoernServerErrorHandling:
     @pytest.mark.asyncio
     async def test_import_code_failure(self):
         """测试代码导入失败"""
-        from unittest.mock import AsyncMock
 
         with (
             patch("shutil.which", return_value="/usr/local/bin/joern"),
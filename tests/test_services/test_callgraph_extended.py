@@ -27,7 +27,7 @@ class TestCallGraphServiceExtended:
 
         result = await service.get_callers("test_func", project_name="test")
 
-        # 解析失败时返回空列表（使用safe_parse_joern_response的默认值）
+        # 解析失败时返回空列表（safe_parse_joern_list 的默认值）
         assert result["success"] is True
         assert result["callers"] == []
         assert result["count"] == 0
@@ -161,3 +161,37 @@ class TestTaintEdgeCases:
         for rule in VULNERABILITY_RULES[:3]:  # 只测试前3个规则
             result = await service.analyze_with_rule(rule, max_flows=5)
             assert result["success"] is True
+
+
+class TestTaintToolService:
+    """测试污点分析工具复用服务实例"""
+
+    def test_service_reused_for_same_executor(self, monkeypatch, mock_query_executor):
+        """测试同一执行器复用服务"""
+        from joern_mcp.tools import taint as taint_tools
+
+        monkeypatch.setattr(
+            taint_tools.server_state, "query_executor", mock_query_executor
+        )
+
+        first = taint_tools._get_service()
+        assert taint_tools._get_service() is first
+        assert first.executor is mock_query_executor
+
+    def test_service_rebuilt_when_executor_changes(
+        self, monkeypatch, mock_query_executor
+    ):
+        """测试执行器变化时重建服务"""
+        from joern_mcp.tools import taint as taint_tools
+
+        monkeypatch.setattr(
+            taint_tools.server_state, "query_executor", mock_query_executor
+        )
+        first = taint_tools._get_service()
+
+        other_executor = AsyncMock()
+        monkeypatch.setattr(taint_tools.server_state, "query_executor", other_executor)
+
+        second = taint_tools._get_service()
+        assert second is not first
+        assert second.executor is other_executor
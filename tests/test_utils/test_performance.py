@@ -71,6 +71,25 @@ class TestPerformanceMetrics:
 
         assert p50 < p95 < p99
 
+    def test_percentile_interpolation(self):
+        """测试百分位在相邻样本间线性插值"""
+        metrics = PerformanceMetrics()
+        for value in [4.0, 1.0, 3.0, 2.0]:
+            metrics.record_query(value, success=True, cached=False)
+
+        assert metrics.get_percentile(0) == 1.0
+        assert metrics.get_percentile(50) == 2.5
+        assert metrics.get_percentile(100) == 4.0
+
+    def test_percentile_cache_invalidated_on_record(self):
+        """测试记录新查询后百分位重新计算"""
+        metrics = PerformanceMetrics()
+        metrics.record_query(1.0, success=True, cached=False)
+        assert metrics.get_percentile(99) == 1.0
+
+        metrics.record_query(9.0, success=True, cached=False)
+        assert metrics.get_percentile(100) == 9.0
+
     def test_min_max_time(self):
         """测试最小/最大时间"""
         metrics = PerformanceMetrics()
@@ -92,6 +111,17 @@ class TestPerformanceMetrics:
         assert "p50" in result
         assert "cache_hit_rate" in result
 
+    def test_to_dict_percentiles_match_get_percentile(self):
+        """测试to_dict中的百分位与get_percentile一致"""
+        metrics = PerformanceMetrics()
+        for i in range(100, 0, -1):
+            metrics.record_query(i / 100.0, success=True, cached=False)
+
+        result = metrics.to_dict()
+        assert result["p50"] == round(metrics.get_percentile(50), 3)
+        assert result["p95"] == round(metrics.get_percentile(95), 3)
+        assert result["p99"] == round(metrics.get_percentile(99), 3)
+
     def test_query_times_limit(self):
         """测试查询时间列表限制"""
         metrics = PerformanceMetrics()
@@ -202,6 +232,19 @@ class TestHybridCache:
         assert cache.get("small") == small_dict
         assert cache.get("large") == large_dict
 
+    def test_set_compressed_entry_not_recompressed(self):
+        """测试已压缩的条目再次写入时不重复压缩"""
+        cache = HybridCache(compress_threshold=100)
+        large_data = {"data": "x" * 1000}
+
+        cache.set("key1", large_data)
+        raw_entry = cache.cold_cache["key1"]
+        cache.set("key2", raw_entry, hot=True)
+
+        assert cache.hot_cache["key2"] is raw_entry
+        assert cache.get_stats()["compressed"] == 1
+        assert cache.get("key2") == large_data
+
     def test_list_compression(self):
         """测试列表数据压缩"""
         cache = HybridCache(compress_threshold=50)
@@ -297,6 +340,73 @@ class TestAdaptiveSemaphore:
 
         assert sem2.get_current_limit() >= 3
 
+    @pytest.mark.asyncio
+    async def test_adjust_keeps_same_semaphore(self):
+        """测试调整并发限制时复用同一个信号量"""
+        sem = AdaptiveSemaphore(min_concurrent=2, max_concurrent=10)
+        original = sem.semaphore
+
+        for _i in range(10):
+            await sem.adjust(0.01)
+
+        assert sem.get_current_limit() == 4
+        assert sem.semaphore is original
+
+    @pytest.mark.asyncio
+    async def test_adjust_skips_lock_when_unchanged(self):
+        """测试限制不变时不获取锁"""
+        sem = AdaptiveSemaphore(
+            min_concurrent=5, max_concurrent=20, target_response_time=1.0
+        )
+
+        async with sem.lock:
+            # 锁被占用时，限制不变的评估也应立即返回
+            for _i in range(10):
+                await asyncio.wait_for(sem.adjust(1.0), timeout=1)
+
+        assert sem.get_current_limit() == 5
+        assert sem.recent_times == []
+
+    @pytest.mark.asyncio
+    async def test_grow_wakes_waiters(self):
+        """测试扩容时唤醒已在等待的任务"""
+        sem = AdaptiveSemaphore(min_concurrent=1, max_concurrent=5)
+
+        await sem.__aenter__()
+        waiter = asyncio.create_task(sem.__aenter__())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        for _i in range(10):
+            await sem.adjust(0.01)
+
+        await asyncio.wait_for(waiter, timeout=1)
+        await sem.__aexit__(None, None, None)
+        await sem.__aexit__(None, None, None)
+
+    @pytest.mark.asyncio
+    async def test_shrink_while_busy(self):
+        """测试许可占用中收缩，退出时收回许可"""
+        sem = AdaptiveSemaphore(min_concurrent=2, max_concurrent=10)
+        for _i in range(10):
+            await sem.adjust(0.01)
+        assert sem.get_current_limit() == 4
+
+        for _ in range(4):
+            await sem.__aenter__()
+
+        for _i in range(10):
+            await sem.adjust(10.0)
+        assert sem.get_current_limit() == 2
+
+        for _ in range(4):
+            await sem.__aexit__(None, None, None)
+
+        # 只剩2个许可可用
+        await sem.__aenter__()
+        await sem.__aenter__()
+        assert sem.semaphore.locked()
+
 
 class TestQueryComplexityAnalyzer:
     """测试查询复杂度分析器"""
@@ -335,6 +445,14 @@ class TestQueryComplexityAnalyzer:
         # 嵌套深度应该影响复杂度
         assert result["nesting_depth"] > 0
 
+    def test_nesting_depth_value(self):
+        """测试嵌套深度计算"""
+        analyzer = QueryComplexityAnalyzer()
+
+        assert analyzer.analyze("cpg.method.l")["nesting_depth"] == 0
+        assert analyzer.analyze("a(b(c)d(e(f)))")["nesting_depth"] == 3
+        assert analyzer.analyze(")(")["nesting_depth"] == 0
+
     def test_expensive_operations(self):
         """测试expensive操作"""
         analyzer = QueryComplexityAnalyzer()
@@ -347,6 +465,15 @@ class TestQueryComplexityAnalyzer:
         # 应该有较高复杂度
         assert result["complexity"] > 5
 
+    def test_repeated_expensive_operation_counted_once(self):
+        """测试同一种expensive操作重复出现只计一次"""
+        analyzer = QueryComplexityAnalyzer()
+
+        once = analyzer.analyze("cpg.method.flows.l")
+        repeated = analyzer.analyze("cpg.flows.flows.flows.l")
+
+        assert repeated["complexity"] == once["complexity"]
+
     def test_priority_calculation(self):
         """测试优先级计算"""
         analyzer = QueryComplexityAnalyzer()
@@ -5,6 +5,9 @@ tests/test_utils/test_port_utils.py
 """
 
 import socket
+from unittest.mock import patch
+
+import pytest
 
 from joern_mcp.utils.port_utils import find_free_port, is_port_available, is_port_in_use
 
@@ -176,6 +179,34 @@ class TestPortUtilsExtended:
         port = find_free_port(start_port=52000, end_port=52010)
         assert 52000 <= port <= 52010
 
+    def test_find_free_port_os_assigned(self):
+        """测试未指定范围时由系统分配端口，不做随机探测"""
+        with patch("joern_mcp.utils.port_utils.is_port_available") as mock_probe:
+            port = find_free_port()
+
+        mock_probe.assert_not_called()
+        assert is_port_available(port)
+
+    def test_find_free_port_retries_occupied(self):
+        """测试候选端口被占用时继续随机探测"""
+        results = iter([False] * 3 + [True])
+        with patch(
+            "joern_mcp.utils.port_utils.is_port_available",
+            side_effect=lambda _port, _host: next(results),
+        ) as mock_probe:
+            port = find_free_port(start_port=53000, end_port=53100)
+
+        assert 53000 <= port <= 53100
+        assert mock_probe.call_count == 4
+
+    def test_find_free_port_exhausted(self):
+        """测试所有尝试失败时抛出异常"""
+        with (
+            patch("joern_mcp.utils.port_utils.is_port_available", return_value=False),
+            pytest.raises(RuntimeError),
+        ):
+            find_free_port(start_port=53000, end_port=53100, max_attempts=20)
+
     def test_port_operations_with_different_hosts(self):
         """测试不同主机的端口操作"""
         port = find_free_port()
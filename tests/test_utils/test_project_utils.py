@@ -0,0 +1,237 @@
+"""
+tests/test_utils/test_project_utils.py
+
+测试项目操作辅助函数
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from joern_mcp.utils.project_utils import (
+    _parse_project_probe,
+    get_safe_cpg_prefix,
+    invalidate_project_cache,
+    list_available_projects,
+    validate_project_exists,
+    validate_project_has_cpg,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_project_cache():
+    """每个测试前后清空项目验证缓存"""
+    invalidate_project_cache()
+    yield
+    invalidate_project_cache()
+
+
+def make_executor(*results):
+    """按顺序返回给定结果的查询执行器"""
+    executor = AsyncMock()
+    executor.execute = AsyncMock(side_effect=list(results))
+    return executor
+
+
+class TestParseProjectProbe:
+    """测试项目探测结果解析"""
+
+    def test_plain_tuple(self):
+        """测试直接的二元组输出"""
+        assert _parse_project_probe("(true, false)") == (True, False, None)
+
+    def test_repl_format(self):
+        """测试 Scala REPL 格式输出"""
+        stdout = 'val res0: (Boolean, Boolean, String) = (true, true, "Demo,other")'
+        assert _parse_project_probe(stdout) == (True, True, ["Demo", "other"])
+
+    def test_empty_project_list(self):
+        """测试工作区没有项目"""
+        assert _parse_project_probe('(false, false, "")') == (False, False, [])
+
+    def test_unparseable(self):
+        """测试无法解析的输出"""
+        assert _parse_project_probe("") is None
+        assert _parse_project_probe("val res0: Int = 3") is None
+
+
+class TestValidateProject:
+    """测试项目验证"""
+
+    @pytest.mark.asyncio
+    async def test_project_with_cpg_single_query(self):
+        """测试项目存在且已加载 CPG 时只需一次查询"""
+        executor = make_executor({"success": True, "stdout": "(true, true)"})
+
+        has_cpg, error = await validate_project_has_cpg(executor, "demo")
+
+        assert has_cpg is True
+        assert error is None
+        assert executor.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_project_exists_ignores_cpg(self):
+        """测试 validate_project_exists 不关心 CPG 状态"""
+        executor = make_executor({"success": True, "stdout": "(true, false)"})
+
+        exists, error = await validate_project_exists(executor, "demo")
+
+        assert exists is True
+        assert error is None
+
+    @pytest.mark.asyncio
+    async def test_project_not_found_lists_available(self):
+        """测试项目不存在时列出可用项目"""
+        executor = make_executor({"success": True, "stdout": '(false, false, "other")'})
+
+        has_cpg, error = await validate_project_has_cpg(executor, "demo")
+
+        assert has_cpg is False
+        assert "not found" in error
+        assert "other" in error
+        assert executor.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_project_not_found_without_list(self):
+        """测试探测结果不含项目列表时单独查询"""
+        executor = make_executor(
+            {"success": True, "stdout": "(false, false)"},
+            {"success": True, "stdout": '["other"]'},
+        )
+
+        has_cpg, error = await validate_project_has_cpg(executor, "demo")
+
+        assert has_cpg is False
+        assert "other" in error
+
+    @pytest.mark.asyncio
+    async def test_cpg_not_loaded_opens_project(self):
+        """测试 CPG 未加载时尝试打开项目"""
+        executor = make_executor(
+            {"success": True, "stdout": "(true, false)"},
+            {"success": True, "stdout": ""},
+            {"success": True, "stdout": "val res1: Int = 12"},
+        )
+
+        has_cpg, error = await validate_project_has_cpg(executor, "demo")
+
+        assert has_cpg is True
+        assert error is None
+        assert 'open("demo")' in executor.execute.await_args_list[1].args[0]
+
+    @pytest.mark.asyncio
+    async def test_cpg_verify_non_numeric(self):
+        """测试 method.size 结果不是数字时视为加载失败"""
+        executor = make_executor(
+            {"success": True, "stdout": "(true, false)"},
+            {"success": True, "stdout": ""},
+            {"success": True, "stdout": "val res1: Option[Int] = None"},
+        )
+
+        has_cpg, error = await validate_project_has_cpg(executor, "demo")
+
+        assert has_cpg is False
+        assert "could not be loaded" in error
+
+    @pytest.mark.asyncio
+    async def test_cpg_load_failure(self):
+        """测试 CPG 加载失败"""
+        executor = make_executor(
+            {"success": True, "stdout": "(true, false)"},
+            {"success": False, "stderr": "error"},
+        )
+
+        has_cpg, error = await validate_project_has_cpg(executor, "demo")
+
+        assert has_cpg is False
+        assert "could not be loaded" in error
+
+    @pytest.mark.asyncio
+    async def test_query_failure(self):
+        """测试查询失败"""
+        executor = make_executor({"success": False, "stderr": "Not Found Error"})
+
+        exists, error = await validate_project_exists(executor, "demo")
+
+        assert exists is False
+        assert "not found" in error
+
+    @pytest.mark.asyncio
+    async def test_validated_project_is_cached(self):
+        """测试验证通过的项目在 TTL 内不再查询 Joern"""
+        executor = make_executor({"success": True, "stdout": "(true, true)"})
+
+        assert await validate_project_has_cpg(executor, "demo") == (True, None)
+        assert await validate_project_has_cpg(executor, "demo") == (True, None)
+        assert await validate_project_exists(executor, "demo") == (True, None)
+        assert executor.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_scoped_to_executor(self):
+        """测试缓存按查询执行器区分"""
+        first = make_executor({"success": True, "stdout": "(true, true)"})
+        second = make_executor({"success": True, "stdout": "(true, true)"})
+
+        await get_safe_cpg_prefix(first, "demo")
+        await get_safe_cpg_prefix(first, "demo")
+        await get_safe_cpg_prefix(second, "demo")
+
+        assert first.execute.await_count == 1
+        assert second.execute.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_project_cache(self):
+        """测试缓存失效后重新查询"""
+        executor = make_executor(
+            {"success": True, "stdout": "(true, true)"},
+            {"success": True, "stdout": "(true, true)"},
+        )
+
+        await validate_project_has_cpg(executor, "demo")
+        invalidate_project_cache("demo")
+        await validate_project_has_cpg(executor, "demo")
+
+        assert executor.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_project_not_cached(self):
+        """测试验证失败的结果不缓存"""
+        executor = make_executor(
+            {"success": False, "stderr": "Not Found Error"},
+            {"success": True, "stdout": "(true, true)"},
+        )
+
+        assert (await validate_project_has_cpg(executor, "demo"))[0] is False
+        assert (await validate_project_has_cpg(executor, "demo"))[0] is True
+
+    @pytest.mark.asyncio
+    async def test_available_projects_cached(self):
+        """测试项目列表在 TTL 内复用，缓存失效后重新查询"""
+        executor = make_executor(
+            {"success": True, "stdout": '["a", "b"]'},
+            {"success": True, "stdout": '["a"]'},
+        )
+
+        assert await list_available_projects(executor) == ["a", "b"]
+        assert await list_available_projects(executor) == ["a", "b"]
+        invalidate_project_cache("b")
+        assert await list_available_projects(executor) == ["a"]
+        assert executor.execute.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_get_safe_cpg_prefix(self):
+        """测试获取安全的 CPG 前缀"""
+        executor = make_executor({"success": True, "stdout": "(true, true)"})
+
+        prefix, error = await get_safe_cpg_prefix(executor, "demo")
+
+        assert prefix == 'workspace.project("demo").get.cpg.get'
+        assert error is None
+
+    @pytest.mark.asyncio
+    async def test_get_safe_cpg_prefix_requires_name(self):
+        """测试未提供项目名称"""
+        prefix, error = await get_safe_cpg_prefix(AsyncMock(), "")
+
+        assert prefix is None
+        assert "project_name is required" in error
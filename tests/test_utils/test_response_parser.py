@@ -0,0 +1,226 @@
+"""
+tests/test_utils/test_response_parser.py
+
+测试 Joern 响应解析工具
+"""
+
+import json
+
+import pytest
+
+from joern_mcp.utils.response_parser import (
+    _assignment_value,
+    _find_json_start,
+    _parse_cached,
+    _parse_scala_list,
+    _recursively_parse_json,
+    _strip_doubled_quotes,
+    extract_json_from_repl,
+    parse_joern_response,
+    safe_parse_joern_list,
+    safe_parse_joern_response,
+)
+
+
+class TestParseJoernResponse:
+    """测试 parse_joern_response"""
+
+    def test_empty(self):
+        """测试空输出"""
+        assert parse_joern_response("") == []
+
+    def test_direct_json_list(self):
+        """测试直接 JSON 数组"""
+        stdout = '[{"name": "main", "lineNumber": 3}]'
+        assert parse_joern_response(stdout) == [{"name": "main", "lineNumber": 3}]
+
+    def test_direct_json_object(self):
+        """测试直接 JSON 对象"""
+        assert parse_joern_response('  {"a": 1}\n') == {"a": 1}
+
+    def test_repl_json_string(self):
+        """测试 Scala REPL 包装的 JSON 字符串"""
+        payload = json.dumps([{"name": "main"}])
+        stdout = f"val res1: String = {json.dumps(payload)}"
+        assert parse_joern_response(stdout) == [{"name": "main"}]
+
+    def test_repl_plain_string(self):
+        """测试 Scala REPL 字符串"""
+        stdout = 'val res1: String = "/path/to/project"'
+        assert parse_joern_response(stdout) == "/path/to/project"
+
+    def test_repl_scala_list(self):
+        """测试 Scala REPL List"""
+        stdout = 'val res1: List[String] = List("item1", "item2")'
+        assert parse_joern_response(stdout) == ["item1", "item2"]
+
+    def test_repl_number(self):
+        """测试 Scala REPL 数字"""
+        assert parse_joern_response("val res3: Int = 42") == 42
+
+    def test_repl_generic_type(self):
+        """测试带泛型参数和空格的 REPL 类型"""
+        stdout = 'val res2: Map[String, Int] = "x = y"'
+        assert parse_joern_response(stdout) == "x = y"
+
+    def test_repl_value_after_log_lines(self):
+        """测试 val 结果行前有警告等日志行"""
+        stdout = 'warning: 1 deprecation\nval res4: List[String] = List("a", "b")'
+        assert parse_joern_response(stdout) == ["a", "b"]
+
+    def test_double_encoded_json(self):
+        """测试双重编码的 JSON"""
+        inner = json.dumps([{"name": "main"}])
+        assert parse_joern_response(json.dumps(inner)) == [{"name": "main"}]
+
+    def test_doubled_quotes(self):
+        """测试多余的首尾双引号"""
+        assert parse_joern_response('""[1, 2]""') == [1, 2]
+
+    def test_nested_encoded_values(self):
+        """测试嵌套在结构中的编码 JSON"""
+        stdout = json.dumps([{"data": json.dumps({"x": 1})}])
+        assert parse_joern_response(stdout) == [{"data": {"x": 1}}]
+
+    def test_json_blob_in_noise(self):
+        """测试输出中夹带的 JSON"""
+        stdout = 'some log line\nresult -> [{"name": "f"}]\n'
+        assert parse_joern_response(stdout) == [{"name": "f"}]
+
+    def test_json_with_trailing_noise(self):
+        """测试 JSON 开头但带有尾随输出"""
+        stdout = '[{"name": "f"}]\nwarning: deprecated'
+        assert parse_joern_response(stdout) == [{"name": "f"}]
+
+    def test_first_json_value_in_noise(self):
+        """测试输出中有多个 JSON 片段时取第一个完整值"""
+        stdout = 'result: {"a": 1} (took 3ms) [done]'
+        assert parse_joern_response(stdout) == {"a": 1}
+
+    def test_simple_assignment_string(self):
+        """测试简单的等号赋值"""
+        stdout = 'res0: String = "hello"'
+        assert parse_joern_response(stdout) == "hello"
+
+    def test_plain_strings_unchanged(self):
+        """测试普通字符串元素保持不变"""
+        stdout = json.dumps(["main", "helper", ""])
+        assert parse_joern_response(stdout) == ["main", "helper", ""]
+
+    def test_scalar_like_strings_unchanged(self):
+        """测试不以引号或括号开头的字符串不会被当作 JSON 解码"""
+        stdout = json.dumps({"code": "42", "flag": "true", "name": " f "})
+        assert parse_joern_response(stdout) == {
+            "code": "42",
+            "flag": "true",
+            "name": "f",
+        }
+
+    def test_unparseable_raises(self):
+        """测试无法解析时抛出异常"""
+        with pytest.raises(ValueError):
+            parse_joern_response("error: something went wrong")
+
+
+class TestSafeParseJoernResponse:
+    """测试 safe_parse_joern_response"""
+
+    def test_default_on_failure(self):
+        """测试解析失败返回默认值"""
+        assert safe_parse_joern_response("garbage", default={}) == {}
+
+    def test_empty_list_without_default(self):
+        """测试未提供默认值时返回空列表"""
+        assert safe_parse_joern_response("garbage") == []
+
+    def test_success(self):
+        """测试解析成功"""
+        assert safe_parse_joern_response("[1]", default=[]) == [1]
+
+    def test_short_response_cached_and_copied(self):
+        """测试短响应复用缓存结果且返回副本"""
+        _parse_cached.cache_clear()
+        stdout = '[{"name": "p1", "tags": ["a"]}]'
+
+        first = safe_parse_joern_response(stdout, default=[])
+        first[0]["name"] = "mutated"
+        first[0]["tags"].append("b")
+        first.append("mutated")
+        second = safe_parse_joern_response(stdout, default=[])
+
+        assert second == [{"name": "p1", "tags": ["a"]}]
+        assert _parse_cached.cache_info().hits == 1
+
+
+class TestSafeParseJoernList:
+    """测试 safe_parse_joern_list"""
+
+    def test_json_array(self):
+        """测试直接 JSON 数组"""
+        stdout = json.dumps([{"code": json.dumps({"x": 1})}])
+        assert safe_parse_joern_list(stdout) == [{"code": {"x": 1}}]
+
+    def test_fallback_formats(self):
+        """测试非 JSON 数组输出回退到通用解析"""
+        stdout = 'val res1: List[String] = List("a")'
+        assert safe_parse_joern_list(stdout) == ["a"]
+        assert safe_parse_joern_list('{"a": 1}') == [{"a": 1}]
+
+    def test_empty_and_garbage(self):
+        """测试空输出和无法解析的输出"""
+        assert safe_parse_joern_list("") == []
+        assert safe_parse_joern_list("[broken") == []
+
+
+class TestHelpers:
+    """测试辅助解析函数"""
+
+    def test_parse_scala_list(self):
+        """测试 Scala List 解析"""
+        assert _parse_scala_list('List("a", "b\\"c")') == ["a", 'b"c']
+        assert _parse_scala_list("List()") == []
+        assert _parse_scala_list("Vector(1)") == []
+
+    def test_parse_scala_list_unclosed_quote(self):
+        """测试未闭合的字符串被丢弃"""
+        assert _parse_scala_list('List("a", "b)') == ["a"]
+        assert _parse_scala_list('List("a\\n", "b)') == ["a\n"]
+
+    def test_find_json_start(self):
+        """测试定位输出中 JSON 的起始位置"""
+        assert _find_json_start("x = [1, {}]") == 4
+        assert _find_json_start('log {"a": [1]}') == 4
+        assert _find_json_start("no brackets") == -1
+
+    def test_strip_doubled_quotes(self):
+        """测试剥离多层多余的双引号"""
+        assert _strip_doubled_quotes('""""[1]""""') == "[1]"
+        assert _strip_doubled_quotes('""""') == '""""'
+        assert _strip_doubled_quotes("[1]") == "[1]"
+
+    def test_recursively_parse_json_depth_limit(self):
+        """测试递归深度限制"""
+        assert _recursively_parse_json("[1]", max_depth=0) == "[1]"
+
+    def test_recursively_parse_json_large_result(self):
+        """测试大结果集解析保持元素和键的顺序"""
+        data = [
+            {"id": i, "code": json.dumps({"n": i}), "z": 0, "a": 1} for i in range(2000)
+        ]
+        result = _recursively_parse_json(data)
+        assert len(result) == 2000
+        assert result[1999] == {"id": 1999, "code": {"n": 1999}, "z": 0, "a": 1}
+        assert list(result[0]) == ["id", "code", "z", "a"]
+
+    def test_assignment_value(self):
+        """测试提取等号赋值的值"""
+        assert _assignment_value('res0: String = "a"\nnext') == '"a"'
+        assert _assignment_value("x =   ") is None
+        assert _assignment_value("no equals") is None
+
+    def test_extract_json_from_repl(self):
+        """测试从 REPL 输出提取 JSON 字符串"""
+        assert extract_json_from_repl("[1, 2]") == "[1, 2]"
+        assert extract_json_from_repl('val res0: String = "x"') == '"x"'
+        assert extract_json_from_repl("") is None
+        assert extract_json_from_repl("no value here") is None